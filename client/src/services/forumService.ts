@@ -21,10 +21,22 @@ export const deleteCategory = async (id: string): Promise<void> => {
   await apiClient.delete(`/forum/categories/${id}`);
 };
 
+// Keyset-paginated listings: follow X-Next-Cursor until the last page
+const getAllPages = async <T>(url: string, limit: number): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const config = getNoCacheConfig();
+    const response = await apiClient.get(url, { ...config, params: { ...config.params, limit, cursor } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'] as string | undefined;
+  } while (cursor);
+  return items;
+};
+
 // Thread endpoints
 export const getThreadsByCategory = async (categoryId: string): Promise<ForumThread[]> => {
-  const response = await apiClient.get(`/forum/categories/${categoryId}/threads`, getNoCacheConfig());
-  return response.data;
+  return getAllPages<ForumThread>(`/forum/categories/${categoryId}/threads`, 100);
 };
 
 export const createThread = async (thread: { title: string; content: string; category_id: string }): Promise<ForumThread> => {
@@ -48,8 +60,7 @@ export const deleteThread = async (id: string): Promise<void> => {
 
 // Reply endpoints
 export const getRepliesByThread = async (threadId: string): Promise<ForumReply[]> => {
-  const response = await apiClient.get(`/forum/threads/${threadId}/replies`, getNoCacheConfig());
-  return response.data;
+  return getAllPages<ForumReply>(`/forum/threads/${threadId}/replies`, 200);
 };
 
 export const createReply = async (reply: { content: string; thread_id: string; parent_reply_id?: string }): Promise<ForumReply> => {
@@ -2,9 +2,16 @@ import { apiClient } from './api';
 import type { SharedResource } from '@/types';
 
 // Shared Resource endpoints
+// The catalogue is keyset-paginated; follow X-Next-Cursor until the last page
 export const getResources = async (): Promise<SharedResource[]> => {
-  const response = await apiClient.get('/resources');
-  return response.data;
+  const resources: SharedResource[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await apiClient.get('/resources', { params: { limit: 100, cursor } });
+    resources.push(...response.data);
+    cursor = response.headers['x-next-cursor'] as string | undefined;
+  } while (cursor);
+  return resources;
 };
 
 export const createResource = async (resource: { 
@@ -2,9 +2,16 @@ import { apiClient } from './api';
 import type { StudyGroup, StudyGroupMember } from '@/types';
 
 // Study Group endpoints
+// The directory is keyset-paginated; follow X-Next-Cursor until the last page
 export const getStudyGroups = async (): Promise<StudyGroup[]> => {
-  const response = await apiClient.get('/study-groups');
-  return response.data;
+  const groups: StudyGroup[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await apiClient.get('/study-groups', { params: { limit: 100, cursor } });
+    groups.push(...response.data);
+    cursor = response.headers['x-next-cursor'] as string | undefined;
+  } while (cursor);
+  return groups;
 };
 
 export const createStudyGroup = async (group: { 
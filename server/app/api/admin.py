@@ -20,6 +20,9 @@ from app.models.user import User, UserLocation
 from app.models.forum import ForumCategory, ForumThread, ForumReply
 from app.models.resource import SharedResource
 from app.models.study_group import StudyGroup
+from app.services.forum_cache import invalidate_category_caches, invalidate_overview_cache
+from app.services.resource_snapshot import republish_resource_snapshot
+from app.services.thread_activity import record_reply_removed
 from app.schemas.admin import (
     DashboardStats,
     AdminUserResponse,
@@ -310,6 +313,7 @@ async def approve_resource(
 
     resource.is_approved = True
     db.commit()
+    await republish_resource_snapshot()
 
     logger.info("Resource approved", admin_id=str(current_admin.id), resource_id=str(resource_id))
     return {"message": "Resource approved successfully"}
@@ -328,6 +332,7 @@ async def reject_resource(
 
     db.delete(resource)
     db.commit()
+    await republish_resource_snapshot()
 
     logger.info("Resource rejected", admin_id=str(current_admin.id), resource_id=str(resource_id))
     return {"message": "Resource rejected and deleted"}
@@ -384,6 +389,7 @@ async def delete_thread_admin(
 
     db.delete(thread)
     db.commit()
+    await invalidate_overview_cache()
 
     logger.info("Thread deleted by admin", admin_id=str(current_admin.id), thread_id=str(thread_id))
     return {"message": "Thread deleted successfully"}
@@ -401,7 +407,10 @@ async def delete_reply_admin(
         raise HTTPException(status_code=404, detail="Reply not found")
 
     db.delete(reply)
+    db.flush()
+    record_reply_removed(db, reply.thread_id)
     db.commit()
+    await invalidate_overview_cache()
 
     logger.info("Reply deleted by admin", admin_id=str(current_admin.id), reply_id=str(reply_id))
     return {"message": "Reply deleted successfully"}
@@ -424,6 +433,7 @@ async def create_category_admin(
     db.add(new_category)
     db.commit()
     db.refresh(new_category)
+    await invalidate_category_caches()
 
     logger.info("Category created", admin_id=str(current_admin.id), category_name=category.name)
     return {"message": "Category created", "id": str(new_category.id)}
@@ -453,6 +463,7 @@ async def delete_category_admin(
 
     db.delete(category)
     db.commit()
+    await invalidate_category_caches()
 
     logger.info("Category deleted", admin_id=str(current_admin.id), category_id=str(category_id))
     return {"message": "Category deleted successfully"}
@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.redis import redis_manager, cache_result
+from app.core.redis import cache_result, versioned_cache
+from app.core.dependencies import get_optional_user
+from app.core.scheduler import task_queue
 from app.models.forum import ForumCategory as ForumCategoryModel, ForumThread as ForumThreadModel, ForumReply as ForumReplyModel
 from app.models.user import User
-from app.schemas.forum import ForumCategoryCreate, ForumCategoryUpdate, ForumThreadCreate, ForumThreadUpdate, ForumReplyCreate, ForumReplyUpdate, ForumCategory, ForumThread, ForumReply
+from app.schemas.forum import ForumCategoryCreate, ForumCategoryUpdate, ForumThreadCreate, ForumThreadUpdate, ForumReplyCreate, ForumReplyUpdate, ForumCategory, ForumCategoryOverview, ForumThread, ForumReply, ForumReplyTree, ForumThreadSearchResult
 from app.api.auth import get_current_user
-from typing import List
-from uuid import UUID
+from app.services.forum_cache import CATEGORIES_CACHE_NAMESPACE, invalidate_category_caches, invalidate_overview_cache
+from app.services.forum_overview import OVERVIEW_CACHE_NAMESPACE, get_forum_overview
+from app.services.forum_ranking import refresh_hot_scores_for
+from app.services.forum_search import search_threads
+from app.services.thread_activity import record_reply_added, record_reply_removed
+from app.services.thread_views import record_thread_view, viewer_identity
+from app.services.thread_subscriptions import subscribe, unsubscribe
+from app.services.voting import VOTE_VALUES, cast_vote
+from app.services.vote_buffer import apply_pending_votes, buffer_vote
+from app.services.reply_tree import MAX_REPLY_DEPTH, PATH_SEPARATOR, PATH_SUBTREE_END, build_reply_path, build_reply_tree, iter_reply_nodes
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, encode_cursor, decode_cursor, keyset_after
+from typing import List, Optional
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
 import structlog
 
 logger = structlog.get_logger()
@@ -17,176 +34,427 @@ router = APIRouter()
 # Forum Category endpoints
 @router.get("/categories", response_model=List[ForumCategory])
 async def get_categories(db: Session = Depends(get_db)):
-    # Try to get cached categories first
-    cache_key = "forum:categories"
-    cached_categories = await redis_manager.get_json(cache_key)
-
-    if cached_categories:
-        logger.debug("Returning cached forum categories")
-        return cached_categories
+    # Try to get cached categories first; category writes bump the namespace version
+    version = await versioned_cache.version(CATEGORIES_CACHE_NAMESPACE)
+    if version is not None:
+        cached_categories = await versioned_cache.get_json(CATEGORIES_CACHE_NAMESPACE, "all", version=version)
+        if cached_categories is not None:
+            logger.debug("Returning cached forum categories")
+            return cached_categories
 
     # Get categories from database
-    categories = db.query(ForumCategoryModel).all()
+    categories = await run_in_threadpool(db.query(ForumCategoryModel).all)
     categories_data = [ForumCategory.from_orm(cat).dict() for cat in categories]
 
-    # Cache for 10 minutes
-    await redis_manager.set_json(cache_key, categories_data, expire=600)
-    logger.debug("Forum categories cached")
+    if version is not None:
+        await versioned_cache.set_json(
+            CATEGORIES_CACHE_NAMESPACE, "all", categories_data,
+            expire=settings.FORUM_CACHE_TTL_SECONDS, version=version
+        )
+        logger.debug("Forum categories cached")
 
     return categories_data
 
+@router.get("/overview", response_model=List[ForumCategoryOverview])
+async def get_overview(db: Session = Depends(get_db)):
+    """Every category with its thread count, reply count and newest thread."""
+    version = await versioned_cache.version(OVERVIEW_CACHE_NAMESPACE)
+    if version is not None:
+        cached_overview = await versioned_cache.get_json(OVERVIEW_CACHE_NAMESPACE, "all", version=version)
+        if cached_overview is not None:
+            logger.debug("Returning cached forum overview")
+            return cached_overview
+
+    overview = await run_in_threadpool(get_forum_overview, db)
+
+    if version is not None:
+        await versioned_cache.set_json(
+            OVERVIEW_CACHE_NAMESPACE, "all", overview,
+            expire=settings.FORUM_CACHE_TTL_SECONDS, version=version
+        )
+        logger.debug("Forum overview cached")
+
+    return overview
+
 @router.post("/categories", response_model=ForumCategory)
-def create_category(
+async def create_category(
     category: ForumCategoryCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_category = ForumCategoryModel(**category.dict())
-    db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    def create():
+        db_category = ForumCategoryModel(**category.dict())
+        db.add(db_category)
+        db.commit()
+        db.refresh(db_category)
+        return db_category
+    
+    db_category = await run_in_threadpool(create)
+    await invalidate_category_caches()
     return db_category
 
 @router.put("/categories/{category_id}", response_model=ForumCategory)
-def update_category(
+async def update_category(
     category_id: UUID,
     category: ForumCategoryUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_category = db.query(ForumCategoryModel).filter(ForumCategoryModel.id == category_id).first()
-    if not db_category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    
-    for key, value in category.dict(exclude_unset=True).items():
-        setattr(db_category, key, value)
+    def update():
+        db_category = db.query(ForumCategoryModel).filter(ForumCategoryModel.id == category_id).first()
+        if not db_category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        for key, value in category.dict(exclude_unset=True).items():
+            setattr(db_category, key, value)
+        
+        db.commit()
+        db.refresh(db_category)
+        return db_category
     
-    db.commit()
-    db.refresh(db_category)
+    db_category = await run_in_threadpool(update)
+    await invalidate_category_caches()
     return db_category
 
 @router.delete("/categories/{category_id}")
-def delete_category(
+async def delete_category(
     category_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_category = db.query(ForumCategoryModel).filter(ForumCategoryModel.id == category_id).first()
-    if not db_category:
-        raise HTTPException(status_code=404, detail="Category not found")
+    def delete():
+        db_category = db.query(ForumCategoryModel).filter(ForumCategoryModel.id == category_id).first()
+        if not db_category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        db.delete(db_category)
+        db.commit()
     
-    db.delete(db_category)
-    db.commit()
+    await run_in_threadpool(delete)
+    await invalidate_category_caches()
     return {"message": "Category deleted successfully"}
 
 # Forum Thread endpoints
+# Sort key columns (all descending, pinned threads first) and cursor parsers per sort mode
+THREAD_SORTS = {
+    "hot": (lambda: (ForumThreadModel.is_pinned, ForumThreadModel.hot_score, ForumThreadModel.id), (bool, float, UUID)),
+    # coalesce so threads with NULL vote columns sort as 0, matching the cursor value
+    "top": (lambda: (ForumThreadModel.is_pinned, func.coalesce(ForumThreadModel.upvotes, 0) - func.coalesce(ForumThreadModel.downvotes, 0), ForumThreadModel.id), (bool, int, UUID)),
+    "new": (lambda: (ForumThreadModel.is_pinned, ForumThreadModel.created_at, ForumThreadModel.id), (bool, datetime.fromisoformat, UUID)),
+    "views": (lambda: (ForumThreadModel.is_pinned, ForumThreadModel.view_count, ForumThreadModel.id), (bool, int, UUID)),
+}
+
 @router.get("/categories/{category_id}/threads", response_model=List[ForumThread])
-def get_threads_by_category(category_id: UUID, db: Session = Depends(get_db)):
-    threads = db.query(ForumThreadModel).filter(ForumThreadModel.category_id == category_id).all()
-    return threads
+async def get_threads_by_category(
+    category_id: UUID,
+    response: Response,
+    sort: str = Query("hot", pattern="^(hot|top|new|views)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    db: Session = Depends(get_db)
+):
+    """List a category's threads ranked by hot score, net votes, recency or unique views.
+
+    Keyset-paginated: pass the X-Next-Cursor header back as `cursor`.
+    """
+    sort_columns, cursor_parsers = THREAD_SORTS[sort]
+    columns = sort_columns()
+    
+    query = db.query(ForumThreadModel).filter(ForumThreadModel.category_id == category_id)
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, *cursor_parsers)))
+    
+    threads = await run_in_threadpool(query.order_by(*[column.desc() for column in columns]).limit(limit).all)
+    
+    if len(threads) == limit:
+        last = threads[-1]
+        sort_values = {
+            "hot": last.hot_score,
+            "top": (last.upvotes or 0) - (last.downvotes or 0),
+            "new": last.created_at,
+            "views": last.view_count,
+        }
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(bool(last.is_pinned), sort_values[sort], last.id)
+    return await apply_pending_votes("thread", [ForumThread.model_validate(t) for t in threads])
+
+@router.get("/search", response_model=List[ForumThreadSearchResult])
+async def search_forum(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    category_id: Optional[UUID] = None,
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Threads matching `q` in their title, body or replies, best match first.
+
+    Title matches outrank body matches, which outrank reply matches. Pass
+    the X-Next-Cursor header back as `cursor` for the next page.
+    """
+    after = decode_cursor(cursor, float, UUID) if cursor else None
+    hits = await run_in_threadpool(search_threads, db, q, category_id, limit, after)
+
+    if len(hits) == limit:
+        last_thread, last_rank = hits[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_rank, last_thread.id)
+
+    results = [
+        ForumThreadSearchResult(**ForumThread.model_validate(thread).model_dump(), rank=rank)
+        for thread, rank in hits
+    ]
+    return await apply_pending_votes("thread", results)
 
 @router.post("/threads", response_model=ForumThread)
-def create_thread(
+async def create_thread(
     thread: ForumThreadCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Verify category exists
-    db_category = db.query(ForumCategoryModel).filter(ForumCategoryModel.id == thread.category_id).first()
-    if not db_category:
-        raise HTTPException(status_code=404, detail="Category not found")
+    def create():
+        # Verify category exists
+        db_category = db.query(ForumCategoryModel).filter(ForumCategoryModel.id == thread.category_id).first()
+        if not db_category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        db_thread = ForumThreadModel(
+            title=thread.title,
+            content=thread.content,
+            category_id=thread.category_id,
+            author_id=current_user.id,
+            is_pinned=thread.is_pinned
+        )
+        db.add(db_thread)
+        db.flush()
+        subscribe(db, db_thread.id, current_user.id)
+        db.commit()
+        db.refresh(db_thread)
+        return db_thread
     
-    db_thread = ForumThreadModel(
-        title=thread.title,
-        content=thread.content,
-        category_id=thread.category_id,
-        author_id=current_user.id,
-        is_pinned=thread.is_pinned
-    )
-    db.add(db_thread)
-    db.commit()
-    db.refresh(db_thread)
+    db_thread = await run_in_threadpool(create)
+    await invalidate_overview_cache()
     return db_thread
 
 @router.get("/threads/{thread_id}", response_model=ForumThread)
-def get_thread(thread_id: UUID, db: Session = Depends(get_db)):
-    thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first()
+async def get_thread(
+    thread_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    thread = await run_in_threadpool(db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first)
     if not thread:
         raise HTTPException(status_code=404, detail="Thread not found")
-    return thread
+    
+    viewer = viewer_identity(
+        current_user.id if current_user else None,
+        request.client.host if request.client else None,
+        request.headers.get("user-agent")
+    )
+    await record_thread_view(thread.id, viewer)
+    (result,) = await apply_pending_votes("thread", [ForumThread.model_validate(thread)])
+    return result
 
 @router.put("/threads/{thread_id}", response_model=ForumThread)
-def update_thread(
+async def update_thread(
     thread_id: UUID,
     thread: ForumThreadUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first()
-    if not db_thread:
-        raise HTTPException(status_code=404, detail="Thread not found")
-    
-    # Check if user is author or has permission to edit
-    if db_thread.author_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to edit this thread")
+    def update():
+        db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first()
+        if not db_thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        
+        # Check if user is author or has permission to edit
+        if db_thread.author_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to edit this thread")
+        
+        for key, value in thread.dict(exclude_unset=True).items():
+            setattr(db_thread, key, value)
+        
+        db.commit()
+        db.refresh(db_thread)
+        return db_thread
     
-    for key, value in thread.dict(exclude_unset=True).items():
-        setattr(db_thread, key, value)
-    
-    db.commit()
-    db.refresh(db_thread)
+    db_thread = await run_in_threadpool(update)
+    await invalidate_overview_cache()
     return db_thread
 
 @router.delete("/threads/{thread_id}")
-def delete_thread(
+async def delete_thread(
     thread_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first()
-    if not db_thread:
-        raise HTTPException(status_code=404, detail="Thread not found")
+    def delete():
+        db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first()
+        if not db_thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        
+        # Check if user is author or has permission to delete
+        if db_thread.author_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this thread")
+        
+        db.delete(db_thread)
+        db.commit()
     
-    # Check if user is author or has permission to delete
-    if db_thread.author_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this thread")
-    
-    db.delete(db_thread)
-    db.commit()
+    await run_in_threadpool(delete)
+    await invalidate_overview_cache()
     return {"message": "Thread deleted successfully"}
 
 # Forum Reply endpoints
 @router.get("/threads/{thread_id}/replies", response_model=List[ForumReply])
-def get_replies_by_thread(thread_id: UUID, db: Session = Depends(get_db)):
-    replies = db.query(ForumReplyModel).filter(ForumReplyModel.thread_id == thread_id).all()
-    return replies
+async def get_replies_by_thread(
+    thread_id: UUID,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    db: Session = Depends(get_db)
+):
+    """A page of a thread's replies, oldest first.
+
+    Keyset-paginated over (created_at, id): pass the X-Next-Cursor header
+    back as `cursor`. X-Total-Count carries the thread's reply count.
+    """
+    reply_count = await run_in_threadpool(db.query(ForumThreadModel.reply_count).filter(ForumThreadModel.id == thread_id).scalar)
+    response.headers[TOTAL_COUNT_HEADER] = str(reply_count or 0)
+    
+    columns = (ForumReplyModel.created_at, ForumReplyModel.id)
+    query = db.query(ForumReplyModel).filter(ForumReplyModel.thread_id == thread_id)
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, datetime.fromisoformat, UUID), descending=False))
+    
+    replies = await run_in_threadpool(query.order_by(*columns).limit(limit).all)
+    
+    if len(replies) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(replies[-1].created_at, replies[-1].id)
+    return await apply_pending_votes("reply", [ForumReply.model_validate(r) for r in replies])
+
+@router.get("/threads/{thread_id}/replies/tree", response_model=ForumReplyTree)
+async def get_reply_tree(
+    thread_id: UUID,
+    parent_id: Optional[UUID] = Query(None, description="Return the subtree below this reply"),
+    cursor: Optional[str] = Query(None, description="children_cursor/next_cursor to load more siblings"),
+    max_depth: int = Query(5, ge=0, le=MAX_REPLY_DEPTH),
+    max_children: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Return a thread's replies pre-nested, from path-ordered index scans.
+
+    Without parent_id the top-level replies are returned; with it, the
+    replies below that reply. Sibling lists are capped at max_children and
+    nesting at max_depth levels; truncated lists carry a cursor to pass
+    back (with the same parent_id) to load the rest.
+    """
+    def load_tree():
+        query = db.query(ForumReplyModel).filter(ForumReplyModel.thread_id == thread_id)
+        base_depth = 0
+        if parent_id:
+            parent = query.filter(ForumReplyModel.id == parent_id).first()
+            if not parent:
+                raise HTTPException(status_code=404, detail="Parent reply not found")
+            base_depth = parent.depth + 1
+            subtree_prefix = parent.path + PATH_SEPARATOR
+            query = query.filter(
+                ForumReplyModel.path > subtree_prefix,
+                ForumReplyModel.path < parent.path + PATH_SUBTREE_END
+            )
+        if cursor:
+            (after_path,) = decode_cursor(cursor, str)
+            # Skip the cursor reply and everything nested below it
+            query = query.filter(ForumReplyModel.path > after_path + PATH_SUBTREE_END)
+        
+        # Bound the scan to this page's roots and their subtrees. One root past
+        # the page is kept (without its replies) so the tree can report overflow.
+        page_roots = query.filter(ForumReplyModel.depth == base_depth).order_by(
+            ForumReplyModel.path
+        ).with_entities(ForumReplyModel.path).limit(max_children + 1).all()
+        if len(page_roots) > max_children:
+            query = query.filter(ForumReplyModel.path <= page_roots[-1].path)
+        
+        rows = query.filter(
+            ForumReplyModel.depth <= base_depth + max_depth + 1
+        ).order_by(ForumReplyModel.path).all()
+        
+        return build_reply_tree(
+            rows,
+            serialize=lambda row: ForumReply.model_validate(row).model_dump(),
+            base_depth=base_depth,
+            max_depth=max_depth,
+            max_children=max_children,
+            encode_cursor=encode_cursor
+        )
+    
+    tree = await run_in_threadpool(load_tree)
+    await apply_pending_votes("reply", list(iter_reply_nodes(tree["replies"])))
+    return tree
 
 @router.post("/replies", response_model=ForumReply)
-def create_reply(
+async def create_reply(
     reply: ForumReplyCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Verify thread exists
-    db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == reply.thread_id).first()
-    if not db_thread:
-        raise HTTPException(status_code=404, detail="Thread not found")
+    def create():
+        # Verify thread exists
+        db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == reply.thread_id).first()
+        if not db_thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        
+        # Verify parent reply exists (in the same thread) if provided
+        db_parent_reply = None
+        if reply.parent_reply_id:
+            db_parent_reply = db.query(ForumReplyModel).filter(
+                ForumReplyModel.id == reply.parent_reply_id,
+                ForumReplyModel.thread_id == reply.thread_id
+            ).first()
+            if not db_parent_reply:
+                raise HTTPException(status_code=404, detail="Parent reply not found")
+            if db_parent_reply.depth + 1 >= MAX_REPLY_DEPTH:
+                raise HTTPException(status_code=400, detail="Reply nesting is too deep")
+        
+        # Materialized path: created_at and id are fixed up front so the path
+        # segment matches the stored row
+        reply_id = uuid4()
+        created_at = datetime.now(timezone.utc)
+        db_reply = ForumReplyModel(
+            id=reply_id,
+            content=reply.content,
+            thread_id=reply.thread_id,
+            author_id=current_user.id,
+            parent_reply_id=reply.parent_reply_id,
+            created_at=created_at,
+            path=build_reply_path(db_parent_reply.path if db_parent_reply else None, created_at, reply_id),
+            depth=db_parent_reply.depth + 1 if db_parent_reply else 0
+        )
+        # Built before commit expires the loaded rows
+        notification = {
+            "id": str(reply_id),
+            "type": "send_notification",
+            "data": {
+                "thread_id": str(db_thread.id),
+                "reply_id": str(reply_id),
+                "author_id": str(current_user.id),
+                "type": "thread_reply",
+                "message": f"{current_user.username} replied to \"{db_thread.title}\""
+            }
+        }
+        db.add(db_reply)
+        db.flush()
+        record_reply_added(db, db_reply)
+        subscribe(db, db_reply.thread_id, current_user.id)
+        db.commit()
+        db.refresh(db_reply)
+        return db_reply, notification
     
-    # Verify parent reply exists if provided
-    if reply.parent_reply_id:
-        db_parent_reply = db.query(ForumReplyModel).filter(ForumReplyModel.id == reply.parent_reply_id).first()
-        if not db_parent_reply:
-            raise HTTPException(status_code=404, detail="Parent reply not found")
+    db_reply, notification = await run_in_threadpool(create)
+    await invalidate_overview_cache()
     
-    db_reply = ForumReplyModel(
-        content=reply.content,
-        thread_id=reply.thread_id,
-        author_id=current_user.id,
-        parent_reply_id=reply.parent_reply_id
-    )
-    db.add(db_reply)
-    db.commit()
-    db.refresh(db_reply)
+    # Subscribers are notified by the task worker; the reply never waits on the fan-out
+    queued = await task_queue.enqueue_task("notifications", notification)
+    if not queued:
+        logger.warning("Reply notification not queued", reply_id=notification["id"])
     return db_reply
 
 @router.put("/replies/{reply_id}", response_model=ForumReply)
@@ -212,64 +480,121 @@ def update_reply(
     return db_reply
 
 @router.delete("/replies/{reply_id}")
-def delete_reply(
+async def delete_reply(
     reply_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_reply = db.query(ForumReplyModel).filter(ForumReplyModel.id == reply_id).first()
-    if not db_reply:
-        raise HTTPException(status_code=404, detail="Reply not found")
+    def delete():
+        db_reply = db.query(ForumReplyModel).filter(ForumReplyModel.id == reply_id).first()
+        if not db_reply:
+            raise HTTPException(status_code=404, detail="Reply not found")
+        
+        # Check if user is author or has permission to delete
+        if db_reply.author_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this reply")
+        
+        db.delete(db_reply)
+        db.flush()
+        record_reply_removed(db, db_reply.thread_id)
+        db.commit()
     
-    # Check if user is author or has permission to delete
-    if db_reply.author_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this reply")
-    
-    db.delete(db_reply)
-    db.commit()
+    await run_in_threadpool(delete)
+    await invalidate_overview_cache()
     return {"message": "Reply deleted successfully"}
 
-# Voting endpoints
-@router.post("/threads/{thread_id}/vote")
-def vote_thread(
+# Subscription endpoints
+@router.post("/threads/{thread_id}/subscription")
+def subscribe_thread(
     thread_id: UUID,
-    vote_type: str,  # "up" or "down"
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_thread = db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first()
-    if not db_thread:
+    if not db.query(ForumThreadModel.id).filter(ForumThreadModel.id == thread_id).first():
         raise HTTPException(status_code=404, detail="Thread not found")
     
-    if vote_type == "up":
-        db_thread.upvotes += 1
-    elif vote_type == "down":
-        db_thread.downvotes += 1
-    else:
-        raise HTTPException(status_code=400, detail="Invalid vote type. Use 'up' or 'down'")
+    subscribe(db, thread_id, current_user.id)
+    db.commit()
+    return {"message": "Subscribed to thread"}
+
+@router.delete("/threads/{thread_id}/subscription")
+def unsubscribe_thread(
+    thread_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not unsubscribe(db, thread_id, current_user.id):
+        raise HTTPException(status_code=404, detail="Not subscribed to this thread")
     
     db.commit()
-    db.refresh(db_thread)
-    return {"message": "Vote recorded successfully", "upvotes": db_thread.upvotes, "downvotes": db_thread.downvotes}
+    return {"message": "Unsubscribed from thread"}
+
+# Voting endpoints
+def _cast_thread_vote(db: Session, user_id: UUID, thread_id: UUID, vote_type: str):
+    """Record a vote and refresh the thread's hot score; None if the thread is gone."""
+    counts = cast_vote(db, user_id, "thread", thread_id, vote_type)
+    if counts is None:
+        db.rollback()
+        return None
+    # A Core UPDATE, so voting does not bump the thread's updated_at
+    refresh_hot_scores_for(db, [thread_id])
+    db.commit()
+    return counts
+
+def _cast_reply_vote(db: Session, user_id: UUID, reply_id: UUID, vote_type: str):
+    """Record a vote on a reply; None if the reply is gone."""
+    counts = cast_vote(db, user_id, "reply", reply_id, vote_type)
+    if counts is None:
+        db.rollback()
+        return None
+    db.commit()
+    return counts
+
+@router.post("/threads/{thread_id}/vote")
+async def vote_thread(
+    thread_id: UUID,
+    vote_type: str,  # "up", "down" or "none" to retract
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if vote_type not in VOTE_VALUES:
+        raise HTTPException(status_code=400, detail="Invalid vote type. Use 'up', 'down' or 'none'")
+    
+    counts = None
+    if settings.VOTE_BUFFER_ENABLED:
+        db_thread = await run_in_threadpool(db.query(ForumThreadModel).filter(ForumThreadModel.id == thread_id).first)
+        if not db_thread:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        # Counters and hot score are written by the vote flush job
+        counts = await buffer_vote(db, current_user.id, "thread", db_thread, vote_type)
+    if counts is None:
+        # Buffering is off or Redis is unavailable: write the ledger directly
+        counts = await run_in_threadpool(_cast_thread_vote, db, current_user.id, thread_id, vote_type)
+        if counts is None:
+            raise HTTPException(status_code=404, detail="Thread not found")
+    upvotes, downvotes = counts
+    return {"message": "Vote recorded successfully", "upvotes": upvotes, "downvotes": downvotes}
 
 @router.post("/replies/{reply_id}/vote")
-def vote_reply(
+async def vote_reply(
     reply_id: UUID,
-    vote_type: str,  # "up" or "down"
+    vote_type: str,  # "up", "down" or "none" to retract
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_reply = db.query(ForumReplyModel).filter(ForumReplyModel.id == reply_id).first()
-    if not db_reply:
-        raise HTTPException(status_code=404, detail="Reply not found")
-    
-    if vote_type == "up":
-        db_reply.upvotes += 1
-    elif vote_type == "down":
-        db_reply.downvotes += 1
-    else:
-        raise HTTPException(status_code=400, detail="Invalid vote type. Use 'up' or 'down'")
+    if vote_type not in VOTE_VALUES:
+        raise HTTPException(status_code=400, detail="Invalid vote type. Use 'up', 'down' or 'none'")
     
-    db.commit()
-    db.refresh(db_reply)
-    return {"message": "Vote recorded successfully", "upvotes": db_reply.upvotes, "downvotes": db_reply.downvotes}
+    counts = None
+    if settings.VOTE_BUFFER_ENABLED:
+        db_reply = await run_in_threadpool(db.query(ForumReplyModel).filter(ForumReplyModel.id == reply_id).first)
+        if not db_reply:
+            raise HTTPException(status_code=404, detail="Reply not found")
+        counts = await buffer_vote(db, current_user.id, "reply", db_reply, vote_type)
+    if counts is None:
+        # Buffering is off or Redis is unavailable: write the ledger directly
+        counts = await run_in_threadpool(_cast_reply_vote, db, current_user.id, reply_id, vote_type)
+        if counts is None:
+            raise HTTPException(status_code=404, detail="Reply not found")
+    upvotes, downvotes = counts
+    return {"message": "Vote recorded successfully", "upvotes": upvotes, "downvotes": downvotes}
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
-from typing import List, Optional
+from typing import List, Optional, Union
 from uuid import UUID
-from app.core.database import get_db
+from datetime import datetime
+from app.core.database import get_db, SessionLocal
 from app.api.auth import get_current_user
 from app.models.user import User, Message
-from app.schemas.user import MessageCreate, Message as MessageSchema
+from app.schemas.user import MessageCreate, Message as MessageSchema, MessageUser, MessageListExpanded
+from app.services import message_archive
+from app.services.message_archive import count_unread, get_message_history, iter_message_history
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
 
 messages_router = APIRouter()
 
@@ -45,84 +50,87 @@ async def send_message(
     
     return db_message
 
-@messages_router.get("/", response_model=List[MessageSchema])
+@messages_router.get("/", response_model=Union[List[MessageSchema], MessageListExpanded])
 async def get_messages(
+    response: Response,
     conversation_with: Optional[UUID] = Query(None, description="Get conversation with specific user"),
-    limit: int = Query(50, description="Number of messages to retrieve"),
-    offset: int = Query(0, description="Offset for pagination"),
+    limit: int = Query(50, ge=1, le=200, description="Number of messages to retrieve"),
+    offset: int = Query(0, ge=0, description="Offset for pagination (recent messages only; prefer cursor)"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor to fetch older messages"),
+    expand: Optional[str] = Query(None, pattern="^users$", description="Set to 'users' to embed a map of sender/recipient profiles"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get messages for current user"""
-    query = db.query(Message).filter(
-        or_(
-            Message.sender_id == current_user.id,
-            Message.recipient_id == current_user.id
-        )
-    )
-    
-    if conversation_with:
-        # Get conversation with specific user
-        query = query.filter(
+    """Get messages for current user, newest first.
+
+    Cursor pagination continues into archived history once recent messages
+    are exhausted; the next page's cursor is returned in X-Next-Cursor.
+    With expand=users the response is an object holding the messages and a
+    user map keyed by ID, loaded in one query and serialized once per user.
+    """
+    if offset and not cursor:
+        # Legacy offset paging only covers the hot table
+        query = db.query(Message).filter(
             or_(
-                and_(Message.sender_id == current_user.id, Message.recipient_id == conversation_with),
-                and_(Message.sender_id == conversation_with, Message.recipient_id == current_user.id)
+                Message.sender_id == current_user.id,
+                Message.recipient_id == current_user.id
             )
         )
-    
-    messages = query.order_by(Message.created_at.desc()).offset(offset).limit(limit).all()
+        if conversation_with:
+            query = query.filter(
+                or_(
+                    and_(Message.sender_id == current_user.id, Message.recipient_id == conversation_with),
+                    and_(Message.sender_id == conversation_with, Message.recipient_id == current_user.id)
+                )
+            )
+        messages = query.order_by(Message.created_at.desc(), Message.id.desc()).offset(offset).limit(limit).all()
+    else:
+        before = decode_cursor(cursor, datetime.fromisoformat, UUID) if cursor else None
+        messages = get_message_history(db, current_user.id, conversation_with, before=before, limit=limit)
+
+    if len(messages) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(messages[-1].created_at, messages[-1].id)
+
+    if expand == "users":
+        user_ids = {m.sender_id for m in messages} | {m.recipient_id for m in messages}
+        users = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
+        return MessageListExpanded(
+            messages=[MessageSchema.model_validate(m) for m in messages],
+            users={str(u.id): MessageUser.model_validate(u) for u in users}
+        )
     return messages
 
+@messages_router.get("/export")
+async def export_messages(
+    conversation_with: Optional[UUID] = Query(None, description="Export only the conversation with this user"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the user's full message history (including archive) as NDJSON, oldest first"""
+    user_id = current_user.id
+
+    def generate():
+        # The request-scoped session may be closed before streaming finishes,
+        # so the export holds its own for the lifetime of the response.
+        db = SessionLocal()
+        try:
+            for message in iter_message_history(db, user_id, conversation_with):
+                yield MessageSchema.model_validate(message).model_dump_json() + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="messages.ndjson"'}
+    )
+
 @messages_router.get("/conversations")
 async def get_conversations(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get list of conversations (unique users the current user has messaged with)"""
-    # Get all unique users that have had conversations with current user
-    sent_to = db.query(Message.recipient_id).filter(Message.sender_id == current_user.id).distinct()
-    received_from = db.query(Message.sender_id).filter(Message.recipient_id == current_user.id).distinct()
-    
-    # Combine and get unique user IDs
-    conversation_user_ids = set()
-    for result in sent_to:
-        conversation_user_ids.add(result[0])
-    for result in received_from:
-        conversation_user_ids.add(result[0])
-    
-    # Get user details for each conversation
-    conversations = []
-    for user_id in conversation_user_ids:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            # Get latest message in conversation
-            latest_message = db.query(Message).filter(
-                or_(
-                    and_(Message.sender_id == current_user.id, Message.recipient_id == user_id),
-                    and_(Message.sender_id == user_id, Message.recipient_id == current_user.id)
-                )
-            ).order_by(Message.created_at.desc()).first()
-            
-            # Count unread messages from this user
-            unread_count = db.query(Message).filter(
-                and_(
-                    Message.sender_id == user_id,
-                    Message.recipient_id == current_user.id,
-                    Message.is_read == False
-                )
-            ).count()
-            
-            conversations.append({
-                "user_id": user.id,
-                "username": user.username,
-                "latest_message": latest_message.content if latest_message else None,
-                "latest_message_time": latest_message.created_at if latest_message else None,
-                "unread_count": unread_count
-            })
-    
-    # Sort by latest message time
-    conversations.sort(key=lambda x: x["latest_message_time"] or "1970-01-01", reverse=True)
-    return conversations
+    """Get list of conversations (unique users the current user has messaged with), archived history included"""
+    return message_archive.get_conversations(db, current_user.id)
 
 @messages_router.put("/{message_id}/read")
 async def mark_message_read(
@@ -155,11 +163,4 @@ async def get_unread_count(
     db: Session = Depends(get_db)
 ):
     """Get count of unread messages"""
-    unread_count = db.query(Message).filter(
-        and_(
-            Message.recipient_id == current_user.id,
-            Message.is_read == False
-        )
-    ).count()
-    
-    return {"unread_count": unread_count}
\ No newline at end of file
+    return {"unread_count": count_unread(db, current_user.id)}
\ No newline at end of file
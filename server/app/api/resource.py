@@ -1,105 +1,244 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.scheduler import task_queue
 from app.models.resource import SharedResource as SharedResourceModel
 from app.models.user import User
 from app.schemas.resource import SharedResourceCreate, SharedResourceUpdate, SharedResource
 from app.api.auth import get_current_user
-from typing import List
+from app.services.voting import VOTE_VALUES, cast_vote
+from app.services.vote_buffer import apply_pending_votes, buffer_vote
+from app.services.resource_ranking import refresh_wilson_scores_for
+from app.services.resource_dedupe import find_duplicate
+from app.services.resource_snapshot import choose_encoding, load_snapshot, republish_resource_snapshot
+from app.utils.urls import url_hash
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_after
+from typing import List, Optional
 from uuid import UUID
+from datetime import datetime
+import structlog
+
+logger = structlog.get_logger()
 
 router = APIRouter()
 
+async def enqueue_metadata_enrichment(resource_id: UUID):
+    """Have the task worker fetch the resource's link preview."""
+    queued = await task_queue.enqueue_task("background_tasks", {
+        "type": "enrich_resource_metadata",
+        "data": {"resource_id": str(resource_id)}
+    })
+    if not queued:
+        logger.warning("Link metadata enrichment not queued", resource_id=str(resource_id))
+
 # Shared Resource endpoints
+# Sort key columns (all descending) and cursor parsers per sort mode
+RESOURCE_SORTS = {
+    # coalesce so rows with NULL vote columns sort as 0, matching the cursor value
+    "top": (lambda: (func.coalesce(SharedResourceModel.upvotes, 0) - func.coalesce(SharedResourceModel.downvotes, 0), SharedResourceModel.id), (int, UUID)),
+    "new": (lambda: (SharedResourceModel.created_at, SharedResourceModel.id), (datetime.fromisoformat, UUID)),
+    "wilson": (lambda: (SharedResourceModel.wilson_score, SharedResourceModel.id), (float, UUID)),
+}
+
 @router.get("/resources", response_model=List[SharedResource])
-def get_resources(db: Session = Depends(get_db)):
-    resources = db.query(SharedResourceModel).all()
-    return resources
+async def get_resources(
+    response: Response,
+    type: Optional[str] = Query(None, pattern="^(link|book|video|audio)$"),
+    sort: str = Query("wilson", pattern="^(top|new|wilson)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    db: Session = Depends(get_db)
+):
+    """List approved resources ranked by net votes, recency or Wilson score.
+
+    Keyset-paginated: pass the X-Next-Cursor header back as `cursor`.
+    """
+    sort_columns, cursor_parsers = RESOURCE_SORTS[sort]
+    columns = sort_columns()
+    
+    query = db.query(SharedResourceModel).filter(SharedResourceModel.is_approved.is_(True))
+    if type:
+        query = query.filter(SharedResourceModel.resource_type == type)
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, *cursor_parsers)))
+    
+    resources = await run_in_threadpool(query.order_by(*[column.desc() for column in columns]).limit(limit).all)
+    
+    if len(resources) == limit:
+        last = resources[-1]
+        sort_values = {
+            "top": (last.upvotes or 0) - (last.downvotes or 0),
+            "new": last.created_at,
+            "wilson": last.wilson_score,
+        }
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort_values[sort], last.id)
+    return await apply_pending_votes("resource", [SharedResource.model_validate(r) for r in resources])
+
+@router.get("/resources/snapshot", response_model=List[SharedResource])
+async def get_resources_snapshot(request: Request):
+    """The whole approved library as one pre-compressed, ETag-validated document.
+
+    Served from the published snapshot (republished on approve/reject and
+    periodically); vote counts may lag the live listing by a refresh.
+    """
+    snapshot = load_snapshot()
+    if snapshot is None:
+        await republish_resource_snapshot()
+        snapshot = load_snapshot()
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="Resource snapshot unavailable")
+
+    encoding = choose_encoding(snapshot, request.headers.get("accept-encoding"))
+    etag = snapshot.etag(encoding)
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=snapshot.bodies[encoding], media_type="application/json", headers=headers)
 
 @router.post("/resources", response_model=SharedResource)
-def create_resource(
+async def create_resource(
     resource: SharedResourceCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_resource = SharedResourceModel(
-        title=resource.title,
-        url=resource.url,
-        description=resource.description,
-        resource_type=resource.resource_type,
-        submitted_by=current_user.id
-    )
-    db.add(db_resource)
-    db.commit()
-    db.refresh(db_resource)
+    def create():
+        duplicate = find_duplicate(db, resource.url)
+        if duplicate:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "This link has already been shared", "resource_id": str(duplicate.id)}
+            )
+        
+        db_resource = SharedResourceModel(
+            title=resource.title,
+            url=resource.url,
+            url_hash=url_hash(resource.url),
+            description=resource.description,
+            resource_type=resource.resource_type,
+            submitted_by=current_user.id
+        )
+        db.add(db_resource)
+        db.commit()
+        db.refresh(db_resource)
+        return db_resource
+    
+    db_resource = await run_in_threadpool(create)
+    if db_resource.url:
+        await enqueue_metadata_enrichment(db_resource.id)
     return db_resource
 
 @router.get("/resources/{resource_id}", response_model=SharedResource)
-def get_resource(resource_id: UUID, db: Session = Depends(get_db)):
-    resource = db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first()
+async def get_resource(resource_id: UUID, db: Session = Depends(get_db)):
+    resource = await run_in_threadpool(db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
-    return resource
+    (result,) = await apply_pending_votes("resource", [SharedResource.model_validate(resource)])
+    return result
 
 @router.put("/resources/{resource_id}", response_model=SharedResource)
-def update_resource(
+async def update_resource(
     resource_id: UUID,
     resource: SharedResourceUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_resource = db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first()
-    if not db_resource:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    # Check if user is submitter or has permission to edit
-    if db_resource.submitted_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to edit this resource")
-    
-    for key, value in resource.dict(exclude_unset=True).items():
-        setattr(db_resource, key, value)
+    def update():
+        db_resource = db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first()
+        if not db_resource:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        
+        # Check if user is submitter or has permission to edit
+        if db_resource.submitted_by != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to edit this resource")
+        
+        changes = resource.dict(exclude_unset=True)
+        if "url" in changes:
+            duplicate = find_duplicate(db, changes["url"], exclude_id=resource_id)
+            if duplicate:
+                raise HTTPException(
+                    status_code=409,
+                    detail={"message": "This link has already been shared", "resource_id": str(duplicate.id)}
+                )
+            changes["url_hash"] = url_hash(changes["url"])
+        
+        was_public = db_resource.is_approved
+        for key, value in changes.items():
+            setattr(db_resource, key, value)
+        
+        db.commit()
+        db.refresh(db_resource)
+        return db_resource, was_public, changes
     
-    db.commit()
-    db.refresh(db_resource)
+    db_resource, was_public, changes = await run_in_threadpool(update)
+    if was_public or db_resource.is_approved:
+        await republish_resource_snapshot()
+    if changes.get("url"):
+        await enqueue_metadata_enrichment(db_resource.id)
     return db_resource
 
 @router.delete("/resources/{resource_id}")
-def delete_resource(
+async def delete_resource(
     resource_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_resource = db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first()
-    if not db_resource:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    # Check if user is submitter or has permission to delete
-    if db_resource.submitted_by != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this resource")
+    def delete():
+        db_resource = db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first()
+        if not db_resource:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        
+        # Check if user is submitter or has permission to delete
+        if db_resource.submitted_by != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this resource")
+        
+        was_public = db_resource.is_approved
+        db.delete(db_resource)
+        db.commit()
+        return was_public
     
-    db.delete(db_resource)
-    db.commit()
+    if await run_in_threadpool(delete):
+        await republish_resource_snapshot()
     return {"message": "Resource deleted successfully"}
 
 # Voting endpoints
+def _cast_resource_vote(db: Session, user_id: UUID, resource_id: UUID, vote_type: str):
+    """Record a vote and refresh the Wilson score; None if the resource is gone."""
+    counts = cast_vote(db, user_id, "resource", resource_id, vote_type)
+    if counts is None:
+        db.rollback()
+        return None
+    refresh_wilson_scores_for(db, [resource_id])
+    db.commit()
+    return counts
+
 @router.post("/resources/{resource_id}/vote")
-def vote_resource(
+async def vote_resource(
     resource_id: UUID,
-    vote_type: str,  # "up" or "down"
+    vote_type: str,  # "up", "down" or "none" to retract
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_resource = db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first()
-    if not db_resource:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    if vote_type == "up":
-        db_resource.upvotes += 1
-    elif vote_type == "down":
-        db_resource.downvotes += 1
-    else:
-        raise HTTPException(status_code=400, detail="Invalid vote type. Use 'up' or 'down'")
+    if vote_type not in VOTE_VALUES:
+        raise HTTPException(status_code=400, detail="Invalid vote type. Use 'up', 'down' or 'none'")
     
-    db.commit()
-    db.refresh(db_resource)
-    return {"message": "Vote recorded successfully", "upvotes": db_resource.upvotes, "downvotes": db_resource.downvotes}
+    counts = None
+    if settings.VOTE_BUFFER_ENABLED:
+        db_resource = await run_in_threadpool(db.query(SharedResourceModel).filter(SharedResourceModel.id == resource_id).first)
+        if not db_resource:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        counts = await buffer_vote(db, current_user.id, "resource", db_resource, vote_type)
+    if counts is None:
+        # Buffering is off or Redis is unavailable: write the ledger directly
+        counts = await run_in_threadpool(_cast_resource_vote, db, current_user.id, resource_id, vote_type)
+        if counts is None:
+            raise HTTPException(status_code=404, detail="Resource not found")
+    upvotes, downvotes = counts
+    return {"message": "Vote recorded successfully", "upvotes": upvotes, "downvotes": downvotes}
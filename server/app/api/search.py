@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.schemas.search import SearchResult
+from app.services.site_search import SEARCH_KINDS, search
+from typing import List, Optional
+
+router = APIRouter()
+
+@router.get("/search", response_model=List[SearchResult])
+def search_site(
+    q: str = Query(..., min_length=2, max_length=100),
+    types: Optional[str] = Query(None, description="Comma-separated subset of resource, study_group, user"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Typo-tolerant prefix search for autocomplete.
+
+    Covers approved resources, public study groups and active users,
+    best matches first.
+    """
+    kinds = SEARCH_KINDS
+    if types:
+        kinds = tuple(kind.strip() for kind in types.split(",") if kind.strip())
+        unknown = set(kinds) - set(SEARCH_KINDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+    if not q.strip():
+        return []
+    
+    return search(db, q, kinds, limit)
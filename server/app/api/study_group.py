@@ -1,20 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, false, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.models.study_group import StudyGroup as StudyGroupModel, StudyGroupMember as StudyGroupMemberModel
+from app.core.dependencies import get_optional_user
+from app.core.redis import redis_manager
+from app.core.scheduler import task_queue
+from app.models.study_group import StudyGroup as StudyGroupModel, StudyGroupMember as StudyGroupMemberModel, StudyGroupInvitation as StudyGroupInvitationModel
 from app.models.user import User
-from app.schemas.study_group import StudyGroupCreate, StudyGroupUpdate, StudyGroupMemberCreate, StudyGroupMemberUpdate, StudyGroup, StudyGroupMember
+from app.schemas.study_group import StudyGroupCreate, StudyGroupUpdate, StudyGroupMemberCreate, StudyGroupMemberUpdate, StudyGroup, StudyGroupMember, StudyGroupBroadcastCreate, StudyGroupBroadcastStatus, StudyGroupDirectoryEntry, StudyGroupBulkMembers, StudyGroupBulkResult, StudyGroupInvitation
+from app.services.group_broadcast import broadcast_progress_key, BROADCAST_PROGRESS_TTL
+from app.services.group_membership import add_members, invite_users, release_seats, remove_invitations, remove_members, reserve_seats, resolve_usernames
+from app.services.group_roles import MANAGER_ROLES, forget_member_roles, get_member_role
 from app.api.auth import get_current_user
-from typing import List
-from uuid import UUID
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, keyset_after
+from typing import List, Optional
+import structlog
+from datetime import datetime
+from uuid import UUID, uuid4
+
+logger = structlog.get_logger()
 
 router = APIRouter()
 
+async def get_group_role(
+    group_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> Optional[str]:
+    """The caller's role in the path's study group (None if not a member).
+
+    Resolved once per request and cached per group in Redis.
+    """
+    return await get_member_role(db, group_id, current_user.id)
+
 # Study Group endpoints
-@router.get("/study-groups", response_model=List[StudyGroup])
-def get_study_groups(db: Session = Depends(get_db)):
-    groups = db.query(StudyGroupModel).all()
-    return groups
+@router.get("/study-groups", response_model=List[StudyGroupDirectoryEntry])
+def get_study_groups(
+    response: Response,
+    is_public: Optional[bool] = None,
+    is_location_based: Optional[bool] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user)
+):
+    """Directory of study groups, newest first, with sizes and the caller's membership.
+
+    Lists public groups plus, for signed-in callers, the private groups
+    they created or belong to. One query: member counts come from the denormalized column, the
+    creator's username from a join and `is_member` from an EXISTS probe.
+    Keyset-paginated: pass the X-Next-Cursor header back as `cursor`.
+    """
+    columns = (StudyGroupModel.created_at, StudyGroupModel.id)
+    if current_user:
+        is_member = exists().where(
+            StudyGroupMemberModel.group_id == StudyGroupModel.id,
+            StudyGroupMemberModel.user_id == current_user.id
+        )
+        visible = or_(StudyGroupModel.is_public.is_(True), StudyGroupModel.creator_id == current_user.id, is_member)
+    else:
+        is_member = false()
+        visible = StudyGroupModel.is_public.is_(True)
+    
+    query = (
+        db.query(StudyGroupModel, User.username, is_member.label("is_member"))
+        .outerjoin(User, User.id == StudyGroupModel.creator_id)
+        .filter(visible)
+    )
+    if is_public is not None:
+        query = query.filter(StudyGroupModel.is_public.is_(is_public))
+    if is_location_based is not None:
+        query = query.filter(StudyGroupModel.is_location_based.is_(is_location_based))
+    if cursor:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, datetime.fromisoformat, UUID)))
+    
+    rows = query.order_by(*[column.desc() for column in columns]).limit(limit).all()
+    
+    if len(rows) == limit:
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return [
+        StudyGroupDirectoryEntry(
+            **StudyGroup.model_validate(group).model_dump(),
+            creator_username=creator_username,
+            is_full=group.max_members is not None and group.member_count >= group.max_members,
+            is_member=bool(member)
+        )
+        for group, creator_username, member in rows
+    ]
 
 @router.post("/study-groups", response_model=StudyGroup)
 def create_study_group(
@@ -28,11 +103,11 @@ def create_study_group(
         creator_id=current_user.id,
         is_location_based=group.is_location_based,
         max_members=group.max_members,
-        is_public=group.is_public
+        is_public=group.is_public,
+        member_count=1
     )
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    db.flush()
     
     # Automatically add creator as admin member
     db_member = StudyGroupMemberModel(
@@ -42,6 +117,7 @@ def create_study_group(
     )
     db.add(db_member)
     db.commit()
+    db.refresh(db_group)
     
     return db_group
 
@@ -57,19 +133,15 @@ def update_study_group(
     group_id: UUID,
     group: StudyGroupUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    role: Optional[str] = Depends(get_group_role)
 ):
     db_group = db.query(StudyGroupModel).filter(StudyGroupModel.id == group_id).first()
     if not db_group:
         raise HTTPException(status_code=404, detail="Study group not found")
     
     # Check if user is creator or admin
-    member = db.query(StudyGroupMemberModel).filter(
-        StudyGroupMemberModel.group_id == group_id,
-        StudyGroupMemberModel.user_id == current_user.id
-    ).first()
-    
-    if not member or member.role not in ["admin", "moderator"]:
+    if role not in MANAGER_ROLES:
         raise HTTPException(status_code=403, detail="Not authorized to edit this study group")
     
     for key, value in group.dict(exclude_unset=True).items():
@@ -80,21 +152,25 @@ def update_study_group(
     return db_group
 
 @router.delete("/study-groups/{group_id}")
-def delete_study_group(
+async def delete_study_group(
     group_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_group = db.query(StudyGroupModel).filter(StudyGroupModel.id == group_id).first()
-    if not db_group:
-        raise HTTPException(status_code=404, detail="Study group not found")
-    
-    # Check if user is creator
-    if db_group.creator_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this study group")
+    def delete():
+        db_group = db.query(StudyGroupModel).filter(StudyGroupModel.id == group_id).first()
+        if not db_group:
+            raise HTTPException(status_code=404, detail="Study group not found")
+        
+        # Check if user is creator
+        if db_group.creator_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this study group")
+        
+        db.delete(db_group)
+        db.commit()
     
-    db.delete(db_group)
-    db.commit()
+    await run_in_threadpool(delete)
+    await forget_member_roles(group_id)
     return {"message": "Study group deleted successfully"}
 
 # Study Group Member endpoints
@@ -104,96 +180,362 @@ def get_study_group_members(group_id: UUID, db: Session = Depends(get_db)):
     return members
 
 @router.post("/study-groups/{group_id}/join", response_model=StudyGroupMember)
-def join_study_group(
+async def join_study_group(
     group_id: UUID,
     member: StudyGroupMemberCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Verify group exists
-    db_group = db.query(StudyGroupModel).filter(StudyGroupModel.id == group_id).first()
-    if not db_group:
-        raise HTTPException(status_code=404, detail="Study group not found")
-    
-    # Check if user is already a member
-    existing_member = db.query(StudyGroupMemberModel).filter(
-        StudyGroupMemberModel.group_id == group_id,
-        StudyGroupMemberModel.user_id == current_user.id
-    ).first()
-    
-    if existing_member:
-        raise HTTPException(status_code=400, detail="Already a member of this study group")
-    
-    # Check if group is full
-    member_count = db.query(StudyGroupMemberModel).filter(StudyGroupMemberModel.group_id == group_id).count()
-    if member_count >= db_group.max_members:
-        raise HTTPException(status_code=400, detail="Study group is full")
+    def join():
+        db_group = db.query(StudyGroupModel.is_public).filter(StudyGroupModel.id == group_id).first()
+        if not db_group:
+            raise HTTPException(status_code=404, detail="Study group not found")
+        
+        # Joining accepts any pending invitation; private groups require one
+        invited = remove_invitations(db, group_id, [current_user.id])
+        if not invited and not db_group.is_public:
+            db.rollback()
+            raise HTTPException(status_code=403, detail="This study group is invite-only")
+        
+        # Claim a seat atomically
+        if reserve_seats(db, group_id) is None:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Study group is full")
+        
+        db_member = StudyGroupMemberModel(
+            group_id=group_id,
+            user_id=current_user.id,
+            role="member"
+        )
+        db.add(db_member)
+        try:
+            db.commit()
+        except IntegrityError:
+            # The unique (group_id, user_id) constraint; rolling back also frees the seat
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Already a member of this study group")
+        db.refresh(db_member)
+        return db_member
     
-    db_member = StudyGroupMemberModel(
-        group_id=group_id,
-        user_id=current_user.id,
-        role="member"
-    )
-    db.add(db_member)
-    db.commit()
-    db.refresh(db_member)
+    db_member = await run_in_threadpool(join)
+    await forget_member_roles(group_id, current_user.id)
     return db_member
 
 @router.put("/study-groups/{group_id}/members/{member_id}", response_model=StudyGroupMember)
-def update_study_group_member(
+async def update_study_group_member(
     group_id: UUID,
     member_id: UUID,
     member: StudyGroupMemberUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    role: Optional[str] = Depends(get_group_role)
 ):
-    db_member = db.query(StudyGroupMemberModel).filter(StudyGroupMemberModel.id == member_id).first()
-    if not db_member:
-        raise HTTPException(status_code=404, detail="Member not found")
+    def update():
+        db_member = db.query(StudyGroupMemberModel).filter(
+            StudyGroupMemberModel.id == member_id,
+            StudyGroupMemberModel.group_id == group_id
+        ).first()
+        if not db_member:
+            raise HTTPException(status_code=404, detail="Member not found")
+        
+        # Check if user is admin or moderator
+        if role not in MANAGER_ROLES:
+            raise HTTPException(status_code=403, detail="Not authorized to update member roles")
+        
+        # Prevent users from changing their own role to admin
+        if db_member.user_id == current_user.id and member.role == "admin":
+            raise HTTPException(status_code=403, detail="Cannot change your own role to admin")
+        
+        for key, value in member.dict(exclude_unset=True).items():
+            setattr(db_member, key, value)
+        
+        db.commit()
+        db.refresh(db_member)
+        return db_member
     
-    # Check if user is admin or moderator
-    current_member = db.query(StudyGroupMemberModel).filter(
-        StudyGroupMemberModel.group_id == group_id,
-        StudyGroupMemberModel.user_id == current_user.id
-    ).first()
+    db_member = await run_in_threadpool(update)
+    await forget_member_roles(db_member.group_id, db_member.user_id)
+    return db_member
+
+@router.delete("/study-groups/{group_id}/members/{member_id}")
+async def remove_study_group_member(
+    group_id: UUID,
+    member_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    role: Optional[str] = Depends(get_group_role)
+):
+    def remove():
+        db_member = db.query(StudyGroupMemberModel).filter(
+            StudyGroupMemberModel.id == member_id,
+            StudyGroupMemberModel.group_id == group_id
+        ).first()
+        if not db_member:
+            raise HTTPException(status_code=404, detail="Member not found")
+        
+        # Check if user is admin or moderator, or if they're removing themselves
+        if role is None:
+            raise HTTPException(status_code=403, detail="Not a member of this study group")
+        
+        if db_member.user_id != current_user.id and role not in MANAGER_ROLES:
+            raise HTTPException(status_code=403, detail="Not authorized to remove other members")
+        
+        removed_user_id = db_member.user_id
+        db.delete(db_member)
+        db.flush()
+        release_seats(db, group_id)
+        db.commit()
+        return removed_user_id
+    
+    removed_user_id = await run_in_threadpool(remove)
+    await forget_member_roles(group_id, removed_user_id)
+    return {"message": "Member removed successfully"}
+
+# Bulk membership endpoints
+async def notify_group_users(group: StudyGroupModel, user_ids: List[UUID], notification_type: str, message: str):
+    """Queue one notification task covering every affected user."""
+    if not user_ids:
+        return
+    queued = await task_queue.enqueue_task("notifications", {
+        "type": "send_notification",
+        "data": {
+            "user_ids": [str(user_id) for user_id in user_ids],
+            "group_id": str(group.id),
+            "type": notification_type,
+            "message": message
+        }
+    })
+    if not queued:
+        logger.warning("Group notification not queued", group_id=str(group.id), recipients=len(user_ids))
+
+def _get_group_or_404(db: Session, group_id: UUID) -> StudyGroupModel:
+    db_group = db.query(StudyGroupModel).filter(StudyGroupModel.id == group_id).first()
+    if not db_group:
+        raise HTTPException(status_code=404, detail="Study group not found")
+    return db_group
+
+@router.post("/study-groups/{group_id}/members/bulk", response_model=StudyGroupBulkResult)
+async def add_study_group_members(
+    group_id: UUID,
+    bulk: StudyGroupBulkMembers,
+    db: Session = Depends(get_db),
+    role: Optional[str] = Depends(get_group_role)
+):
+    """Add many users as members in one multi-row insert.
+
+    Either every new member fits within max_members or nobody is added.
+    Existing members and unknown usernames are reported as skipped.
+    """
+    def add():
+        db_group = _get_group_or_404(db, group_id)
+        if role not in MANAGER_ROLES:
+            raise HTTPException(status_code=403, detail="Not authorized to add members to this study group")
+        
+        user_ids = resolve_usernames(db, bulk.usernames)
+        added = add_members(db, group_id, list(user_ids.values()))
+        if added is None:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Study group does not have room for all of these users")
+        db.commit()
+        db.refresh(db_group)
+        return db_group, user_ids, added
     
-    if not current_member or current_member.role not in ["admin", "moderator"]:
-        raise HTTPException(status_code=403, detail="Not authorized to update member roles")
+    db_group, user_ids, added = await run_in_threadpool(add)
+    await forget_member_roles(group_id, *added)
+    await notify_group_users(db_group, added, "group_member_added", f"You were added to the study group {db_group.name}")
+    added_set = set(added)
+    return StudyGroupBulkResult(
+        usernames=[name for name, user_id in user_ids.items() if user_id in added_set],
+        skipped=[name for name in bulk.usernames if user_ids.get(name) not in added_set]
+    )
+
+@router.post("/study-groups/{group_id}/members/bulk-remove", response_model=StudyGroupBulkResult)
+async def remove_study_group_members(
+    group_id: UUID,
+    bulk: StudyGroupBulkMembers,
+    db: Session = Depends(get_db),
+    role: Optional[str] = Depends(get_group_role)
+):
+    """Remove many members in one delete. The group's creator is never removed."""
+    def remove():
+        db_group = _get_group_or_404(db, group_id)
+        if role not in MANAGER_ROLES:
+            raise HTTPException(status_code=403, detail="Not authorized to remove members from this study group")
+        
+        user_ids = resolve_usernames(db, bulk.usernames)
+        removable = [user_id for user_id in user_ids.values() if user_id != db_group.creator_id]
+        removed = remove_members(db, group_id, removable)
+        db.commit()
+        db.refresh(db_group)
+        return db_group, user_ids, removed
     
-    # Prevent users from changing their own role to admin
-    if db_member.user_id == current_user.id and member.role == "admin":
-        raise HTTPException(status_code=403, detail="Cannot change your own role to admin")
+    db_group, user_ids, removed = await run_in_threadpool(remove)
+    await forget_member_roles(group_id, *removed)
+    await notify_group_users(db_group, removed, "group_member_removed", f"You were removed from the study group {db_group.name}")
+    removed_set = set(removed)
+    return StudyGroupBulkResult(
+        usernames=[name for name, user_id in user_ids.items() if user_id in removed_set],
+        skipped=[name for name in bulk.usernames if user_ids.get(name) not in removed_set]
+    )
+
+@router.post("/study-groups/{group_id}/invitations", response_model=StudyGroupBulkResult)
+async def invite_to_study_group(
+    group_id: UUID,
+    bulk: StudyGroupBulkMembers,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    role: Optional[str] = Depends(get_group_role)
+):
+    """Invite many users to join, recorded in one insert and sent as one batched notification.
+
+    Members and users with a pending invitation are skipped. Invitees
+    accept by joining the group, which private groups otherwise refuse.
+    """
+    def invite():
+        db_group = _get_group_or_404(db, group_id)
+        if role not in MANAGER_ROLES:
+            raise HTTPException(status_code=403, detail="Not authorized to invite users to this study group")
+        
+        user_ids = resolve_usernames(db, bulk.usernames)
+        invited = invite_users(db, group_id, list(user_ids.values()), current_user.id)
+        db.commit()
+        db.refresh(db_group)
+        return db_group, user_ids, invited
     
-    for key, value in member.dict(exclude_unset=True).items():
-        setattr(db_member, key, value)
+    db_group, user_ids, invited = await run_in_threadpool(invite)
+    await notify_group_users(db_group, invited, "group_invitation", f"You are invited to join the study group {db_group.name}")
+    invited_set = set(invited)
+    return StudyGroupBulkResult(
+        usernames=[name for name, user_id in user_ids.items() if user_id in invited_set],
+        skipped=[name for name in bulk.usernames if user_ids.get(name) not in invited_set]
+    )
+
+@router.get("/study-groups/{group_id}/invitations", response_model=List[StudyGroupInvitation])
+def get_study_group_invitations(
+    group_id: UUID,
+    db: Session = Depends(get_db),
+    role: Optional[str] = Depends(get_group_role)
+):
+    """Pending invitations to a group, newest first (managers only)."""
+    if role not in MANAGER_ROLES:
+        raise HTTPException(status_code=403, detail="Not authorized to view invitations for this study group")
     
-    db.commit()
-    db.refresh(db_member)
-    return db_member
+    rows = (
+        db.query(StudyGroupInvitationModel, User.username)
+        .join(User, User.id == StudyGroupInvitationModel.user_id)
+        .filter(StudyGroupInvitationModel.group_id == group_id)
+        .order_by(StudyGroupInvitationModel.created_at.desc())
+        .all()
+    )
+    return [
+        StudyGroupInvitation(**StudyGroupInvitation.model_validate(invitation).model_dump(exclude={"username"}), username=username)
+        for invitation, username in rows
+    ]
 
-@router.delete("/study-groups/{group_id}/members/{member_id}")
-def remove_study_group_member(
+@router.delete("/study-groups/{group_id}/invitations/{user_id}")
+async def revoke_study_group_invitation(
     group_id: UUID,
-    member_id: UUID,
+    user_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    role: Optional[str] = Depends(get_group_role)
+):
+    """Withdraw an invitation (managers) or decline one (the invitee)."""
+    if user_id != current_user.id and role not in MANAGER_ROLES:
+        raise HTTPException(status_code=403, detail="Not authorized to revoke invitations for this study group")
+    
+    def revoke():
+        removed = remove_invitations(db, group_id, [user_id])
+        db.commit()
+        return removed
+    
+    if not await run_in_threadpool(revoke):
+        raise HTTPException(status_code=404, detail="Invitation not found")
+    return {"message": "Invitation removed successfully"}
+
+@router.get("/study-group-invitations", response_model=List[StudyGroupInvitation])
+def get_my_study_group_invitations(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    db_member = db.query(StudyGroupMemberModel).filter(StudyGroupMemberModel.id == member_id).first()
-    if not db_member:
-        raise HTTPException(status_code=404, detail="Member not found")
+    """The caller's pending study group invitations, newest first."""
+    rows = (
+        db.query(StudyGroupInvitationModel, StudyGroupModel.name)
+        .join(StudyGroupModel, StudyGroupModel.id == StudyGroupInvitationModel.group_id)
+        .filter(StudyGroupInvitationModel.user_id == current_user.id)
+        .order_by(StudyGroupInvitationModel.created_at.desc())
+        .all()
+    )
+    return [
+        StudyGroupInvitation(**StudyGroupInvitation.model_validate(invitation).model_dump(exclude={"group_name"}), group_name=group_name)
+        for invitation, group_name in rows
+    ]
+
+# Study Group Broadcast endpoints
+@router.post("/study-groups/{group_id}/broadcast", response_model=StudyGroupBroadcastStatus, status_code=202)
+async def broadcast_to_study_group(
+    group_id: UUID,
+    broadcast: StudyGroupBroadcastCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    role: Optional[str] = Depends(get_group_role)
+):
+    """Queue a message to every member of a study group.
+
+    The task worker fans it out with batched multi-row inserts; poll the
+    returned broadcast_id for progress.
+    """
+    await run_in_threadpool(_get_group_or_404, db, group_id)
     
-    # Check if user is admin or moderator, or if they're removing themselves
-    current_member = db.query(StudyGroupMemberModel).filter(
-        StudyGroupMemberModel.group_id == group_id,
-        StudyGroupMemberModel.user_id == current_user.id
-    ).first()
+    # Check if user is admin or moderator
+    if role not in MANAGER_ROLES:
+        raise HTTPException(status_code=403, detail="Not authorized to broadcast to this study group")
     
-    if not current_member:
-        raise HTTPException(status_code=403, detail="Not a member of this study group")
+    broadcast_id = str(uuid4())
+    progress_key = broadcast_progress_key(broadcast_id)
+    await redis_manager.set_hash(progress_key, {
+        "group_id": str(group_id),
+        "sender_id": str(current_user.id),
+        "status": "queued",
+        "total": 0,
+        "sent": 0
+    })
+    await redis_manager.expire(progress_key, BROADCAST_PROGRESS_TTL)
     
-    if current_member.id != member_id and current_member.role not in ["admin", "moderator"]:
-        raise HTTPException(status_code=403, detail="Not authorized to remove other members")
+    queued = await task_queue.enqueue_task("background_tasks", {
+        "id": broadcast_id,
+        "type": "broadcast_group_message",
+        "data": {
+            "broadcast_id": broadcast_id,
+            "group_id": str(group_id),
+            "sender_id": str(current_user.id),
+            "content": broadcast.content
+        }
+    })
+    if not queued:
+        await redis_manager.delete(progress_key)
+        raise HTTPException(status_code=503, detail="Broadcast queue unavailable, try again later")
     
-    db.delete(db_member)
-    db.commit()
-    return {"message": "Member removed successfully"}
+    return StudyGroupBroadcastStatus(broadcast_id=broadcast_id, group_id=group_id, status="queued")
+
+@router.get("/study-groups/{group_id}/broadcasts/{broadcast_id}", response_model=StudyGroupBroadcastStatus)
+async def get_broadcast_status(
+    group_id: UUID,
+    broadcast_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Progress of a broadcast, visible only to the member who sent it.
+
+    `sent` counts messages delivered so far out of `total` recipients.
+    """
+    progress = await redis_manager.get_hash(broadcast_progress_key(broadcast_id))
+    if not progress or progress.get("group_id") != str(group_id) or progress.get("sender_id") != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    
+    return StudyGroupBroadcastStatus(
+        broadcast_id=broadcast_id,
+        group_id=group_id,
+        status=progress.get("status", "queued"),
+        total=int(progress.get("total", 0)),
+        sent=int(progress.get("sent", 0))
+    )
@@ -34,6 +34,26 @@ class Settings(BaseSettings):
     TELEGRAM_BOT_TOKEN: str = ""  # Required for Telegram login
     TELEGRAM_BOT_USERNAME: str = ""  # Bot username without @
 
+    # Message archival (read messages older than this move to messages_archive)
+    MESSAGE_ARCHIVE_AFTER_DAYS: int = 180
+    MESSAGE_ARCHIVE_BATCH_SIZE: int = 1000
+
+    # Vote buffering (votes accumulate in Redis and are flushed to Postgres in batches)
+    VOTE_BUFFER_ENABLED: bool = False
+    VOTE_BUFFER_FLUSH_SECONDS: int = 5
+
+    # Forum caching (versioned cache keys are invalidated on write, so TTLs can be long)
+    FORUM_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+
+    # Link preview enrichment for shared resources (outbound HTTP from the task worker)
+    LINK_METADATA_TIMEOUT_SECONDS: float = 5.0
+    LINK_METADATA_CONCURRENCY: int = 4
+    LINK_METADATA_HOST_INTERVAL_SECONDS: float = 1.0
+
+    # Public resource library snapshot (pre-compressed JSON republished on moderation)
+    RESOURCE_SNAPSHOT_DIR: str = "snapshots"
+    RESOURCE_SNAPSHOT_REFRESH_MINUTES: int = 15
+
     # File Upload
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "uploads"
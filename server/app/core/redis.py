@@ -1,6 +1,7 @@
 import redis.asyncio as redis
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 import json
+import time
 from datetime import timedelta
 import structlog
 
@@ -12,6 +13,7 @@ class RedisManager:
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
         self.is_connected = False
+        self._scripts = {}
 
     async def connect(self):
         """Initialize Redis connection pool"""
@@ -42,6 +44,7 @@ class RedisManager:
         if self.redis_client:
             await self.redis_client.close()
             self.is_connected = False
+            self._scripts = {}
             logger.info("Redis connection closed")
 
     async def get(self, key: str) -> Optional[str]:
@@ -72,6 +75,17 @@ class RedisManager:
             logger.error("Redis set operation failed", key=key, error=str(e))
             return False
 
+    async def set_if_not_exists(self, key: str, value: str) -> bool:
+        """Set key only if it does not already exist (SET NX)"""
+        if not self.is_connected:
+            return False
+
+        try:
+            return bool(await self.redis_client.set(key, value, nx=True))
+        except Exception as e:
+            logger.error("Redis set-if-not-exists failed", key=key, error=str(e))
+            return False
+
     async def delete(self, key: str) -> bool:
         """Delete key"""
         if not self.is_connected:
@@ -176,6 +190,126 @@ class RedisManager:
             logger.error("Redis hash field get failed", key=key, field=field, error=str(e))
             return None
 
+    async def increment_hash_field(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        """Increment integer hash field"""
+        if not self.is_connected:
+            return None
+
+        try:
+            return await self.redis_client.hincrby(key, field, amount)
+        except Exception as e:
+            logger.error("Redis hash increment failed", key=key, field=field, error=str(e))
+            return None
+
+    async def publish_many(self, messages: List[Tuple[str, str]]) -> bool:
+        """Publish (channel, message) pairs in a single pipelined round trip"""
+        if not self.is_connected:
+            return False
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for channel, message in messages:
+                    pipe.publish(channel, message)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error("Redis pipelined publish failed", count=len(messages), error=str(e))
+            return False
+
+    async def get_hash_fields(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        """Get several hash fields in one call (None for missing fields)"""
+        if not self.is_connected or not fields:
+            return [None] * len(fields)
+
+        try:
+            return await self.redis_client.hmget(key, fields)
+        except Exception as e:
+            logger.error("Redis hash fields get failed", key=key, error=str(e))
+            return [None] * len(fields)
+
+    async def delete_hash_fields(self, key: str, *fields: str) -> bool:
+        """Remove hash fields"""
+        if not self.is_connected or not fields:
+            return False
+
+        try:
+            await self.redis_client.hdel(key, *fields)
+            return True
+        except Exception as e:
+            logger.error("Redis hash field delete failed", key=key, error=str(e))
+            return False
+
+    async def run_script(self, script: str, keys: List[str], args: List) -> Optional[object]:
+        """Run a Lua script atomically (cached server-side via EVALSHA)"""
+        if not self.is_connected:
+            return None
+
+        try:
+            if script not in self._scripts:
+                self._scripts[script] = self.redis_client.register_script(script)
+            return await self._scripts[script](keys=keys, args=args)
+        except Exception as e:
+            logger.error("Redis script failed", keys=keys, error=str(e))
+            return None
+
+    async def hll_add(self, key: str, *elements: str) -> Optional[bool]:
+        """Add elements to a HyperLogLog; True if its cardinality estimate changed"""
+        if not self.is_connected:
+            return None
+
+        try:
+            return bool(await self.redis_client.pfadd(key, *elements))
+        except Exception as e:
+            logger.error("Redis HyperLogLog add failed", key=key, error=str(e))
+            return None
+
+    async def hll_count(self, *keys: str) -> Optional[int]:
+        """Approximate distinct count of one HyperLogLog (or the union of several)"""
+        if not self.is_connected:
+            return None
+
+        try:
+            return await self.redis_client.pfcount(*keys)
+        except Exception as e:
+            logger.error("Redis HyperLogLog count failed", keys=keys, error=str(e))
+            return None
+
+    async def hll_count_many(self, keys: List[str]) -> List[Optional[int]]:
+        """Approximate distinct count of each HyperLogLog, pipelined in one round trip"""
+        if not self.is_connected or not keys:
+            return [None] * len(keys)
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.pfcount(key)
+                return await pipe.execute()
+        except Exception as e:
+            logger.error("Redis pipelined HyperLogLog count failed", count=len(keys), error=str(e))
+            return [None] * len(keys)
+
+    async def add_to_set(self, key: str, *members: str) -> Optional[int]:
+        """Add members to a set"""
+        if not self.is_connected:
+            return None
+
+        try:
+            return await self.redis_client.sadd(key, *members)
+        except Exception as e:
+            logger.error("Redis set add failed", key=key, error=str(e))
+            return None
+
+    async def pop_from_set(self, key: str, count: int) -> List[str]:
+        """Remove and return up to `count` random members of a set"""
+        if not self.is_connected:
+            return []
+
+        try:
+            return await self.redis_client.spop(key, count) or []
+        except Exception as e:
+            logger.error("Redis set pop failed", key=key, error=str(e))
+            return []
+
     async def push_to_list(self, key: str, *values: str) -> Optional[int]:
         """Push values to list"""
         if not self.is_connected:
@@ -187,6 +321,21 @@ class RedisManager:
             logger.error("Redis list push failed", key=key, error=str(e))
             return None
 
+    async def push_to_lists(self, entries: List[Tuple[str, str]]) -> bool:
+        """Push (list key, value) pairs in a single pipelined round trip"""
+        if not self.is_connected:
+            return False
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in entries:
+                    pipe.lpush(key, value)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error("Redis pipelined list push failed", count=len(entries), error=str(e))
+            return False
+
     async def pop_from_list(self, key: str) -> Optional[str]:
         """Pop value from list"""
         if not self.is_connected:
@@ -240,6 +389,75 @@ def cache_result(expire_minutes: int = 5):
         return wrapper
     return decorator
 
+# Versioned namespace cache
+class VersionedCache:
+    """Cache whose entries are invalidated by bumping a per-namespace version.
+
+    Every entry key embeds the namespace's current version, so a write only
+    has to INCR one key to orphan all cached reads for that namespace; the
+    orphaned entries age out through their TTL. A reader that raced a write
+    can at worst populate an entry under the old version, which nobody reads
+    any more. Because versioned keys handle invalidation, TTLs can be hours
+    long; the TTL only limits how long a lost invalidation (a failed INCR is
+    only logged) can serve stale data.
+    """
+
+    def __init__(self, redis_manager: RedisManager):
+        self.redis = redis_manager
+        self.prefix = "vcache:"
+
+    async def version(self, namespace: str) -> Optional[str]:
+        """Current version of a namespace (None if Redis is unavailable)"""
+        key = f"{self.prefix}{namespace}:version"
+        version = await self.redis.get(key)
+        if version is None:
+            # Start from a timestamp rather than 0 so a lost version key can
+            # never resurrect entries cached under an earlier version
+            await self.redis.set_if_not_exists(key, str(time.time_ns()))
+            version = await self.redis.get(key)
+        return version
+
+    def _entry_key(self, namespace: str, version: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:v{version}:{key}"
+
+    async def get_json(self, namespace: str, key: str, version: Optional[str] = None) -> Optional[Any]:
+        """Cached value under the namespace's version.
+
+        Pass a version already read with `version()` to skip reading it again.
+        """
+        version = version or await self.version(namespace)
+        if version is None:
+            return None
+        return await self.redis.get_json(self._entry_key(namespace, version, key))
+
+    async def set_json(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        expire: Optional[timedelta] = None,
+        version: Optional[str] = None
+    ) -> bool:
+        """Cache a value under the namespace's version.
+
+        Pass the version read before loading `value` so that a write landing
+        in between leaves the entry under the superseded version.
+        """
+        version = version or await self.version(namespace)
+        if version is None:
+            return False
+        return await self.redis.set_json(self._entry_key(namespace, version, key), value, expire=expire)
+
+    async def invalidate(self, namespace: str) -> bool:
+        """Orphan every cached entry in a namespace"""
+        result = await self.redis.increment(f"{self.prefix}{namespace}:version")
+        if result is None:
+            logger.warning("Versioned cache invalidation skipped", namespace=namespace)
+        return result is not None
+
+# Global versioned cache
+versioned_cache = VersionedCache(redis_manager)
+
 # Session management helpers
 class SessionManager:
     def __init__(self, redis_manager: RedisManager):
@@ -2,11 +2,21 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
+import asyncio
 import structlog
 from typing import Optional
 
 from .redis import redis_manager
 from .config import settings
+from .database import SessionLocal
+from app.services.message_archive import archive_cold_messages
+from app.services.forum_ranking import refresh_hot_scores
+from app.services.group_membership import repair_member_counts
+from app.services.resource_dedupe import merge_duplicate_resources
+from app.services.resource_snapshot import publish_resource_snapshot
+from app.services.thread_activity import repair_thread_reply_stats
+from app.services.thread_views import persist_view_counts, requeue_view_counts, take_view_counts
+from app.services.vote_buffer import apply_vote_batch, clear_vote_batch, take_vote_batch
 
 logger = structlog.get_logger()
 
@@ -87,8 +97,100 @@ class TaskScheduler:
             replace_existing=True
         )
 
+        # Move cold message history into the archive table nightly
+        self.scheduler.add_job(
+            self._archive_cold_messages,
+            trigger=CronTrigger(hour=3, minute=0),
+            id="archive_cold_messages",
+            name="Archive cold message history",
+            replace_existing=True
+        )
+
+        # Re-apply time decay to forum thread hot scores every 10 minutes
+        self.scheduler.add_job(
+            self._refresh_forum_hot_scores,
+            trigger=IntervalTrigger(minutes=10),
+            id="refresh_forum_hot_scores",
+            name="Refresh forum thread hot scores",
+            replace_existing=True
+        )
+
+        # Recompute denormalized thread reply stats nightly to correct drift
+        self.scheduler.add_job(
+            self._repair_thread_reply_stats,
+            trigger=CronTrigger(hour=3, minute=30),
+            id="repair_thread_reply_stats",
+            name="Repair thread reply stats",
+            replace_existing=True
+        )
+
+        # Recount study group members nightly to correct member_count drift
+        self.scheduler.add_job(
+            self._repair_group_member_counts,
+            trigger=CronTrigger(hour=3, minute=45),
+            id="repair_group_member_counts",
+            name="Repair study group member counts",
+            replace_existing=True
+        )
+
+        # Merge resources submitted more than once under the same normalized URL
+        self.scheduler.add_job(
+            self._merge_duplicate_resources,
+            trigger=CronTrigger(hour=4, minute=0),
+            id="merge_duplicate_resources",
+            name="Merge duplicate shared resources",
+            replace_existing=True
+        )
+
+        # Republish the public resource library snapshot (picks up vote changes)
+        self.scheduler.add_job(
+            self._publish_resource_snapshot,
+            trigger=IntervalTrigger(minutes=settings.RESOURCE_SNAPSHOT_REFRESH_MINUTES),
+            id="publish_resource_snapshot",
+            name="Publish resource library snapshot",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.utcnow()
+        )
+
+        # Persist unique-viewer snapshots from Redis HyperLogLogs every 5 minutes
+        self.scheduler.add_job(
+            self._persist_thread_view_counts,
+            trigger=IntervalTrigger(minutes=5),
+            id="persist_thread_view_counts",
+            name="Persist thread view counts",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
+        # Flush Redis-buffered votes to Postgres in batches
+        if settings.VOTE_BUFFER_ENABLED:
+            self.scheduler.add_job(
+                self._flush_vote_buffer,
+                trigger=IntervalTrigger(seconds=settings.VOTE_BUFFER_FLUSH_SECONDS),
+                id="flush_vote_buffer",
+                name="Flush buffered votes",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
         logger.info("Periodic background tasks scheduled")
 
+    @staticmethod
+    async def _run_db_job(func, *args, **kwargs):
+        """Run a synchronous database job in a worker thread with its own session"""
+        def run():
+            db = SessionLocal()
+            try:
+                return func(db, *args, **kwargs)
+            finally:
+                db.close()
+
+        return await asyncio.to_thread(run)
+
     async def _cleanup_expired_cache(self):
         """Clean up expired cache entries"""
         try:
@@ -216,6 +318,101 @@ class TaskScheduler:
         except Exception as e:
             logger.error("Redis health check error", error=str(e))
 
+    async def _archive_cold_messages(self):
+        """Move read messages past the retention window into messages_archive"""
+        try:
+            logger.debug("Starting message archive task")
+            moved = await self._run_db_job(archive_cold_messages)
+            logger.info("Message archive task completed", moved=moved)
+
+        except Exception as e:
+            logger.error("Message archive task failed", error=str(e))
+
+    async def _refresh_forum_hot_scores(self):
+        """Recompute decayed hot scores for rankable forum threads"""
+        try:
+            logger.debug("Starting forum hot score refresh")
+            updated = await self._run_db_job(refresh_hot_scores)
+            logger.info("Forum hot score refresh completed", threads=updated)
+
+        except Exception as e:
+            logger.error("Forum hot score refresh failed", error=str(e))
+
+    async def _repair_thread_reply_stats(self):
+        """Recompute reply_count/last_reply_* on threads that have drifted"""
+        try:
+            repaired = await self._run_db_job(repair_thread_reply_stats)
+            logger.info("Thread reply stats repair completed", threads=repaired)
+
+        except Exception as e:
+            logger.error("Thread reply stats repair failed", error=str(e))
+
+    async def _repair_group_member_counts(self):
+        """Recompute member_count on study groups that have drifted"""
+        try:
+            repaired = await self._run_db_job(repair_member_counts)
+            logger.info("Study group member count repair completed", groups=repaired)
+
+        except Exception as e:
+            logger.error("Study group member count repair failed", error=str(e))
+
+    async def _merge_duplicate_resources(self):
+        """Fold duplicate resources (same normalized URL) into one row each"""
+        try:
+            removed = await self._run_db_job(merge_duplicate_resources)
+            logger.info("Duplicate resource merge completed", removed=removed)
+
+        except Exception as e:
+            logger.error("Duplicate resource merge failed", error=str(e))
+
+    async def _publish_resource_snapshot(self):
+        """Render the approved resource catalogue to its pre-compressed snapshot"""
+        try:
+            digest = await self._run_db_job(publish_resource_snapshot)
+            logger.debug("Resource snapshot publish completed", digest=digest)
+
+        except Exception as e:
+            logger.error("Resource snapshot publish failed", error=str(e))
+
+    async def _persist_thread_view_counts(self):
+        """Copy PFCOUNT snapshots of recently viewed threads to the database"""
+        if not redis_manager.is_connected:
+            return
+
+        persisted = 0
+        while True:
+            counts = await take_view_counts()
+            if not counts:
+                break
+            try:
+                persisted += await self._run_db_job(persist_view_counts, counts)
+            except Exception as e:
+                await requeue_view_counts(list(counts))
+                logger.error("Thread view count persist failed", error=str(e))
+                return
+
+        if persisted:
+            logger.info("Thread view counts persisted", threads=persisted)
+
+    async def _flush_vote_buffer(self):
+        """Apply votes accumulated in Redis to the database in one transaction"""
+        try:
+            if not redis_manager.is_connected:
+                return
+
+            batch = await take_vote_batch()
+            if batch is None:
+                return
+
+            # A failed write leaves the batch in place to be retried next run;
+            # one that committed but was not cleared is skipped by its ID
+            changed = await self._run_db_job(apply_vote_batch, *batch)
+            await clear_vote_batch()
+            logger.debug("Vote buffer flushed", batch_id=batch[0], targets=changed, votes=len(batch[1]))
+
+        except Exception as e:
+            logger.error("Vote buffer flush failed", error=str(e))
+
     async def add_one_time_task(self, func, run_date: datetime, task_id: str, **kwargs):
         """Add a one-time task to be executed at a specific time"""
         if not self.scheduler:
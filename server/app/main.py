@@ -19,6 +19,8 @@ from app.api.study_group import router as study_group_router
 from app.api.resource import router as resource_router
 from app.api.about import router as about_router
 from app.api.admin import router as admin_router
+from app.api.search import router as search_router
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
 
 # Configure logging
 configure_logging(log_level="INFO", json_logs=False)
@@ -87,9 +89,9 @@ async def logging_middleware(request: Request, call_next):
 
     # Add caching headers for static content and API responses
     if request.url.path.startswith("/api/v1"):
-        # Cache API responses for 5 minutes
-        response.headers["Cache-Control"] = "public, max-age=300"
-        response.headers["ETag"] = f'"{correlation_id}"'
+        # Cache API responses for 5 minutes unless the endpoint set its own validators
+        response.headers.setdefault("Cache-Control", "public, max-age=300")
+        response.headers.setdefault("ETag", f'"{correlation_id}"')
 
     # Add correlation ID to response headers
     response.headers["X-Correlation-ID"] = correlation_id
@@ -113,6 +115,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # Include API routers
@@ -126,6 +129,7 @@ app.include_router(study_group_router, prefix="/api/v1", tags=["study-groups"])
 app.include_router(resource_router, prefix="/api/v1", tags=["resources"])
 app.include_router(about_router, prefix="/api/v1/about", tags=["about"])
 app.include_router(admin_router, prefix="/api/v1/admin", tags=["admin"])
+app.include_router(search_router, prefix="/api/v1", tags=["search"])
 
 @app.get("/")
 async def root():
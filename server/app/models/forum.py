@@ -1,10 +1,31 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, UUID, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, UUID, ForeignKey, Float, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 import uuid
 
+class PostgresComputed(Computed):
+    """Generated column expression that only Postgres can evaluate.
+
+    Other dialects (SQLite test runs) create the column as a plain,
+    always-NULL column, so `create_all` works there and search falls back
+    to app.services.forum_search.InvertedIndex.
+    """
+    inherit_cache = True
+
+@compiles(PostgresComputed)
+def _compile_postgres_computed(element, compiler, **kw):
+    return compiler.visit_computed_column(element, **kw)
+
+@compiles(PostgresComputed, "sqlite")
+def _omit_postgres_computed(element, compiler, **kw):
+    return ""
+
+# tsvector on Postgres, unused text elsewhere
+SEARCH_VECTOR = TSVECTOR().with_variant(Text(), "sqlite")
+
 class ForumCategory(Base):
     __tablename__ = "forum_categories"
     
@@ -28,13 +49,48 @@ class ForumThread(Base):
     upvotes = Column(Integer, default=0)
     downvotes = Column(Integer, default=0)
     is_pinned = Column(Boolean, default=False)
+    hot_score = Column(Float, default=0, nullable=False)  # see app.services.forum_ranking
+    # Denormalized reply activity, see app.services.thread_activity
+    reply_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_reply_at = Column(DateTime(timezone=True))
+    last_reply_author_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))
+    view_count = Column(Integer, default=0, server_default="0", nullable=False)  # see app.services.thread_views
+    # Generated by Postgres, see app.services.forum_search
+    search_vector = deferred(Column(SEARCH_VECTOR, PostgresComputed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+        persisted=True
+    )))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     category = relationship("ForumCategory", back_populates="threads")
-    author = relationship("User")
+    author = relationship("User", foreign_keys=[author_id])
     replies = relationship("ForumReply", back_populates="thread", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_forum_threads_category_pinned_hot", "category_id", "is_pinned", "hot_score"),
+        Index("ix_forum_threads_category_pinned_views", "category_id", "is_pinned", "view_count"),
+        Index("ix_forum_threads_category_created", "category_id", "created_at"),
+        Index("ix_forum_threads_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+class ThreadSubscription(Base):
+    """A user following a thread; see app.services.thread_subscriptions.
+
+    The (thread_id, user_id) primary key doubles as the subscriber index
+    walked in order when fanning out reply notifications.
+    """
+    __tablename__ = "thread_subscriptions"
+    
+    thread_id = Column(PG_UUID(as_uuid=True), ForeignKey("forum_threads.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_thread_subscriptions_user", "user_id"),
+    )
 
 class ForumReply(Base):
     __tablename__ = "forum_replies"
@@ -44,11 +100,23 @@ class ForumReply(Base):
     author_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id"))
     content = Column(Text, nullable=False)
     parent_reply_id = Column(PG_UUID(as_uuid=True), ForeignKey("forum_replies.id"))
+    path = Column(String(1024, collation="C"), nullable=False)  # see app.services.reply_tree
+    depth = Column(Integer, default=0, nullable=False)
     upvotes = Column(Integer, default=0)
     downvotes = Column(Integer, default=0)
+    search_vector = deferred(Column(SEARCH_VECTOR, PostgresComputed(
+        "setweight(to_tsvector('english', coalesce(content, '')), 'C')",
+        persisted=True
+    )))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     thread = relationship("ForumThread", back_populates="replies")
     author = relationship("User")
     parent_reply = relationship("ForumReply", remote_side=[id])
+    
+    __table_args__ = (
+        Index("ix_forum_replies_thread_path", "thread_id", "path"),
+        Index("ix_forum_replies_thread_created", "thread_id", "created_at"),
+        Index("ix_forum_replies_search_vector", "search_vector", postgresql_using="gin"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, UUID, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, UUID, ForeignKey, Float, Index, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,13 +11,31 @@ class SharedResource(Base):
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
     url = Column(String(500))
+    url_hash = Column(String(64))  # SHA-256 of the normalized URL, see app.services.resource_dedupe
     description = Column(Text)
     resource_type = Column(String(50))  # link, book, video, audio
     submitted_by = Column(PG_UUID(as_uuid=True), ForeignKey("users.id"))
     upvotes = Column(Integer, default=0)
     downvotes = Column(Integer, default=0)
     is_approved = Column(Boolean, default=False)
+    wilson_score = Column(Float, default=0, server_default="0", nullable=False)  # see app.services.resource_ranking
+    # Link preview, filled in by the task worker (see app.services.link_metadata)
+    preview_title = Column(String(255))
+    preview_description = Column(Text)
+    preview_image_url = Column(String(1000))
+    metadata_fetched_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     submitter = relationship("User")
+    
+    # Partial indexes: the public catalogue only ever reads approved rows
+    __table_args__ = (
+        Index("ix_shared_resources_approved_new", "created_at", "id", postgresql_where=text("is_approved")),
+        Index("ix_shared_resources_approved_top", text("(coalesce(upvotes, 0) - coalesce(downvotes, 0))"), "id", postgresql_where=text("is_approved")),
+        Index("ix_shared_resources_approved_wilson", "wilson_score", "id", postgresql_where=text("is_approved")),
+        Index("ix_shared_resources_url_hash", "url_hash"),
+        # pg_trgm indexes for typo-tolerant search, see app.services.site_search
+        Index("ix_shared_resources_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_shared_resources_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+    )
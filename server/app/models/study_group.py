@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, UUID, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime, UUID, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,12 +14,20 @@ class StudyGroup(Base):
     creator_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id"))
     is_location_based = Column(Boolean, default=True)
     max_members = Column(Integer, default=20)
+    member_count = Column(Integer, default=0, server_default="0", nullable=False)  # see app.services.group_membership
     is_public = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     creator = relationship("User")
     members = relationship("StudyGroupMember", back_populates="group", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Keyset order of the group directory
+        Index("ix_study_groups_created", "created_at", "id"),
+        # pg_trgm index for typo-tolerant search, see app.services.site_search
+        Index("ix_study_groups_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
 class StudyGroupMember(Base):
     __tablename__ = "study_group_members"
@@ -33,3 +41,23 @@ class StudyGroupMember(Base):
     # Relationships
     group = relationship("StudyGroup", back_populates="members")
     user = relationship("User")
+    
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", name="uq_study_group_members_group_user"),
+    )
+
+class StudyGroupInvitation(Base):
+    """A pending invitation to join a study group; see app.services.group_membership.
+
+    Joining consumes it. Private groups can only be joined with one.
+    """
+    __tablename__ = "study_group_invitations"
+    
+    group_id = Column(PG_UUID(as_uuid=True), ForeignKey("study_groups.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    invited_by = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_study_group_invitations_user", "user_id"),
+    )
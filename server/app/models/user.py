@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, UUID, ForeignKey, Integer, DECIMAL, BigInteger
+from sqlalchemy import Column, String, Boolean, DateTime, Text, UUID, ForeignKey, Integer, DECIMAL, BigInteger, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -32,6 +32,11 @@ class User(Base):
     sent_messages = relationship("Message", foreign_keys="Message.sender_id", back_populates="sender")
     received_messages = relationship("Message", foreign_keys="Message.recipient_id", back_populates="recipient")
 
+    # pg_trgm index for typo-tolerant search, see app.services.site_search
+    __table_args__ = (
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+    )
+
 class UserLocation(Base):
     __tablename__ = "user_locations"
 
@@ -61,4 +66,30 @@ class Message(Base):
     
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
-    recipient = relationship("User", foreign_keys=[recipient_id], back_populates="received_messages")
\ No newline at end of file
+    recipient = relationship("User", foreign_keys=[recipient_id], back_populates="received_messages")
+
+    __table_args__ = (
+        Index("ix_messages_sender_created", "sender_id", "created_at"),
+        Index("ix_messages_recipient_created", "recipient_id", "created_at"),
+    )
+
+class ArchivedMessage(Base):
+    """Cold message history moved out of `messages` by the archive job.
+
+    Mirrors the Message columns so archived rows serialize with the same
+    schema and can be merged into paginated history reads.
+    """
+    __tablename__ = "messages_archive"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    sender_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    recipient_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    content = Column(Text, nullable=False)
+    is_read = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_messages_archive_sender_created", "sender_id", "created_at"),
+        Index("ix_messages_archive_recipient_created", "recipient_id", "created_at"),
+    )
\ No newline at end of file
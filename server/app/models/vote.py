@@ -0,0 +1,35 @@
+from sqlalchemy import CheckConstraint, Column, String, SmallInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Vote(Base):
+    """One row per (user, target); the source of truth for vote counters.
+
+    target_type is "thread", "reply" or "resource". Counters on the target
+    tables are maintained from changes to this ledger.
+    """
+    __tablename__ = "votes"
+    
+    user_id = Column(PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    target_type = Column(String(20), primary_key=True)
+    target_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    value = Column(SmallInteger, nullable=False)  # 1 = up, -1 = down
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_votes_target", "target_type", "target_id"),
+        CheckConstraint("value IN (-1, 1)", name="ck_votes_value"),
+    )
+
+class AppliedVoteBatch(Base):
+    """Redis vote batches already written; see app.services.vote_buffer.
+
+    Recorded in the same transaction as the counter updates, so a batch
+    that is retried after a crash between commit and cleanup is skipped.
+    """
+    __tablename__ = "applied_vote_batches"
+    
+    batch_id = Column(String(36), primary_key=True)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -25,6 +25,18 @@ class ForumCategoryInDB(ForumCategoryBase):
 class ForumCategory(ForumCategoryInDB):
     pass
 
+class ForumLatestThread(BaseModel):
+    id: UUID
+    title: str
+    author_id: Optional[UUID] = None
+    author_username: Optional[str] = None
+    created_at: datetime
+
+class ForumCategoryOverview(ForumCategory):
+    thread_count: int = 0
+    reply_count: int = 0
+    latest_thread: Optional[ForumLatestThread] = None
+
 # Forum Thread schemas
 class ForumThreadBase(BaseModel):
     title: str
@@ -71,6 +83,11 @@ class ForumThreadInDB(ForumThreadBase):
     author_id: UUID
     upvotes: int = 0
     downvotes: int = 0
+    hot_score: float = 0
+    reply_count: int = 0
+    last_reply_at: Optional[datetime] = None
+    last_reply_author_id: Optional[UUID] = None
+    view_count: int = 0
     created_at: datetime
     updated_at: datetime
     
@@ -80,6 +97,9 @@ class ForumThreadInDB(ForumThreadBase):
 class ForumThread(ForumThreadInDB):
     pass
 
+class ForumThreadSearchResult(ForumThread):
+    rank: float
+
 # Forum Reply schemas
 class ForumReplyBase(BaseModel):
     content: str
@@ -105,6 +125,8 @@ class ForumReplyUpdate(BaseModel):
 class ForumReplyInDB(ForumReplyBase):
     id: UUID
     author_id: UUID
+    path: str
+    depth: int = 0
     upvotes: int = 0
     downvotes: int = 0
     created_at: datetime
@@ -114,3 +136,13 @@ class ForumReplyInDB(ForumReplyBase):
 
 class ForumReply(ForumReplyInDB):
     pass
+
+class ForumReplyNode(ForumReply):
+    child_count: int = 0
+    has_more_children: bool = False
+    children_cursor: Optional[str] = None
+    children: List['ForumReplyNode'] = []
+
+class ForumReplyTree(BaseModel):
+    replies: List[ForumReplyNode]
+    next_cursor: Optional[str] = None
@@ -38,6 +38,11 @@ class SharedResourceInDB(SharedResourceBase):
     upvotes: int = 0
     downvotes: int = 0
     is_approved: bool = False
+    wilson_score: float = 0
+    preview_title: Optional[str] = None
+    preview_description: Optional[str] = None
+    preview_image_url: Optional[str] = None
+    metadata_fetched_at: Optional[datetime] = None
     created_at: datetime
     
     class Config:
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+# Site search schemas
+class SearchResult(BaseModel):
+    kind: str  # resource, study_group, user
+    id: UUID
+    label: str
+    detail: Optional[str] = None
+    score: float
+    
+    class Config:
+        from_attributes = True
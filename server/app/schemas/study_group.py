@@ -30,6 +30,7 @@ class StudyGroupUpdate(BaseModel):
 class StudyGroupInDB(StudyGroupBase):
     id: UUID
     creator_id: UUID
+    member_count: int = 0
     created_at: datetime
     
     class Config:
@@ -38,6 +39,11 @@ class StudyGroupInDB(StudyGroupBase):
 class StudyGroup(StudyGroupInDB):
     pass
 
+class StudyGroupDirectoryEntry(StudyGroup):
+    creator_username: Optional[str] = None
+    is_full: bool = False
+    is_member: bool = False
+
 # Study Group Member schemas
 class StudyGroupMemberBase(BaseModel):
     group_id: UUID
@@ -59,3 +65,51 @@ class StudyGroupMemberInDB(StudyGroupMemberBase):
 
 class StudyGroupMember(StudyGroupMemberInDB):
     pass
+
+# Study Group Broadcast schemas
+class StudyGroupBroadcastCreate(BaseModel):
+    content: str
+    
+    @validator('content')
+    def validate_content(cls, v):
+        if len(v.strip()) == 0:
+            raise ValueError('Broadcast content cannot be empty')
+        if len(v) > 5000:
+            raise ValueError('Broadcast content cannot exceed 5000 characters')
+        return v
+
+class StudyGroupBroadcastStatus(BaseModel):
+    broadcast_id: str
+    group_id: UUID
+    status: str  # queued, running, completed, failed
+    total: int = 0
+    sent: int = 0
+
+# Bulk membership schemas
+class StudyGroupBulkMembers(BaseModel):
+    usernames: List[str]
+    
+    @validator('usernames')
+    def validate_usernames(cls, v):
+        usernames = list(dict.fromkeys(name.strip() for name in v if name.strip()))
+        if not usernames:
+            raise ValueError('At least one username is required')
+        if len(usernames) > 200:
+            raise ValueError('Cannot process more than 200 users at once')
+        return usernames
+
+class StudyGroupBulkResult(BaseModel):
+    usernames: List[str]  # users added, removed or invited
+    skipped: List[str] = []  # unknown users, or no change needed
+
+# Study Group Invitation schemas
+class StudyGroupInvitation(BaseModel):
+    group_id: UUID
+    user_id: UUID
+    invited_by: Optional[UUID] = None
+    created_at: datetime
+    group_name: Optional[str] = None
+    username: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
@@ -193,6 +193,20 @@ class MessageInDB(MessageBase):
 class Message(MessageInDB):
     pass
 
+class MessageUser(BaseModel):
+    """Public profile fields embedded in expanded message lists"""
+    id: UUID
+    username: str
+    telegram_photo_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class MessageListExpanded(BaseModel):
+    """Messages plus a deduplicated map of the users they reference"""
+    messages: List[Message]
+    users: Dict[str, MessageUser]
+
 # Token schemas
 class Token(BaseModel):
     access_token: str
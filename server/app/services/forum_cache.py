@@ -0,0 +1,21 @@
+"""Versioned cache namespaces for forum reads.
+
+Category listings and the overview are cached through
+app.core.redis.VersionedCache. Every write path that changes them, in the
+forum API and the admin API alike, calls these helpers after committing.
+"""
+from app.core.redis import versioned_cache
+from app.services.forum_overview import OVERVIEW_CACHE_NAMESPACE
+
+CATEGORIES_CACHE_NAMESPACE = "forum:categories"
+
+
+async def invalidate_category_caches() -> None:
+    """Orphan cached category listings and the overview after a category write."""
+    await versioned_cache.invalidate(CATEGORIES_CACHE_NAMESPACE)
+    await versioned_cache.invalidate(OVERVIEW_CACHE_NAMESPACE)
+
+
+async def invalidate_overview_cache() -> None:
+    """Orphan the cached overview after a thread or reply write."""
+    await versioned_cache.invalidate(OVERVIEW_CACHE_NAMESPACE)
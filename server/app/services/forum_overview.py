@@ -0,0 +1,127 @@
+"""Per-category forum overview for the community page.
+
+One query returns every category with its thread count, reply count and
+newest thread: thread counts come from a single GROUP BY, reply counts sum
+the denormalized `ForumThread.reply_count`, and the newest thread is a
+LATERAL top-1 per category served by the (category_id, created_at) index.
+
+Databases without LATERAL (SQLite test runs) pick the newest thread with
+a row_number() window instead; the result has the same shape.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+from app.models.forum import ForumCategory, ForumThread
+from app.models.user import User
+
+# Versioned cache namespace, bumped by every write that changes the overview
+OVERVIEW_CACHE_NAMESPACE = "forum:overview"
+
+_LATEST_ORDER = (ForumThread.created_at.desc(), ForumThread.id.desc())
+
+
+def _thread_stats():
+    return (
+        select(
+            ForumThread.category_id.label("category_id"),
+            func.count(ForumThread.id).label("thread_count"),
+            func.coalesce(func.sum(ForumThread.reply_count), 0).label("reply_count")
+        )
+        .group_by(ForumThread.category_id)
+        .subquery()
+    )
+
+
+def _latest_thread_columns():
+    return (
+        ForumThread.id,
+        ForumThread.title,
+        ForumThread.author_id,
+        User.username.label("author_username"),
+        ForumThread.created_at
+    )
+
+
+def _overview_rows(db: Session, stmt) -> List[Dict[str, Any]]:
+    overview = []
+    for category, thread_count, reply_count, *latest_row in db.execute(stmt).all():
+        latest_id, title, author_id, author_username, created_at = latest_row
+        overview.append({
+            "id": category.id,
+            "name": category.name,
+            "description": category.description,
+            "display_order": category.display_order,
+            "created_at": category.created_at,
+            "thread_count": thread_count,
+            "reply_count": int(reply_count),
+            "latest_thread": {
+                "id": latest_id,
+                "title": title,
+                "author_id": author_id,
+                "author_username": author_username,
+                "created_at": created_at,
+            } if latest_id else None,
+        })
+    return overview
+
+
+def get_forum_overview_pg(db: Session) -> List[Dict[str, Any]]:
+    stats = _thread_stats()
+    latest = (
+        select(*_latest_thread_columns())
+        .outerjoin(User, User.id == ForumThread.author_id)
+        .where(ForumThread.category_id == ForumCategory.id)
+        .order_by(*_LATEST_ORDER)
+        .limit(1)
+        .lateral("latest_thread")
+    )
+    stmt = (
+        select(
+            ForumCategory,
+            func.coalesce(stats.c.thread_count, 0),
+            func.coalesce(stats.c.reply_count, 0),
+            latest
+        )
+        .outerjoin(stats, stats.c.category_id == ForumCategory.id)
+        .outerjoin(latest, true())
+        .order_by(ForumCategory.display_order, ForumCategory.name)
+    )
+    return _overview_rows(db, stmt)
+
+
+def get_forum_overview_fallback(db: Session) -> List[Dict[str, Any]]:
+    """Same contract as `get_forum_overview_pg`, without LATERAL."""
+    stats = _thread_stats()
+    ranked = (
+        select(
+            ForumThread.category_id.label("category_id"),
+            *_latest_thread_columns(),
+            func.row_number().over(partition_by=ForumThread.category_id, order_by=_LATEST_ORDER).label("position")
+        )
+        .outerjoin(User, User.id == ForumThread.author_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            ForumCategory,
+            func.coalesce(stats.c.thread_count, 0),
+            func.coalesce(stats.c.reply_count, 0),
+            ranked.c.id,
+            ranked.c.title,
+            ranked.c.author_id,
+            ranked.c.author_username,
+            ranked.c.created_at
+        )
+        .outerjoin(stats, stats.c.category_id == ForumCategory.id)
+        .outerjoin(ranked, (ranked.c.category_id == ForumCategory.id) & (ranked.c.position == 1))
+        .order_by(ForumCategory.display_order, ForumCategory.name)
+    )
+    return _overview_rows(db, stmt)
+
+
+def get_forum_overview(db: Session) -> List[Dict[str, Any]]:
+    if db.get_bind().dialect.name == "postgresql":
+        return get_forum_overview_pg(db)
+    return get_forum_overview_fallback(db)
@@ -0,0 +1,78 @@
+"""Hot-score ranking for forum threads.
+
+The hot score is net votes (plus a weight per reply) decayed by thread age,
+HN-style: points / (age_hours + 2) ** gravity. It is stored on ForumThread
+so category listings can read it straight off an index; writes that change
+the inputs refresh it, and a periodic job re-applies the time decay.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.forum import ForumThread
+
+logger = get_logger(__name__)
+
+HOT_GRAVITY = 1.5
+REPLY_WEIGHT = 0.5
+HOT_REFRESH_WINDOW_DAYS = 30
+
+
+def compute_hot_score(
+    upvotes: int,
+    downvotes: int,
+    reply_count: int,
+    created_at: datetime,
+    now: Optional[datetime] = None
+) -> float:
+    """Hot score for a thread; must stay in step with `_hot_score_sql`."""
+    now = now or datetime.now(timezone.utc)
+    age_hours = max((now - created_at).total_seconds() / 3600, 0)
+    points = (upvotes or 0) - (downvotes or 0) + REPLY_WEIGHT * (reply_count or 0)
+    return points / (age_hours + 2) ** HOT_GRAVITY
+
+
+def _hot_score_sql():
+    age_hours = func.greatest(func.extract("epoch", func.now() - ForumThread.created_at) / 3600, 0)
+    points = (
+        func.coalesce(ForumThread.upvotes, 0)
+        - func.coalesce(ForumThread.downvotes, 0)
+        + REPLY_WEIGHT * ForumThread.reply_count
+    )
+    return points / func.power(age_hours + 2, HOT_GRAVITY)
+
+
+def refresh_hot_scores(db: Session, window_days: int = HOT_REFRESH_WINDOW_DAYS) -> int:
+    """Re-apply time decay to every thread that can still rank.
+
+    Threads older than the window whose score has already decayed to
+    roughly zero are skipped, so the job cost tracks recent activity rather
+    than forum size. Returns the number of threads updated.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
+    result = db.execute(
+        update(ForumThread)
+        .where(or_(ForumThread.created_at >= cutoff, func.abs(ForumThread.hot_score) > 0.01))
+        .values(hot_score=_hot_score_sql(), updated_at=ForumThread.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    logger.info("Forum hot scores refreshed", threads=result.rowcount)
+    return result.rowcount
+
+
+def refresh_hot_scores_for(db: Session, thread_ids: Iterable[UUID]) -> None:
+    """Recompute hot scores for specific threads in one statement (caller commits)."""
+    thread_ids = list(thread_ids)
+    if not thread_ids:
+        return
+    db.execute(
+        update(ForumThread)
+        .where(ForumThread.id.in_(thread_ids))
+        .values(hot_score=_hot_score_sql(), updated_at=ForumThread.updated_at)
+        .execution_options(synchronize_session=False)
+    )
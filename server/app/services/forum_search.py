@@ -0,0 +1,190 @@
+"""Full-text search over forum threads and replies.
+
+On Postgres, threads and replies carry stored, generated `search_vector`
+columns (title weighted A, thread body B, reply content C) with GIN
+indexes, so Postgres keeps them current on every write. A query ranks each
+thread by ts_rank on its own vector plus its best-matching reply, and one
+index probe per table finds the candidates.
+
+Other databases (SQLite test runs) fall back to `InvertedIndex`, a small
+in-process index. It weights title, body and reply terms with ts_rank's
+default label weights but scores with its own log-damped sum, so it ranks
+matches in a similar order without reproducing Postgres' scores.
+"""
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Float, func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.forum import ForumReply, ForumThread
+from app.utils.pagination import keyset_after
+
+SEARCH_CONFIG = "english"
+
+# ts_rank's default weights for labels {A, B, C}
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.4
+REPLY_WEIGHT = 0.2
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_STOP_WORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such "
+    "that the their then there these they this to was will with".split()
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens without stop words, for the fallback index."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+class InvertedIndex:
+    """In-process term -> thread postings index used when Postgres is unavailable.
+
+    Each posting holds the thread's weighted term frequency across its
+    title, body and replies. Queries require every term to match (like
+    websearch_to_tsquery) and score each thread by the sum over query terms
+    of log1p(weighted frequency); that is not ts_rank's formula.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[UUID, float]] = defaultdict(lambda: defaultdict(float))
+        self._categories: Dict[UUID, Optional[UUID]] = {}
+
+    def _add_text(self, thread_id: UUID, text: Optional[str], weight: float) -> None:
+        for token in tokenize(text):
+            self._postings[token][thread_id] += weight
+
+    def add_thread(self, thread_id: UUID, category_id: Optional[UUID], title: str, content: str) -> None:
+        self._categories[thread_id] = category_id
+        self._add_text(thread_id, title, TITLE_WEIGHT)
+        self._add_text(thread_id, content, BODY_WEIGHT)
+
+    def add_reply(self, thread_id: UUID, content: str) -> None:
+        self._add_text(thread_id, content, REPLY_WEIGHT)
+
+    def search(
+        self,
+        query: str,
+        category_id: Optional[UUID] = None,
+        limit: int = 20
+    ) -> List[Tuple[UUID, float]]:
+        """(thread_id, score) pairs, best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+        scores: Dict[UUID, float] = {}
+        for thread_id in postings[0]:
+            if category_id is not None and self._categories.get(thread_id) != category_id:
+                continue
+            if all(thread_id in p for p in postings[1:]):
+                scores[thread_id] = sum(math.log1p(p[thread_id]) for p in postings)
+
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return ranked[:limit]
+
+    @classmethod
+    def build(cls, threads: Iterable[ForumThread], replies: Iterable[ForumReply]) -> "InvertedIndex":
+        index = cls()
+        for thread in threads:
+            index.add_thread(thread.id, thread.category_id, thread.title, thread.content)
+        for reply in replies:
+            index.add_reply(reply.thread_id, reply.content)
+        return index
+
+
+def search_threads_pg(
+    db: Session,
+    query: str,
+    category_id: Optional[UUID] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, UUID]] = None
+) -> List[Tuple[ForumThread, float]]:
+    """Ranked full-text thread search using the GIN-indexed tsvectors.
+
+    A thread's rank is its own ts_rank plus that of its best matching
+    reply. `after` is the (rank, id) of the last row of the previous page.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+
+    thread_hits = (
+        select(
+            ForumThread.id.label("thread_id"),
+            func.ts_rank(ForumThread.search_vector, tsquery).label("rank")
+        )
+        .where(ForumThread.search_vector.op("@@")(tsquery))
+    )
+    reply_hits = (
+        select(
+            ForumReply.thread_id.label("thread_id"),
+            func.max(func.ts_rank(ForumReply.search_vector, tsquery)).label("rank")
+        )
+        .where(ForumReply.search_vector.op("@@")(tsquery))
+        .group_by(ForumReply.thread_id)
+    )
+    hits = union_all(thread_hits, reply_hits).subquery()
+    ranked = (
+        select(hits.c.thread_id, func.sum(hits.c.rank).cast(Float).label("rank"))
+        .group_by(hits.c.thread_id)
+        .subquery()
+    )
+
+    stmt = (
+        select(ForumThread, ranked.c.rank)
+        .join(ranked, ranked.c.thread_id == ForumThread.id)
+        .order_by(ranked.c.rank.desc(), ForumThread.id.desc())
+        .limit(limit)
+    )
+    if category_id is not None:
+        stmt = stmt.where(ForumThread.category_id == category_id)
+    if after is not None:
+        stmt = stmt.where(keyset_after([ranked.c.rank, ForumThread.id], after))
+
+    return [(thread, rank) for thread, rank in db.execute(stmt).all()]
+
+
+def search_threads_fallback(
+    db: Session,
+    query: str,
+    category_id: Optional[UUID] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, UUID]] = None
+) -> List[Tuple[ForumThread, float]]:
+    """Same contract as `search_threads_pg`, built on an in-process index."""
+    threads_query = db.query(ForumThread)
+    replies_query = db.query(ForumReply)
+    if category_id is not None:
+        threads_query = threads_query.filter(ForumThread.category_id == category_id)
+        replies_query = replies_query.join(ForumThread).filter(ForumThread.category_id == category_id)
+
+    threads = {thread.id: thread for thread in threads_query}
+    index = InvertedIndex.build(threads.values(), replies_query)
+
+    results = []
+    for thread_id, score in index.search(query, category_id, limit=len(threads)):
+        if after is not None and (score, thread_id) >= tuple(after):
+            continue
+        results.append((threads[thread_id], score))
+        if len(results) == limit:
+            break
+    return results
+
+
+def search_threads(
+    db: Session,
+    query: str,
+    category_id: Optional[UUID] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, UUID]] = None
+) -> List[Tuple[ForumThread, float]]:
+    if db.get_bind().dialect.name == "postgresql":
+        return search_threads_pg(db, query, category_id, limit, after)
+    return search_threads_fallback(db, query, category_id, limit, after)
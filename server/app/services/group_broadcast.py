@@ -0,0 +1,117 @@
+"""Study group broadcast fan-out.
+
+A broadcast is queued once by the API and expanded by the task worker into
+multi-row INSERTs into `messages`, one statement per keyset batch of
+recipients (members ordered by user_id). Progress, including the last
+user_id delivered, lives in a Redis hash so the sender can poll it and a
+retried task resumes after the last batch instead of at a row offset that
+joins and leaves would have shifted.
+
+Each broadcast message's ID is derived from the broadcast ID and the
+recipient, so a batch whose commit landed before the worker could record
+progress is recognised and not delivered twice, however similar it is to
+another broadcast. Unread counts derive from the inserted rows themselves.
+"""
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid5
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.study_group import StudyGroupMember
+from app.models.user import Message
+
+BROADCAST_BATCH_SIZE = 500
+BROADCAST_PROGRESS_TTL = timedelta(days=1)
+
+
+def broadcast_progress_key(broadcast_id: str) -> str:
+    return f"broadcast:{broadcast_id}"
+
+
+def broadcast_message_id(broadcast_id: UUID, recipient_id: UUID) -> UUID:
+    """Stable message ID for one recipient's copy of a broadcast."""
+    return uuid5(broadcast_id, str(recipient_id))
+
+
+def count_broadcast_recipients(db: Session, group_id: UUID, sender_id: UUID) -> int:
+    """Number of members a broadcast goes to (everyone but the sender)."""
+    return db.execute(
+        select(func.count()).select_from(StudyGroupMember).where(
+            StudyGroupMember.group_id == group_id,
+            StudyGroupMember.user_id != sender_id
+        )
+    ).scalar_one()
+
+
+def get_broadcast_recipients(
+    db: Session,
+    group_id: UUID,
+    sender_id: UUID,
+    after_user_id: Optional[UUID] = None,
+    limit: int = BROADCAST_BATCH_SIZE
+) -> List[UUID]:
+    """Next `limit` member user IDs after `after_user_id`, excluding the sender."""
+    query = (
+        select(StudyGroupMember.user_id)
+        .where(StudyGroupMember.group_id == group_id, StudyGroupMember.user_id != sender_id)
+        .order_by(StudyGroupMember.user_id)
+        .limit(limit)
+    )
+    if after_user_id is not None:
+        query = query.where(StudyGroupMember.user_id > after_user_id)
+    return list(db.execute(query).scalars())
+
+
+def insert_broadcast_messages(
+    db: Session,
+    broadcast_id: UUID,
+    sender_id: UUID,
+    recipient_ids: List[UUID],
+    content: str
+) -> int:
+    """Insert one message per recipient as a single multi-row INSERT."""
+    if not recipient_ids:
+        return 0
+
+    db.execute(
+        insert(Message).values([
+            {
+                "id": broadcast_message_id(broadcast_id, recipient_id),
+                "sender_id": sender_id,
+                "recipient_id": recipient_id,
+                "content": content
+            }
+            for recipient_id in recipient_ids
+        ])
+    )
+    db.commit()
+    return len(recipient_ids)
+
+
+def deliver_broadcast_batch(
+    db: Session,
+    broadcast_id: UUID,
+    group_id: UUID,
+    sender_id: UUID,
+    content: str,
+    after_user_id: Optional[UUID] = None,
+    limit: int = BROADCAST_BATCH_SIZE
+) -> Tuple[List[UUID], int]:
+    """Deliver the next keyset batch; returns (batch user IDs, messages inserted).
+
+    Recipients who already hold this broadcast's message are skipped, which
+    makes redelivering a batch harmless.
+    """
+    batch = get_broadcast_recipients(db, group_id, sender_id, after_user_id, limit)
+    if not batch:
+        return [], 0
+
+    delivered = set(db.execute(
+        select(Message.recipient_id).where(
+            Message.id.in_([broadcast_message_id(broadcast_id, user_id) for user_id in batch])
+        )
+    ).scalars())
+    pending = [user_id for user_id in batch if user_id not in delivered]
+    return batch, insert_broadcast_messages(db, broadcast_id, sender_id, pending, content)
@@ -0,0 +1,165 @@
+"""Study group capacity accounting.
+
+StudyGroup carries a denormalized `member_count`. Joining reserves seats
+with one conditional UPDATE that only succeeds while the group has room,
+so concurrent joins serialize on the group row instead of each counting
+members and overshooting `max_members`. The membership insert then runs in
+the same transaction; a unique (group_id, user_id) constraint rejects
+duplicates, and rolling back releases the reserved seat with it.
+
+Bulk operations follow the same rule: one multi-row INSERT (skipping
+existing members) or DELETE, then one seat adjustment for the rows it
+actually touched, all in the caller's transaction. A nightly repair job
+recounts study_group_members to correct any drift.
+
+Invitations are rows in study_group_invitations. Joining (or being added
+by a manager) consumes the user's invitation; private groups can only be
+joined with one.
+"""
+import uuid
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.study_group import StudyGroup, StudyGroupInvitation, StudyGroupMember
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+
+def reserve_seats(db: Session, group_id: UUID, seats: int = 1) -> Optional[int]:
+    """Claim `seats` places in a group; returns the new member_count (caller commits).
+
+    Returns None when the group does not exist or lacks room for all of
+    them, in which case nothing is reserved.
+    """
+    return db.execute(
+        update(StudyGroup)
+        .where(StudyGroup.id == group_id, StudyGroup.member_count + seats <= StudyGroup.max_members)
+        .values(member_count=StudyGroup.member_count + seats)
+        .returning(StudyGroup.member_count)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+
+def release_seats(db: Session, group_id: UUID, seats: int = 1) -> None:
+    """Give back places after members leave or are removed (caller commits)."""
+    if seats <= 0:
+        return
+    db.execute(
+        update(StudyGroup)
+        .where(StudyGroup.id == group_id)
+        .values(member_count=func.greatest(StudyGroup.member_count - seats, 0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def resolve_usernames(db: Session, usernames: Iterable[str]) -> Dict[str, UUID]:
+    """Map usernames to active user IDs in one query; unknown names are omitted."""
+    usernames = list(usernames)
+    if not usernames:
+        return {}
+    rows = db.query(User.username, User.id).filter(User.username.in_(usernames), User.is_active.is_(True))
+    return {username: user_id for username, user_id in rows}
+
+
+def add_members(db: Session, group_id: UUID, user_ids: List[UUID], role: str = "member") -> Optional[List[UUID]]:
+    """Insert memberships for users not already in the group (caller commits).
+
+    Returns the user IDs actually added, or None if the group lacks room
+    for all of them; the caller must then roll back.
+    """
+    if not user_ids:
+        return []
+    added = db.execute(
+        pg_insert(StudyGroupMember)
+        .values([
+            {"id": uuid.uuid4(), "group_id": group_id, "user_id": user_id, "role": role}
+            for user_id in user_ids
+        ])
+        .on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+        .returning(StudyGroupMember.user_id)
+    ).scalars().all()
+    if added and reserve_seats(db, group_id, len(added)) is None:
+        return None
+    remove_invitations(db, group_id, added)
+    return added
+
+
+def remove_members(db: Session, group_id: UUID, user_ids: List[UUID]) -> List[UUID]:
+    """Delete the given users' memberships and release their seats (caller commits)."""
+    if not user_ids:
+        return []
+    removed = db.execute(
+        delete(StudyGroupMember)
+        .where(StudyGroupMember.group_id == group_id, StudyGroupMember.user_id.in_(user_ids))
+        .returning(StudyGroupMember.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    release_seats(db, group_id, len(removed))
+    return removed
+
+
+def invite_users(db: Session, group_id: UUID, user_ids: List[UUID], invited_by: UUID) -> List[UUID]:
+    """Record invitations for users who are neither members nor already invited (caller commits).
+
+    Returns the user IDs newly invited.
+    """
+    if not user_ids:
+        return []
+    members = set(db.execute(
+        select(StudyGroupMember.user_id).where(
+            StudyGroupMember.group_id == group_id,
+            StudyGroupMember.user_id.in_(user_ids)
+        )
+    ).scalars())
+    candidates = [user_id for user_id in user_ids if user_id not in members]
+    if not candidates:
+        return []
+    return db.execute(
+        pg_insert(StudyGroupInvitation)
+        .values([
+            {"group_id": group_id, "user_id": user_id, "invited_by": invited_by}
+            for user_id in candidates
+        ])
+        .on_conflict_do_nothing(index_elements=["group_id", "user_id"])
+        .returning(StudyGroupInvitation.user_id)
+    ).scalars().all()
+
+
+def remove_invitations(db: Session, group_id: UUID, user_ids: List[UUID]) -> List[UUID]:
+    """Delete the given users' invitations to a group; returns whose were deleted (caller commits)."""
+    if not user_ids:
+        return []
+    return db.execute(
+        delete(StudyGroupInvitation)
+        .where(StudyGroupInvitation.group_id == group_id, StudyGroupInvitation.user_id.in_(user_ids))
+        .returning(StudyGroupInvitation.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+
+def repair_member_counts(db: Session) -> int:
+    """Recount members for groups whose member_count has drifted.
+
+    One UPDATE with a correlated count; returns the number of groups corrected.
+    """
+    actual = (
+        select(func.count(StudyGroupMember.id))
+        .where(StudyGroupMember.group_id == StudyGroup.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(StudyGroup)
+        .where(StudyGroup.member_count != actual)
+        .values(member_count=actual)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    logger.info("Study group member counts repaired", groups=result.rowcount)
+    return result.rowcount
@@ -0,0 +1,101 @@
+"""Cached study group role lookups for authorization checks.
+
+Moderation endpoints need the caller's role in a group before doing
+anything else. Roles are cached in one Redis hash per group
+(`group_roles:{group_id}`, field = user id, value = role or a non-member
+marker), filled lazily from study_group_members. Within a request,
+FastAPI's dependency cache memoizes the lookup.
+
+Join, leave, removal and role changes call `forget_member_roles` after
+committing. That drops the affected fields and, in the same script,
+replaces the hash's generation token (`_gen`). A reader notes the token
+before loading a role from the database and only caches the result if
+the token is unchanged and the field is still absent, so a load that
+raced a membership change can never write its stale role back. The hash
+expires after GROUP_ROLES_TTL, which bounds staleness if Redis is
+unreachable when a change is forgotten.
+"""
+import uuid
+from datetime import timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.core.redis import redis_manager
+from app.models.study_group import StudyGroupMember
+
+logger = get_logger(__name__)
+
+GROUP_ROLES_PREFIX = "group_roles:"
+GROUP_ROLES_TTL = timedelta(minutes=10)
+GENERATION_FIELD = "_gen"
+NOT_A_MEMBER = "-"
+MANAGER_ROLES = ("admin", "moderator")
+
+# KEYS: roles hash; ARGV: generation seen before loading, user id, role, ttl ms, generation field
+_FILL_ROLE_SCRIPT = """
+if (redis.call('HGET', KEYS[1], ARGV[5]) or '') ~= ARGV[1] then
+    return 0
+end
+if redis.call('HSETNX', KEYS[1], ARGV[2], ARGV[3]) == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[4])
+end
+return 1
+"""
+
+# KEYS: roles hash; ARGV: new generation, ttl ms, generation field, user ids (none = all)
+_FORGET_ROLES_SCRIPT = """
+if #ARGV > 3 then
+    redis.call('HDEL', KEYS[1], unpack(ARGV, 4))
+else
+    redis.call('DEL', KEYS[1])
+end
+redis.call('HSET', KEYS[1], ARGV[3], ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def group_roles_key(group_id: UUID) -> str:
+    return f"{GROUP_ROLES_PREFIX}{group_id}"
+
+
+def _ttl_ms() -> int:
+    return int(GROUP_ROLES_TTL.total_seconds() * 1000)
+
+
+def load_member_role(db: Session, group_id: UUID, user_id: UUID) -> Optional[str]:
+    return db.query(StudyGroupMember.role).filter(
+        StudyGroupMember.group_id == group_id,
+        StudyGroupMember.user_id == user_id
+    ).scalar()
+
+
+async def get_member_role(db: Session, group_id: UUID, user_id: UUID) -> Optional[str]:
+    """The user's role in the group, or None if they are not a member."""
+    key = group_roles_key(group_id)
+    cached, generation = await redis_manager.get_hash_fields(key, [str(user_id), GENERATION_FIELD])
+    if cached is not None:
+        return None if cached == NOT_A_MEMBER else cached
+
+    role = await run_in_threadpool(load_member_role, db, group_id, user_id)
+    await redis_manager.run_script(
+        _FILL_ROLE_SCRIPT,
+        keys=[key],
+        args=[generation or "", str(user_id), role or NOT_A_MEMBER, _ttl_ms(), GENERATION_FIELD]
+    )
+    return role
+
+
+async def forget_member_roles(group_id: UUID, *user_ids: UUID) -> None:
+    """Drop cached roles after membership changes; no ids drops the whole group."""
+    result = await redis_manager.run_script(
+        _FORGET_ROLES_SCRIPT,
+        keys=[group_roles_key(group_id)],
+        args=[uuid.uuid4().hex, _ttl_ms(), GENERATION_FIELD, *(str(user_id) for user_id in user_ids)]
+    )
+    if result is None:
+        logger.warning("Group role cache invalidation failed", group_id=str(group_id))
@@ -0,0 +1,260 @@
+"""Link preview metadata for shared resources.
+
+Creating a resource with a URL enqueues an `enrich_resource_metadata` task;
+the task worker fetches the page through a `LinkEnricher` and stores the
+title, description and preview image on SharedResource, so listings never
+wait on outbound HTTP.
+
+The enricher bounds outbound work with a global concurrency limit, a
+per-fetch timeout and body cap, and a minimum interval between requests to
+the same host; the task worker runs up to that many enrichment tasks at
+once. Results are cached in Redis by normalized-URL hash, so the same link
+shared twice is fetched once. Fetchers are pluggable: anything with an
+async `fetch(url)` returning a `FetchResult` works, which keeps the
+pipeline testable against a local stand-in server.
+"""
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from uuid import UUID
+
+import httpx
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import redis_manager
+from app.models.resource import SharedResource
+from app.utils.urls import url_hash
+
+logger = get_logger(__name__)
+
+METADATA_CACHE_PREFIX = "link_meta:"
+METADATA_CACHE_TTL = timedelta(days=7)
+MAX_REDIRECTS = 5
+USER_AGENT = "AquarianGnosisLinkPreview/1.0"
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: int
+    content_type: str
+    body: bytes
+
+
+class UnsafeURLError(ValueError):
+    """The URL points somewhere the fetcher must not go (e.g. a private network)."""
+
+
+class HttpxFetcher:
+    """Fetch pages with httpx, refusing private addresses and oversized bodies.
+
+    Redirects are followed by hand so every hop is checked against the
+    address policy, and each request connects to the address that was
+    checked rather than resolving the host again. `allow_private_hosts`
+    exists for local test servers.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        max_bytes: int = 512 * 1024,
+        allow_private_hosts: bool = False
+    ):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.allow_private_hosts = allow_private_hosts
+
+    async def _resolve(self, url: str) -> str:
+        """The address to connect to for `url`'s host, after the policy check.
+
+        Every resolved address must be public (unless private hosts are
+        allowed). The fetch then connects to the returned address itself,
+        so a second lookup (DNS rebinding) cannot point the request
+        anywhere the check did not see.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UnsafeURLError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = await asyncio.to_thread(socket.getaddrinfo, parts.hostname, port, type=socket.SOCK_STREAM)
+        if not infos:
+            raise UnsafeURLError(f"Could not resolve {parts.hostname}")
+        if not self.allow_private_hosts:
+            for info in infos:
+                address = ipaddress.ip_address(info[4][0])
+                if address.is_private or address.is_loopback or address.is_link_local or address.is_reserved:
+                    raise UnsafeURLError(f"Refusing to fetch non-public address for {parts.hostname}")
+        return infos[0][4][0]
+
+    @staticmethod
+    def _pinned_request(url: str, address: str) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+        """Request URL, headers and extensions that reach `address` while naming the original host."""
+        parts = urlsplit(url)
+        host = f"[{address}]" if ":" in address else address
+        netloc = f"{host}:{parts.port}" if parts.port else host
+        original_host = parts.netloc.rpartition("@")[2]
+        return (
+            urlunsplit(parts._replace(netloc=netloc)),
+            {"Host": original_host},
+            # TLS still negotiates and verifies the certificate for the hostname
+            {"sni_hostname": parts.hostname}
+        )
+
+    async def fetch(self, url: str) -> FetchResult:
+        async with httpx.AsyncClient(timeout=self.timeout, headers={"User-Agent": USER_AGENT}) as client:
+            for _ in range(MAX_REDIRECTS + 1):
+                address = await self._resolve(url)
+                request_url, headers, extensions = self._pinned_request(url, address)
+                async with client.stream("GET", request_url, headers=headers, extensions=extensions) as response:
+                    if response.is_redirect and "location" in response.headers:
+                        url = urljoin(url, response.headers["location"])
+                        continue
+
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) >= self.max_bytes:
+                            break
+                    return FetchResult(
+                        url=url,
+                        status_code=response.status_code,
+                        content_type=response.headers.get("content-type", ""),
+                        body=bytes(body[:self.max_bytes])
+                    )
+        raise httpx.TooManyRedirects(f"Too many redirects for {url}")
+
+
+class _MetadataParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.title_parts = []
+        self._in_title = False
+        # Everything we need lives in <head>; set once it closes
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = dict(attrs)
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key and attrs.get("content") and key not in self.meta:
+                self.meta[key] = attrs["content"].strip()
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title and not self.done:
+            self.title_parts.append(data)
+
+
+def parse_metadata(html: str, base_url: str, chunk_size: int = 4096) -> Dict[str, Optional[str]]:
+    """Title, description and preview image from a page's <head>.
+
+    The page is fed in chunks and parsing stops once </head> is seen.
+    """
+    parser = _MetadataParser()
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        if parser.done:
+            break
+    else:
+        parser.close()
+
+    meta = parser.meta
+    title = meta.get("og:title") or meta.get("twitter:title") or " ".join("".join(parser.title_parts).split())
+    description = meta.get("og:description") or meta.get("twitter:description") or meta.get("description")
+    image = meta.get("og:image") or meta.get("twitter:image")
+    return {
+        "title": title[:255] if title else None,
+        "description": description[:2000] if description else None,
+        "image_url": urljoin(base_url, image)[:1000] if image else None,
+    }
+
+
+class LinkEnricher:
+    """Fetch and parse link metadata under concurrency, timeout and per-host limits."""
+
+    def __init__(
+        self,
+        fetcher=None,
+        concurrency: Optional[int] = None,
+        host_interval: Optional[float] = None
+    ):
+        self.fetcher = fetcher or HttpxFetcher(timeout=settings.LINK_METADATA_TIMEOUT_SECONDS)
+        self.concurrency = concurrency or settings.LINK_METADATA_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.host_interval = settings.LINK_METADATA_HOST_INTERVAL_SECONDS if host_interval is None else host_interval
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_next_slot: Dict[str, float] = {}
+
+    async def _wait_for_host(self, host: str) -> None:
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._host_next_slot.get(host, 0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._host_next_slot[host] = time.monotonic() + self.host_interval
+
+    async def enrich(self, url: str) -> Optional[Dict[str, Any]]:
+        """Metadata for `url`, from cache or a rate-limited fetch; None on failure."""
+        digest = url_hash(url)
+        if digest is None:
+            return None
+        cache_key = f"{METADATA_CACHE_PREFIX}{digest}"
+        cached = await redis_manager.get_json(cache_key)
+        if cached is not None:
+            return cached
+
+        async with self._semaphore:
+            await self._wait_for_host(urlsplit(url).hostname or "")
+            try:
+                result = await self.fetcher.fetch(url)
+            except (httpx.HTTPError, UnsafeURLError, OSError) as e:
+                logger.warning("Link metadata fetch failed", url=url, error=str(e))
+                return None
+
+        if result.status_code >= 400 or "html" not in result.content_type.lower():
+            metadata = {"title": None, "description": None, "image_url": None}
+        else:
+            metadata = parse_metadata(result.body.decode("utf-8", errors="replace"), result.url)
+
+        await redis_manager.set_json(cache_key, metadata, expire=METADATA_CACHE_TTL)
+        return metadata
+
+
+def get_resource_url(db: Session, resource_id: UUID) -> Optional[str]:
+    return db.query(SharedResource.url).filter(SharedResource.id == resource_id).scalar()
+
+
+def store_resource_metadata(db: Session, resource_id: UUID, url: str, metadata: Dict[str, Any]) -> bool:
+    """Save fetched metadata unless the resource's URL changed meanwhile."""
+    result = db.execute(
+        update(SharedResource)
+        .where(SharedResource.id == resource_id, SharedResource.url == url)
+        .values(
+            preview_title=metadata.get("title"),
+            preview_description=metadata.get("description"),
+            preview_image_url=metadata.get("image_url"),
+            metadata_fetched_at=datetime.now(timezone.utc)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
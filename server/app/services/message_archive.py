@@ -0,0 +1,195 @@
+"""Hot/cold storage for direct messages.
+
+Read messages older than MESSAGE_ARCHIVE_AFTER_DAYS are moved from
+`messages` into `messages_archive` by a scheduled job, keeping the hot
+table (and its indexes) small. History reads query both tables with the
+same cursor and merge them, since unread messages stay hot however old
+they are.
+"""
+import heapq
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, func, or_, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.user import ArchivedMessage, Message, User
+
+logger = get_logger(__name__)
+
+# Moves one batch in a single statement. SKIP LOCKED lets the job run
+# alongside normal traffic: rows being marked read by a request are simply
+# picked up on the next run instead of blocking either side.
+_MOVE_BATCH_SQL = text("""
+    WITH batch AS (
+        SELECT id FROM messages
+        WHERE created_at < :cutoff AND is_read = true
+        ORDER BY created_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ),
+    moved AS (
+        DELETE FROM messages m
+        USING batch
+        WHERE m.id = batch.id
+        RETURNING m.id, m.sender_id, m.recipient_id, m.content, m.is_read, m.created_at
+    )
+    INSERT INTO messages_archive (id, sender_id, recipient_id, content, is_read, created_at)
+    SELECT id, sender_id, recipient_id, content, is_read, created_at FROM moved
+    ON CONFLICT (id) DO NOTHING
+""")
+
+
+def archive_cold_messages(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: int = 100
+) -> int:
+    """Move cold, read messages into the archive table.
+
+    Each batch is its own short transaction, so locks are held for at most
+    `batch_size` rows at a time. Returns the number of messages moved.
+    """
+    older_than_days = older_than_days or settings.MESSAGE_ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.MESSAGE_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    total_moved = 0
+    for _ in range(max_batches):
+        result = db.execute(_MOVE_BATCH_SQL, {"cutoff": cutoff, "batch_size": batch_size})
+        db.commit()
+        total_moved += result.rowcount
+        if result.rowcount < batch_size:
+            break
+
+    logger.info("Message archive run completed", moved=total_moved, cutoff=cutoff.isoformat())
+    return total_moved
+
+
+def _history_query(db: Session, model, user_id: UUID, conversation_with: Optional[UUID]):
+    if conversation_with:
+        participant_filter = or_(
+            and_(model.sender_id == user_id, model.recipient_id == conversation_with),
+            and_(model.sender_id == conversation_with, model.recipient_id == user_id)
+        )
+    else:
+        participant_filter = or_(model.sender_id == user_id, model.recipient_id == user_id)
+    return db.query(model).filter(participant_filter)
+
+
+def _before(model, cursor: Tuple[datetime, UUID]):
+    created_at, message_id = cursor
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < message_id)
+    )
+
+
+def _sort_key(message):
+    return (message.created_at, message.id)
+
+
+def get_message_history(
+    db: Session,
+    user_id: UUID,
+    conversation_with: Optional[UUID] = None,
+    before: Optional[Tuple[datetime, UUID]] = None,
+    limit: int = 50
+) -> List:
+    """Return up to `limit` messages newest-first, older than `before`.
+
+    Unread messages never leave the hot table, so its rows are not all
+    newer than the archive's. Both tables are read with the same cursor
+    and limit (each an index range scan) and merged by (created_at, id).
+    """
+    pages = []
+    for model in (Message, ArchivedMessage):
+        query = _history_query(db, model, user_id, conversation_with)
+        if before:
+            query = query.filter(_before(model, before))
+        pages.append(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit).all())
+    return list(islice(heapq.merge(*pages, key=_sort_key, reverse=True), limit))
+
+
+def _conversation_rows(model, user_id: UUID):
+    return select(
+        case((model.sender_id == user_id, model.recipient_id), else_=model.sender_id).label("partner_id"),
+        model.id,
+        model.content,
+        model.created_at,
+        case((and_(model.recipient_id == user_id, model.is_read.is_(False)), 1), else_=0).label("unread")
+    ).where(or_(model.sender_id == user_id, model.recipient_id == user_id))
+
+
+def get_conversations(db: Session, user_id: UUID) -> List[Dict]:
+    """One summary per conversation partner, most recent first.
+
+    Covers hot and archived messages in one query: a window over the union
+    picks each partner's latest message and sums their unread messages.
+    """
+    messages = union_all(
+        _conversation_rows(Message, user_id),
+        _conversation_rows(ArchivedMessage, user_id)
+    ).subquery()
+    partner = messages.c.partner_id
+    ranked = select(
+        partner,
+        messages.c.content,
+        messages.c.created_at,
+        func.row_number().over(
+            partition_by=partner,
+            order_by=(messages.c.created_at.desc(), messages.c.id.desc())
+        ).label("position"),
+        func.sum(messages.c.unread).over(partition_by=partner).label("unread_count")
+    ).subquery()
+
+    rows = db.execute(
+        select(ranked.c.partner_id, User.username, ranked.c.content, ranked.c.created_at, ranked.c.unread_count)
+        .join(User, User.id == ranked.c.partner_id)
+        .where(ranked.c.position == 1)
+        .order_by(ranked.c.created_at.desc())
+    ).all()
+    return [
+        {
+            "user_id": partner_id,
+            "username": username,
+            "latest_message": content,
+            "latest_message_time": created_at,
+            "unread_count": int(unread_count or 0)
+        }
+        for partner_id, username, content, created_at, unread_count in rows
+    ]
+
+
+def count_unread(db: Session, user_id: UUID) -> int:
+    """Unread messages addressed to the user, in either table."""
+    return sum(
+        db.query(func.count(model.id)).filter(model.recipient_id == user_id, model.is_read.is_(False)).scalar() or 0
+        for model in (Message, ArchivedMessage)
+    )
+
+
+def iter_message_history(
+    db: Session,
+    user_id: UUID,
+    conversation_with: Optional[UUID] = None,
+    batch_size: int = 500
+) -> Iterator:
+    """Yield every message for a user, oldest first, across archive and hot rows.
+
+    Each table is pulled through a server-side cursor `batch_size` rows at
+    a time and the two ordered streams are merged, so memory use is flat
+    regardless of mailbox size.
+    """
+    streams = [
+        _history_query(db, model, user_id, conversation_with)
+        .order_by(model.created_at, model.id)
+        .yield_per(batch_size)
+        for model in (ArchivedMessage, Message)
+    ]
+    yield from heapq.merge(*streams, key=_sort_key)
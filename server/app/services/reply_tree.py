@@ -0,0 +1,88 @@
+"""Materialized-path reply trees for forum threads.
+
+Each reply stores `path`: its ancestors' segments and its own, joined by
+"/". A segment is the reply's creation time in zero-padded microseconds
+plus a short ID suffix, so sorting a thread's replies by path (C
+collation) yields a depth-first, chronological walk of the tree. One
+ordered index scan over (thread_id, path) is enough to assemble any
+subtree without recursive queries.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from uuid import UUID
+
+PATH_SEPARATOR = "/"
+# Sorts after every character used in paths; "<path>~" bounds a subtree
+PATH_SUBTREE_END = "~"
+MAX_REPLY_DEPTH = 32
+
+
+def reply_path_segment(created_at: datetime, reply_id: UUID) -> str:
+    return f"{int(created_at.timestamp() * 1_000_000):017d}{reply_id.hex[:4]}"
+
+
+def build_reply_path(parent_path: Optional[str], created_at: datetime, reply_id: UUID) -> str:
+    segment = reply_path_segment(created_at, reply_id)
+    return f"{parent_path}{PATH_SEPARATOR}{segment}" if parent_path else segment
+
+
+def iter_reply_nodes(nodes: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Walk a built reply tree depth-first."""
+    for node in nodes:
+        yield node
+        yield from iter_reply_nodes(node["children"])
+
+
+def build_reply_tree(
+    rows: Iterable[Any],
+    serialize,
+    base_depth: int,
+    max_depth: int,
+    max_children: int,
+    encode_cursor
+) -> Dict[str, Any]:
+    """Nest path-ordered replies in a single pass.
+
+    `rows` must be ordered by path and limited to depth <= base_depth +
+    max_depth + 1; the extra level is only counted, never returned, so
+    nodes on the depth boundary still report their child_count. Nodes with
+    more than `max_children` children (and the top level) get a cursor for
+    loading the remaining siblings; boundary nodes have has_more_children
+    set without a cursor and are expanded by requesting them as the parent.
+    """
+    roots: List[Dict[str, Any]] = []
+    root_state = {"overflow": 0}
+    nodes: Dict[UUID, Dict[str, Any]] = {}
+    last_depth = base_depth + max_depth
+
+    for row in rows:
+        if row.depth == base_depth:
+            siblings, parent = roots, root_state
+        else:
+            parent = nodes.get(row.parent_reply_id)
+            if parent is None:
+                # Ancestor was pruned by a limit; skip the whole subtree
+                continue
+            parent["child_count"] += 1
+            if row.depth > last_depth:
+                continue
+            siblings = parent["children"]
+
+        if len(siblings) >= max_children:
+            if parent is root_state:
+                root_state["overflow"] += 1
+            continue
+
+        node = serialize(row)
+        node.update(child_count=0, children=[], has_more_children=False, children_cursor=None)
+        siblings.append(node)
+        nodes[row.id] = node
+
+    for node in nodes.values():
+        if node["child_count"] > len(node["children"]):
+            node["has_more_children"] = True
+            if node["children"]:
+                node["children_cursor"] = encode_cursor(node["children"][-1]["path"])
+
+    next_cursor = encode_cursor(roots[-1]["path"]) if root_state["overflow"] and roots else None
+    return {"replies": roots, "next_cursor": next_cursor}
@@ -0,0 +1,115 @@
+"""Duplicate detection and merging for shared resources.
+
+Each resource stores `url_hash`, the SHA-256 of its normalized URL (see
+app.utils.urls), under an index so `create_resource` can reject a repeat
+submission with one index lookup. Rows that slipped in before the column
+existed, or through a race between two submissions, are merged by a
+periodic job: the approved or oldest row of each group is kept and the
+others' votes are folded into it.
+"""
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import case, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.resource import SharedResource
+from app.models.vote import Vote
+from app.services.resource_ranking import refresh_wilson_scores_for
+from app.utils.urls import url_hash
+
+logger = get_logger(__name__)
+
+
+def find_duplicate(db: Session, url: Optional[str], exclude_id: Optional[UUID] = None) -> Optional[SharedResource]:
+    """An existing resource with the same normalized URL, if any."""
+    digest = url_hash(url)
+    if digest is None:
+        return None
+    query = db.query(SharedResource).filter(SharedResource.url_hash == digest)
+    if exclude_id is not None:
+        query = query.filter(SharedResource.id != exclude_id)
+    return query.first()
+
+
+def _ledger_counts(db: Session, resource_ids: List[UUID]):
+    rows = db.execute(
+        select(
+            Vote.target_id,
+            func.count().filter(Vote.value == 1),
+            func.count().filter(Vote.value == -1)
+        )
+        .where(Vote.target_type == "resource", Vote.target_id.in_(resource_ids))
+        .group_by(Vote.target_id)
+    ).all()
+    return {target_id: (up, down) for target_id, up, down in rows}
+
+
+def merge_resource_group(db: Session, keeper: SharedResource, duplicates: List[SharedResource]) -> None:
+    """Fold duplicates into `keeper` and delete them (caller commits).
+
+    Ledger votes move to the keeper unless the user already voted on it.
+    Counter votes cast before the ledger existed cannot be deduplicated per
+    user, so they are carried over as-is.
+    """
+    group = [keeper] + duplicates
+    duplicate_ids = [d.id for d in duplicates]
+    ledger = _ledger_counts(db, [r.id for r in group])
+
+    legacy_up = sum(max((r.upvotes or 0) - ledger.get(r.id, (0, 0))[0], 0) for r in group)
+    legacy_down = sum(max((r.downvotes or 0) - ledger.get(r.id, (0, 0))[1], 0) for r in group)
+
+    db.execute(
+        pg_insert(Vote)
+        .from_select(
+            ["user_id", "target_type", "target_id", "value"],
+            select(Vote.user_id, Vote.target_type, literal(keeper.id, PG_UUID(as_uuid=True)), Vote.value)
+            .where(Vote.target_type == "resource", Vote.target_id.in_(duplicate_ids))
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "target_type", "target_id"])
+    )
+    db.execute(delete(Vote).where(Vote.target_type == "resource", Vote.target_id.in_(duplicate_ids)))
+    db.execute(delete(SharedResource).where(SharedResource.id.in_(duplicate_ids)))
+
+    merged_up, merged_down = _ledger_counts(db, [keeper.id]).get(keeper.id, (0, 0))
+    keeper.upvotes = merged_up + legacy_up
+    keeper.downvotes = merged_down + legacy_down
+    keeper.is_approved = any(r.is_approved for r in group)
+    db.flush()
+    refresh_wilson_scores_for(db, [keeper.id])
+
+
+def merge_duplicate_resources(db: Session, max_groups: int = 500) -> int:
+    """Merge every group of resources sharing a URL hash; returns rows removed."""
+    duplicate_hashes = db.execute(
+        select(SharedResource.url_hash)
+        .where(SharedResource.url_hash.is_not(None))
+        .group_by(SharedResource.url_hash)
+        .having(func.count() > 1)
+        .limit(max_groups)
+    ).scalars().all()
+
+    removed = 0
+    for digest in duplicate_hashes:
+        # Keep an approved row if there is one, otherwise the oldest
+        group = (
+            db.query(SharedResource)
+            .filter(SharedResource.url_hash == digest)
+            .order_by(
+                case((SharedResource.is_approved.is_(True), 0), else_=1),
+                SharedResource.created_at,
+                SharedResource.id
+            )
+            .with_for_update()
+            .all()
+        )
+        if len(group) > 1:
+            merge_resource_group(db, group[0], group[1:])
+            removed += len(group) - 1
+        db.commit()
+
+    logger.info("Duplicate resources merged", groups=len(duplicate_hashes), removed=removed)
+    return removed
@@ -0,0 +1,52 @@
+"""Ranking for the approved resource catalogue.
+
+`wilson_score` is the lower bound of the Wilson score interval for the
+share of upvotes: a resource needs both a good ratio and enough votes to
+rank highly, so one lucky upvote does not beat a hundred mostly-positive
+ones. It is stored on SharedResource and refreshed with each vote so the
+catalogue can sort on an index.
+"""
+import math
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import Float, case, cast, func, update
+from sqlalchemy.orm import Session
+
+from app.models.resource import SharedResource
+
+# 95% confidence
+WILSON_Z = 1.96
+
+
+def wilson_lower_bound(upvotes: int, downvotes: int, z: float = WILSON_Z) -> float:
+    """Wilson lower bound; must stay in step with `_wilson_score_sql`."""
+    n = (upvotes or 0) + (downvotes or 0)
+    if n == 0:
+        return 0.0
+    p = (upvotes or 0) / n
+    z2 = z * z
+    return (p + z2 / (2 * n) - z * math.sqrt((p * (1 - p) + z2 / (4 * n)) / n)) / (1 + z2 / n)
+
+
+def _wilson_score_sql():
+    up = cast(func.coalesce(SharedResource.upvotes, 0), Float)
+    n = up + cast(func.coalesce(SharedResource.downvotes, 0), Float)
+    # The CASE keeps the division from running for unvoted rows
+    p = up / n
+    z2 = WILSON_Z * WILSON_Z
+    bound = (p + z2 / (2 * n) - WILSON_Z * func.sqrt((p * (1 - p) + z2 / (4 * n)) / n)) / (1 + z2 / n)
+    return case((n == 0, 0.0), else_=bound)
+
+
+def refresh_wilson_scores_for(db: Session, resource_ids: Iterable[UUID]) -> None:
+    """Recompute stored Wilson scores from the current counters (caller commits)."""
+    resource_ids = list(resource_ids)
+    if not resource_ids:
+        return
+    db.execute(
+        update(SharedResource)
+        .where(SharedResource.id.in_(resource_ids))
+        .values(wilson_score=_wilson_score_sql())
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,198 @@
+"""Pre-compressed snapshot of the public resource library.
+
+The approved catalogue changes only when an admin approves or rejects a
+resource, yet clients fetch it constantly. Publishing renders it once to
+compact JSON plus gzip (and brotli, when the `brotli` package is installed)
+variants under RESOURCE_SNAPSHOT_DIR, so serving is a dictionary lookup
+with no database or serialization work.
+
+Variant files are named by content hash and a small manifest is swapped in
+atomically last, so readers never see a half-written snapshot. Each
+process keeps the current snapshot in memory and reloads it when the
+manifest changes, which lets any process (admin request or scheduler)
+publish for all of them. The content hash doubles as a strong ETag, with
+the encoding appended for the compressed representations.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logging import get_logger
+from app.models.resource import SharedResource as SharedResourceModel
+from app.schemas.resource import SharedResource
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = get_logger(__name__)
+
+SNAPSHOT_NAME = "resources"
+MANIFEST_FILE = f"{SNAPSHOT_NAME}.manifest.json"
+FILE_SUFFIXES = {"identity": ".json", "gzip": ".json.gz", "br": ".json.br"}
+
+
+@dataclass
+class Snapshot:
+    digest: str
+    bodies: Dict[str, bytes]
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+
+def _snapshot_dir() -> str:
+    return settings.RESOURCE_SNAPSHOT_DIR
+
+
+def render_snapshot(db: Session) -> bytes:
+    """Approved resources in the default catalogue order, as compact JSON."""
+    resources = (
+        db.query(SharedResourceModel)
+        .filter(SharedResourceModel.is_approved.is_(True))
+        .order_by(SharedResourceModel.wilson_score.desc(), SharedResourceModel.id.desc())
+        .yield_per(500)
+    )
+    payload = [SharedResource.model_validate(r).model_dump(mode="json") for r in resources]
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publish_resource_snapshot(db: Session) -> str:
+    """Render, compress and atomically publish the catalogue; returns its digest.
+
+    Files from the snapshot before the previous one are removed, so a
+    reader that picked up the old manifest can still open its files.
+    """
+    body = render_snapshot(db)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    directory = _snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    previous = _read_manifest(directory)
+    if previous and previous.get("digest") == digest:
+        return digest
+
+    files = {}
+    for encoding, data in compress_variants(body).items():
+        name = f"{SNAPSHOT_NAME}.{digest}{FILE_SUFFIXES[encoding]}"
+        _write_atomic(os.path.join(directory, name), data)
+        files[encoding] = name
+    _write_atomic(
+        os.path.join(directory, MANIFEST_FILE),
+        json.dumps({"digest": digest, "files": files}).encode("utf-8")
+    )
+
+    keep = set(files.values()) | set((previous or {}).get("files", {}).values())
+    for name in os.listdir(directory):
+        if name.startswith(f"{SNAPSHOT_NAME}.") and name != MANIFEST_FILE and name not in keep:
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+
+    logger.info("Resource snapshot published", digest=digest, bytes=len(body))
+    return digest
+
+
+_loaded: Optional[Tuple[int, Snapshot]] = None
+
+
+def load_snapshot() -> Optional[Snapshot]:
+    """The current published snapshot, reloaded only when the manifest changes."""
+    global _loaded
+    directory = _snapshot_dir()
+    try:
+        mtime = os.stat(os.path.join(directory, MANIFEST_FILE)).st_mtime_ns
+    except OSError:
+        return None
+    if _loaded is not None and _loaded[0] == mtime:
+        return _loaded[1]
+
+    manifest = _read_manifest(directory)
+    if not manifest:
+        return None
+    try:
+        bodies = {}
+        for encoding, name in manifest["files"].items():
+            with open(os.path.join(directory, name), "rb") as f:
+                bodies[encoding] = f.read()
+    except (OSError, KeyError):
+        return None
+
+    snapshot = Snapshot(digest=manifest["digest"], bodies=bodies)
+    _loaded = (mtime, snapshot)
+    return snapshot
+
+
+def choose_encoding(snapshot: Snapshot, accept_encoding: Optional[str]) -> str:
+    """Best available encoding the client accepts (br > gzip > identity)."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+
+    for encoding in ("br", "gzip"):
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in snapshot.bodies and quality > 0:
+            return encoding
+    return "identity"
+
+
+def _publish_with_own_session() -> str:
+    db = SessionLocal()
+    try:
+        return publish_resource_snapshot(db)
+    finally:
+        db.close()
+
+
+async def republish_resource_snapshot() -> Optional[str]:
+    """Publish from an async endpoint without blocking the event loop."""
+    try:
+        return await run_in_threadpool(_publish_with_own_session)
+    except Exception as e:
+        logger.error("Resource snapshot publish failed", error=str(e))
+        return None
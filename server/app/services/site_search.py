@@ -0,0 +1,193 @@
+"""Typo-tolerant prefix search over resources, study groups and users.
+
+Backs the autocomplete box: a few characters of input should surface the
+matching resource titles, public study group names and usernames without
+clients downloading whole listings to filter locally.
+
+On Postgres the searchable columns carry pg_trgm GIN indexes. A row
+matches when its label starts with the query (ILIKE 'q%') or when the
+query's trigrams are mostly contained in some word run of the text
+(`q <% text`, i.e. word_similarity above pg_trgm's threshold); both are
+index probes. Label prefixes score 1.0, everything else its
+word_similarity, with resource descriptions counting half.
+
+Other databases (SQLite test runs) fall back to `NgramIndex`, an
+in-process trigram index that pads and scores words the same way.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, desc, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.resource import SharedResource
+from app.models.study_group import StudyGroup
+from app.models.user import User
+
+SEARCH_KINDS = ("resource", "study_group", "user")
+
+# pg_trgm's default pg_trgm.word_similarity_threshold
+WORD_SIMILARITY_THRESHOLD = 0.6
+PREFIX_SCORE = 1.0
+DESCRIPTION_WEIGHT = 0.5
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    id: UUID
+    label: str
+    detail: Optional[str]
+    score: float
+
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """pg_trgm-style trigrams: lowercased words padded with two leading and one trailing space."""
+    grams = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """In-process trigram index used when pg_trgm is unavailable.
+
+    A document matches when its label starts with the query or when enough
+    of the query's trigrams appear in one of its fields.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[Tuple[str, UUID]]] = defaultdict(set)
+        self._fields: Dict[Tuple[str, UUID], List[Tuple[Set[str], float]]] = defaultdict(list)
+        self._docs: Dict[Tuple[str, UUID], Tuple[str, Optional[str]]] = {}
+
+    def add(self, kind: str, doc_id: UUID, label: str, detail: Optional[str] = None,
+            extra_text: Optional[str] = None, extra_weight: float = DESCRIPTION_WEIGHT) -> None:
+        key = (kind, doc_id)
+        self._docs[key] = (label, detail)
+        for text, weight in ((label, 1.0), (extra_text, extra_weight)):
+            grams = trigrams(text)
+            if not grams:
+                continue
+            self._fields[key].append((grams, weight))
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def search(self, query: str, kinds: Sequence[str] = SEARCH_KINDS, limit: int = 10) -> List[SearchHit]:
+        query_grams = trigrams(query)
+        prefix = query.strip().lower()
+        if not query_grams:
+            return []
+
+        candidates = set()
+        for gram in query_grams:
+            candidates.update(self._postings.get(gram, ()))
+
+        hits = []
+        for key in candidates:
+            kind, doc_id = key
+            if kind not in kinds:
+                continue
+            label, detail = self._docs[key]
+            if label.lower().startswith(prefix):
+                score = PREFIX_SCORE
+            else:
+                similarities = [
+                    (len(query_grams & grams) / len(query_grams), weight)
+                    for grams, weight in self._fields[key]
+                ]
+                matching = [s * weight for s, weight in similarities if s >= WORD_SIMILARITY_THRESHOLD]
+                if not matching:
+                    continue
+                score = max(matching)
+            hits.append(SearchHit(kind=kind, id=doc_id, label=label, detail=detail, score=score))
+
+        hits.sort(key=lambda hit: (-hit.score, hit.label.lower(), str(hit.id)))
+        return hits[:limit]
+
+
+def _searchable_rows(db: Session, kinds: Sequence[str]) -> Iterable[Tuple]:
+    """(kind, id, label, detail, extra_text) for every row visible to search."""
+    if "resource" in kinds:
+        for row in db.query(SharedResource.id, SharedResource.title, SharedResource.resource_type,
+                            SharedResource.description).filter(SharedResource.is_approved.is_(True)):
+            yield ("resource", *row)
+    if "study_group" in kinds:
+        for row in db.query(StudyGroup.id, StudyGroup.name, StudyGroup.description).filter(StudyGroup.is_public.is_(True)):
+            yield ("study_group", row.id, row.name, row.description, None)
+    if "user" in kinds:
+        for row in db.query(User.id, User.username).filter(User.is_active.is_(True)):
+            yield ("user", row.id, row.username, None, None)
+
+
+def search_fallback(db: Session, query: str, kinds: Sequence[str] = SEARCH_KINDS, limit: int = 10) -> List[SearchHit]:
+    """Same contract as `search_pg`, built on an in-process index."""
+    index = NgramIndex()
+    for kind, doc_id, label, detail, extra_text in _searchable_rows(db, kinds):
+        index.add(kind, doc_id, label, detail, extra_text)
+    return index.search(query, kinds, limit)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _label_score(query: str, column):
+    return func.greatest(
+        func.word_similarity(query, column),
+        case((column.ilike(f"{_escape_like(query)}%", escape="\\"), PREFIX_SCORE), else_=0.0)
+    )
+
+
+def _label_matches(query: str, column):
+    return or_(column.ilike(f"{_escape_like(query)}%", escape="\\"), literal(query).op("<%")(column))
+
+
+def search_pg(db: Session, query: str, kinds: Sequence[str] = SEARCH_KINDS, limit: int = 10) -> List[SearchHit]:
+    """Ranked trigram/prefix matches using the pg_trgm GIN indexes.
+
+    One index-backed query per kind, each limited, then merged by score.
+    """
+    query = query.strip()
+    statements = []
+    if "resource" in kinds:
+        statements.append(("resource", select(
+            SharedResource.id, SharedResource.title, SharedResource.resource_type,
+            func.greatest(
+                _label_score(query, SharedResource.title),
+                func.word_similarity(query, func.coalesce(SharedResource.description, "")) * DESCRIPTION_WEIGHT
+            ).label("score")
+        ).where(
+            SharedResource.is_approved.is_(True),
+            or_(_label_matches(query, SharedResource.title), literal(query).op("<%")(SharedResource.description))
+        )))
+    if "study_group" in kinds:
+        statements.append(("study_group", select(
+            StudyGroup.id, StudyGroup.name, StudyGroup.description,
+            _label_score(query, StudyGroup.name).label("score")
+        ).where(StudyGroup.is_public.is_(True), _label_matches(query, StudyGroup.name))))
+    if "user" in kinds:
+        statements.append(("user", select(
+            User.id, User.username, literal(None).label("detail"),
+            _label_score(query, User.username).label("score")
+        ).where(User.is_active.is_(True), _label_matches(query, User.username))))
+
+    hits = []
+    for kind, stmt in statements:
+        for doc_id, label, detail, score in db.execute(stmt.order_by(desc("score")).limit(limit)).all():
+            hits.append(SearchHit(kind=kind, id=doc_id, label=label, detail=detail, score=float(score)))
+
+    hits.sort(key=lambda hit: (-hit.score, hit.label.lower(), str(hit.id)))
+    return hits[:limit]
+
+
+def search(db: Session, query: str, kinds: Sequence[str] = SEARCH_KINDS, limit: int = 10) -> List[SearchHit]:
+    if db.get_bind().dialect.name == "postgresql":
+        return search_pg(db, query, kinds, limit)
+    return search_fallback(db, query, kinds, limit)
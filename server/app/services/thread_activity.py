@@ -0,0 +1,113 @@
+"""Denormalized reply activity on forum threads.
+
+ForumThread carries `reply_count`, `last_reply_at` and `last_reply_author_id`
+so thread listings can show "N replies, last activity X" from the threads
+table alone. Every write path that adds or removes replies goes through
+these helpers, which adjust the columns with single atomic UPDATEs; a
+nightly repair job recomputes them from forum_replies to correct any drift.
+Reply activity is not an edit, so these writes leave `updated_at` alone.
+"""
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.forum import ForumReply, ForumThread
+from app.services.forum_ranking import refresh_hot_scores_for
+
+logger = get_logger(__name__)
+
+
+def _latest_reply(thread_id, *columns):
+    return (
+        select(*columns)
+        .where(ForumReply.thread_id == thread_id)
+        .order_by(ForumReply.created_at.desc(), ForumReply.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def record_reply_added(db: Session, reply: ForumReply) -> None:
+    """Count a newly flushed reply against its thread (caller commits)."""
+    db.execute(
+        update(ForumThread)
+        .where(ForumThread.id == reply.thread_id)
+        .values(
+            reply_count=ForumThread.reply_count + 1,
+            last_reply_at=func.greatest(ForumThread.last_reply_at, reply.created_at),
+            last_reply_author_id=reply.author_id,
+            updated_at=ForumThread.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    refresh_hot_scores_for(db, [reply.thread_id])
+
+
+def record_reply_removed(db: Session, thread_id: UUID) -> None:
+    """Uncount a reply deleted (and flushed) from a thread (caller commits).
+
+    The last-reply columns are re-read from the newest remaining reply,
+    since the deleted one may have been it.
+    """
+    db.execute(
+        update(ForumThread)
+        .where(ForumThread.id == thread_id)
+        .values(
+            reply_count=func.greatest(ForumThread.reply_count - 1, 0),
+            last_reply_at=_latest_reply(thread_id, ForumReply.created_at),
+            last_reply_author_id=_latest_reply(thread_id, ForumReply.author_id),
+            updated_at=ForumThread.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    refresh_hot_scores_for(db, [thread_id])
+
+
+def repair_thread_reply_stats(db: Session) -> int:
+    """Recompute reply stats from forum_replies where they have drifted.
+
+    One aggregate pass fixes threads that have replies; a second statement
+    resets threads that have none. Returns the number of threads corrected.
+    """
+    stats = (
+        select(
+            ForumReply.thread_id.label("thread_id"),
+            func.count(ForumReply.id).label("reply_count"),
+            func.max(ForumReply.created_at).label("last_reply_at")
+        )
+        .group_by(ForumReply.thread_id)
+        .subquery()
+    )
+    with_replies = db.execute(
+        update(ForumThread)
+        .where(
+            ForumThread.id == stats.c.thread_id,
+            or_(
+                ForumThread.reply_count != stats.c.reply_count,
+                ForumThread.last_reply_at.is_distinct_from(stats.c.last_reply_at)
+            )
+        )
+        .values(
+            reply_count=stats.c.reply_count,
+            last_reply_at=stats.c.last_reply_at,
+            last_reply_author_id=_latest_reply(ForumThread.id, ForumReply.author_id),
+            updated_at=ForumThread.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    without_replies = db.execute(
+        update(ForumThread)
+        .where(
+            or_(ForumThread.reply_count != 0, ForumThread.last_reply_at.is_not(None)),
+            ~select(ForumReply.id).where(ForumReply.thread_id == ForumThread.id).exists()
+        )
+        .values(reply_count=0, last_reply_at=None, last_reply_author_id=None, updated_at=ForumThread.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    repaired = with_replies.rowcount + without_replies.rowcount
+    logger.info("Thread reply stats repaired", threads=repaired)
+    return repaired
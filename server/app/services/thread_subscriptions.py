@@ -0,0 +1,65 @@
+"""Thread subscriptions and reply notification fan-out.
+
+Authors are subscribed to their threads and repliers to the threads they
+reply in. A new reply enqueues one `send_notification` task carrying the
+thread; the task worker walks the subscriber index in keyset batches and
+writes each batch's notifications with pipelined Redis calls, so the reply
+request does constant work however many subscribers the thread has.
+"""
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.forum import ThreadSubscription
+
+NOTIFICATION_BATCH_SIZE = 500
+FANOUT_PROGRESS_TTL = timedelta(days=1)
+
+
+def fanout_progress_key(task_id: str) -> str:
+    return f"notification_fanout:{task_id}"
+
+
+def subscribe(db: Session, thread_id: UUID, user_id: UUID) -> None:
+    """Subscribe a user to a thread; a no-op if already subscribed (caller commits)."""
+    db.execute(
+        pg_insert(ThreadSubscription)
+        .values(thread_id=thread_id, user_id=user_id)
+        .on_conflict_do_nothing(index_elements=["thread_id", "user_id"])
+    )
+
+
+def unsubscribe(db: Session, thread_id: UUID, user_id: UUID) -> bool:
+    """Remove a subscription (caller commits); False if there was none."""
+    result = db.execute(
+        delete(ThreadSubscription).where(
+            ThreadSubscription.thread_id == thread_id,
+            ThreadSubscription.user_id == user_id
+        )
+    )
+    return result.rowcount > 0
+
+
+def get_subscriber_batch(
+    db: Session,
+    thread_id: UUID,
+    exclude_user_id: Optional[UUID],
+    after_user_id: Optional[UUID],
+    limit: int = NOTIFICATION_BATCH_SIZE
+) -> List[UUID]:
+    """Next `limit` subscriber ids after `after_user_id`, in index order."""
+    query = (
+        select(ThreadSubscription.user_id)
+        .where(ThreadSubscription.thread_id == thread_id)
+        .order_by(ThreadSubscription.user_id)
+        .limit(limit)
+    )
+    if exclude_user_id is not None:
+        query = query.where(ThreadSubscription.user_id != exclude_user_id)
+    if after_user_id is not None:
+        query = query.where(ThreadSubscription.user_id > after_user_id)
+    return list(db.execute(query).scalars())
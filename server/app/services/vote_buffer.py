@@ -0,0 +1,288 @@
+"""Redis-buffered vote aggregation.
+
+With VOTE_BUFFER_ENABLED, votes never write to Postgres on the request
+path. Each vote runs one Lua script that updates the caller's latest vote
+in a pending-ledger hash (deduping repeats) and HINCRBYs the target's
+up/down deltas in a pending-counts hash. A scheduler job atomically moves
+both hashes aside under a fresh batch ID and applies them with one
+batched statement per table, recording the ID in the same transaction so a
+batch retried after a crash between commit and cleanup is not applied
+twice. Clearing a batch bumps a flush generation, so a vote that read the
+user's previous vote from Postgres before a flush landed is retried rather
+than applied with a stale delta. Read paths add any not-yet-flushed deltas
+to the stored counters. If Redis cannot run the script, callers fall back
+to the synchronous ledger in app.services.voting.
+"""
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Integer, column, delete, func, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import redis_manager
+from app.models.vote import AppliedVoteBatch, Vote
+from app.services.forum_ranking import refresh_hot_scores_for
+from app.services.resource_ranking import refresh_wilson_scores_for
+from app.services.voting import VOTE_TARGETS, VOTE_VALUES
+
+logger = get_logger(__name__)
+
+PENDING_LEDGER_KEY = "votes:pending:ledger"
+PENDING_COUNTS_KEY = "votes:pending:counts"
+FLUSHING_LEDGER_KEY = "votes:flushing:ledger"
+FLUSHING_COUNTS_KEY = "votes:flushing:counts"
+FLUSHING_BATCH_ID_KEY = "votes:flushing:batch_id"
+FLUSH_GENERATION_KEY = "votes:flush:generation"
+# Attempts before giving up on a vote that keeps racing flushes
+BUFFER_VOTE_ATTEMPTS = 3
+# Applied batch IDs only need to outlive a retry of the same batch
+APPLIED_BATCH_RETENTION = timedelta(days=1)
+
+# KEYS: pending ledger, flushing ledger, pending counts, flush generation
+# ARGV: ledger field, new value, value stored in Postgres, counts field prefix,
+#       flush generation seen before Postgres was read
+# Returns -1 without writing if a flush was cleared since then.
+_CAST_VOTE_SCRIPT = """
+if (redis.call('GET', KEYS[4]) or '0') ~= ARGV[5] then
+    return -1
+end
+local old = redis.call('HGET', KEYS[1], ARGV[1]) or redis.call('HGET', KEYS[2], ARGV[1]) or ARGV[3]
+old = tonumber(old)
+local new = tonumber(ARGV[2])
+if old == new then
+    return {0, 0}
+end
+redis.call('HSET', KEYS[1], ARGV[1], new)
+local up = (new == 1 and 1 or 0) - (old == 1 and 1 or 0)
+local down = (new == -1 and 1 or 0) - (old == -1 and 1 or 0)
+if up ~= 0 then
+    redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':up', up)
+end
+if down ~= 0 then
+    redis.call('HINCRBY', KEYS[3], ARGV[4] .. ':down', down)
+end
+return {up, down}
+"""
+
+# KEYS: pending ledger, flushing ledger, pending counts, flushing counts, batch id
+# ARGV: ID for a new batch
+# Moves pending hashes aside unless a previous flush is still outstanding,
+# and returns the ID of the batch to flush (nil if there is nothing to do).
+_TAKE_BATCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 or redis.call('EXISTS', KEYS[4]) == 1 then
+    local id = redis.call('GET', KEYS[5])
+    if not id then
+        id = ARGV[1]
+        redis.call('SET', KEYS[5], id)
+    end
+    return id
+end
+local moved = false
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    moved = true
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    redis.call('RENAME', KEYS[3], KEYS[4])
+    moved = true
+end
+if not moved then
+    return false
+end
+redis.call('SET', KEYS[5], ARGV[1])
+return ARGV[1]
+"""
+
+# KEYS: flushing ledger, flushing counts, batch id, flush generation
+# Bumps the generation in the same step that drops the flushed ledger.
+_CLEAR_BATCH_SCRIPT = """
+redis.call('INCR', KEYS[4])
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+return 1
+"""
+
+
+def _target_field(target_type: str, target_id: UUID) -> str:
+    return f"{target_type}:{target_id}"
+
+
+async def buffer_vote(db: Session, user_id: UUID, target_type: str, target, vote_type: str) -> Optional[Tuple[int, int]]:
+    """Record a vote in Redis and return the target's (upvotes, downvotes).
+
+    `target` is the loaded row; the returned counts include pending deltas.
+    Falls back to the Postgres ledger for the user's previous vote when
+    Redis has not seen it since the last flush. Returns None if Redis is
+    unavailable, in which case the caller records the vote synchronously.
+    """
+    field = f"{user_id}:{target_type}:{target.id}"
+    for _ in range(BUFFER_VOTE_ATTEMPTS):
+        generation = await redis_manager.get(FLUSH_GENERATION_KEY) or "0"
+        stored = await run_in_threadpool(db.query(Vote.value).filter(
+            Vote.user_id == user_id,
+            Vote.target_type == target_type,
+            Vote.target_id == target.id
+        ).scalar)
+
+        result = await redis_manager.run_script(
+            _CAST_VOTE_SCRIPT,
+            keys=[PENDING_LEDGER_KEY, FLUSHING_LEDGER_KEY, PENDING_COUNTS_KEY, FLUSH_GENERATION_KEY],
+            args=[field, VOTE_VALUES[vote_type], stored or 0, _target_field(target_type, target.id), generation]
+        )
+        if result is None:
+            logger.warning("Vote buffer unavailable, voting synchronously", target_type=target_type)
+            return None
+        if result != -1:
+            up, down = (await get_pending_deltas(target_type, [target.id]))[target.id]
+            return (target.upvotes or 0) + up, (target.downvotes or 0) + down
+        # A flush landed after the previous vote was read; read it again
+    raise RuntimeError("Vote buffer kept flushing during a vote")
+
+
+async def get_pending_deltas(target_type: str, target_ids: Iterable[UUID]) -> Dict[UUID, Tuple[int, int]]:
+    """Unflushed (up, down) deltas per target, including an in-flight flush."""
+    target_ids = list(target_ids)
+    fields = []
+    for target_id in target_ids:
+        prefix = _target_field(target_type, target_id)
+        fields.extend([f"{prefix}:up", f"{prefix}:down"])
+
+    pending = await redis_manager.get_hash_fields(PENDING_COUNTS_KEY, fields)
+    flushing = await redis_manager.get_hash_fields(FLUSHING_COUNTS_KEY, fields)
+    totals = [int(a or 0) + int(b or 0) for a, b in zip(pending, flushing)]
+    return {
+        target_id: (totals[2 * i], totals[2 * i + 1])
+        for i, target_id in enumerate(target_ids)
+    }
+
+
+async def apply_pending_votes(target_type: str, items: List[Any]) -> List[Any]:
+    """Add pending deltas to the upvotes/downvotes of serialized items in place.
+
+    Items are schema objects or dicts with id/upvotes/downvotes. No-op
+    unless vote buffering is enabled.
+    """
+    if not settings.VOTE_BUFFER_ENABLED or not items:
+        return items
+
+    def get(item, name):
+        return item[name] if isinstance(item, dict) else getattr(item, name)
+
+    def put(item, name, value):
+        if isinstance(item, dict):
+            item[name] = value
+        else:
+            setattr(item, name, value)
+
+    deltas = await get_pending_deltas(target_type, [get(item, "id") for item in items])
+    for item in items:
+        up, down = deltas[get(item, "id")]
+        if up or down:
+            put(item, "upvotes", (get(item, "upvotes") or 0) + up)
+            put(item, "downvotes", (get(item, "downvotes") or 0) + down)
+    return items
+
+
+async def take_vote_batch() -> Optional[Tuple[str, Dict[str, str], Dict[str, str]]]:
+    """Move pending votes aside for flushing and return (batch_id, ledger, counts).
+
+    If a previous flush failed, its batch is returned again, with the same ID.
+    """
+    batch_id = await redis_manager.run_script(
+        _TAKE_BATCH_SCRIPT,
+        keys=[PENDING_LEDGER_KEY, FLUSHING_LEDGER_KEY, PENDING_COUNTS_KEY, FLUSHING_COUNTS_KEY, FLUSHING_BATCH_ID_KEY],
+        args=[str(uuid.uuid4())]
+    )
+    if not batch_id:
+        return None
+    ledger = await redis_manager.get_hash(FLUSHING_LEDGER_KEY) or {}
+    counts = await redis_manager.get_hash(FLUSHING_COUNTS_KEY) or {}
+    return batch_id, ledger, counts
+
+
+async def clear_vote_batch() -> None:
+    await redis_manager.run_script(
+        _CLEAR_BATCH_SCRIPT,
+        keys=[FLUSHING_LEDGER_KEY, FLUSHING_COUNTS_KEY, FLUSHING_BATCH_ID_KEY, FLUSH_GENERATION_KEY],
+        args=[]
+    )
+
+
+def apply_vote_batch(db: Session, batch_id: str, ledger: Dict[str, str], counts: Dict[str, str]) -> int:
+    """Write a flushed batch to Postgres in one transaction.
+
+    The ledger is applied with one multi-row upsert plus one delete; each
+    target table gets a single UPDATE ... FROM (VALUES ...) with its deltas.
+    A batch whose ID was already recorded is skipped. Returns the number of
+    targets whose counters changed.
+    """
+    claimed = db.execute(
+        pg_insert(AppliedVoteBatch)
+        .values(batch_id=batch_id)
+        .on_conflict_do_nothing(index_elements=["batch_id"])
+        .returning(AppliedVoteBatch.batch_id)
+    ).scalar()
+    if claimed is None:
+        # Committed by an earlier run that died before clearing Redis
+        db.rollback()
+        return 0
+
+    upserts, retracted = [], []
+    for field, value in ledger.items():
+        user_id, target_type, target_id = field.split(":")
+        key = (UUID(user_id), target_type, UUID(target_id))
+        if int(value) == 0:
+            retracted.append(key)
+        else:
+            upserts.append({"user_id": key[0], "target_type": target_type, "target_id": key[2], "value": int(value)})
+
+    if upserts:
+        stmt = pg_insert(Vote).values(upserts)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "target_type", "target_id"],
+            set_={"value": stmt.excluded.value, "updated_at": func.now()}
+        ))
+    if retracted:
+        db.execute(delete(Vote).where(tuple_(Vote.user_id, Vote.target_type, Vote.target_id).in_(retracted)))
+
+    deltas = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for field, delta in counts.items():
+        target_type, target_id, side = field.split(":")
+        deltas[target_type][UUID(target_id)][0 if side == "up" else 1] += int(delta)
+
+    changed = 0
+    for target_type, target_deltas in deltas.items():
+        rows = [(target_id, up, down) for target_id, (up, down) in target_deltas.items() if up or down]
+        if not rows:
+            continue
+        model = VOTE_TARGETS[target_type]
+        batch = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("up", Integer),
+            column("down", Integer),
+            name="vote_deltas"
+        ).data(rows)
+        db.execute(
+            update(model)
+            .where(model.id == batch.c.id)
+            .values(
+                upvotes=func.coalesce(model.upvotes, 0) + batch.c.up,
+                downvotes=func.coalesce(model.downvotes, 0) + batch.c.down
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if target_type == "thread":
+            refresh_hot_scores_for(db, [row[0] for row in rows])
+        elif target_type == "resource":
+            refresh_wilson_scores_for(db, [row[0] for row in rows])
+        changed += len(rows)
+
+    db.execute(delete(AppliedVoteBatch).where(AppliedVoteBatch.applied_at < func.now() - APPLIED_BATCH_RETENTION))
+    db.commit()
+    return changed
@@ -0,0 +1,102 @@
+"""Per-user vote ledger with atomic counter maintenance.
+
+Every vote is a row in `votes` keyed by (user, target_type, target_id), so
+repeat votes are idempotent and switching sides moves one vote rather than
+adding another. Counter columns on the target are adjusted by the ledger
+delta in a single `UPDATE ... RETURNING`, never read-modify-written in
+Python, so concurrent votes cannot lose updates.
+"""
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.forum import ForumReply, ForumThread
+from app.models.resource import SharedResource
+from app.models.vote import Vote
+
+VOTE_VALUES = {"up": 1, "down": -1, "none": 0}
+VOTE_TARGETS = {
+    "thread": ForumThread,
+    "reply": ForumReply,
+    "resource": SharedResource,
+}
+
+
+def vote_delta(old_value: int, new_value: int) -> Tuple[int, int]:
+    """(upvote delta, downvote delta) for a ledger change from old to new."""
+    up = int(new_value == 1) - int(old_value == 1)
+    down = int(new_value == -1) - int(old_value == -1)
+    return up, down
+
+
+def record_vote(db: Session, user_id: UUID, target_type: str, target_id: UUID, value: int) -> Tuple[int, int]:
+    """Upsert (or retract, value 0) a user's vote and return the counter delta.
+
+    Each branch is a single conditional statement, so two concurrent votes
+    from the same user serialize on the ledger row instead of both counting.
+    """
+    key = (
+        Vote.user_id == user_id,
+        Vote.target_type == target_type,
+        Vote.target_id == target_id,
+    )
+
+    if value == 0:
+        old = db.execute(delete(Vote).where(*key).returning(Vote.value)).scalar()
+        return vote_delta(old or 0, 0)
+
+    inserted = db.execute(
+        pg_insert(Vote)
+        .values(user_id=user_id, target_type=target_type, target_id=target_id, value=value)
+        .on_conflict_do_nothing(index_elements=["user_id", "target_type", "target_id"])
+        .returning(Vote.value)
+    ).scalar()
+    if inserted is not None:
+        return vote_delta(0, value)
+
+    switched = db.execute(
+        update(Vote)
+        .where(*key, Vote.value != value)
+        .values(value=value, updated_at=func.now())
+        .returning(Vote.value)
+    ).scalar()
+    if switched is not None:
+        return vote_delta(-value, value)
+
+    # Same vote repeated: nothing changes
+    return 0, 0
+
+
+def cast_vote(
+    db: Session,
+    user_id: UUID,
+    target_type: str,
+    target_id: UUID,
+    vote_type: str
+) -> Optional[Tuple[int, int]]:
+    """Record a vote and return the target's (upvotes, downvotes).
+
+    Returns None if the target does not exist. The caller commits; on None
+    it should roll back so no orphan ledger row is kept.
+    """
+    model = VOTE_TARGETS[target_type]
+    up, down = record_vote(db, user_id, target_type, target_id, VOTE_VALUES[vote_type])
+
+    if up or down:
+        row = db.execute(
+            update(model)
+            .where(model.id == target_id)
+            .values(
+                upvotes=func.coalesce(model.upvotes, 0) + up,
+                downvotes=func.coalesce(model.downvotes, 0) + down
+            )
+            .returning(model.upvotes, model.downvotes)
+            .execution_options(synchronize_session=False)
+        ).first()
+    else:
+        row = db.execute(select(model.upvotes, model.downvotes).where(model.id == target_id)).first()
+
+    return (row[0] or 0, row[1] or 0) if row else None
@@ -0,0 +1,58 @@
+"""Keyset (cursor) pagination helpers.
+
+Cursors are opaque, URL-safe tokens wrapping the sort key of the last row
+of a page. Clients pass them back unchanged to fetch the next page, which
+lets list endpoints seek straight to the next row via an index instead of
+scanning and discarding OFFSET rows.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode a row's sort key as an opaque cursor token."""
+    payload = json.dumps([_serialize(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> List[Any]:
+    """Decode a cursor token, applying one parser per sort key component.
+
+    Raises HTTP 400 if the token is malformed or has the wrong shape.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor has unexpected shape")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor") from e
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = True):
+    """Row-value filter selecting rows after a cursor in (columns) order.
+
+    All columns must sort in the same direction; the index used for the
+    ORDER BY can then seek directly to the cursor position.
+    """
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
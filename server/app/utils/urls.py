@@ -0,0 +1,57 @@
+"""URL normalization for duplicate detection.
+
+Two submissions of the same link should hash the same even if they differ
+in letter case of scheme/host, default ports, fragments, tracking
+parameters, query parameter order or a trailing slash.
+"""
+import hashlib
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "_hsenc", "_hsmi", "si",
+})
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: Optional[str]) -> Optional[str]:
+    """Canonical form of a URL, or None if there is nothing to normalize."""
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    if "://" not in url:
+        url = f"http://{url}"
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_hash(url: Optional[str]) -> Optional[str]:
+    """SHA-256 hex digest of the normalized URL (None for empty URLs)."""
+    normalized = normalize_url(url)
+    if normalized is None:
+        return None
+    return hashlib.sha256(normalized.encode()).hexdigest()
@@ -1,7 +1,9 @@
 import asyncio
+import json
 import sys
 import os
 from pathlib import Path
+from uuid import UUID
 
 # Add the project root to sys.path so we can import from app
 project_root = Path(__file__).parent.parent.parent
@@ -11,6 +13,20 @@ from app.core.redis import redis_manager
 from app.core.scheduler import task_queue
 from app.core.logging import configure_logging, get_logger
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.group_broadcast import (
+    BROADCAST_BATCH_SIZE,
+    broadcast_progress_key,
+    count_broadcast_recipients,
+    deliver_broadcast_batch
+)
+from app.services.link_metadata import LinkEnricher, get_resource_url, store_resource_metadata
+from app.services.thread_subscriptions import (
+    FANOUT_PROGRESS_TTL,
+    NOTIFICATION_BATCH_SIZE,
+    fanout_progress_key,
+    get_subscriber_batch
+)
 import structlog
 
 # Configure logging for worker
@@ -21,6 +37,9 @@ class TaskWorker:
     def __init__(self):
         self.running = False
         self.queues = ["default", "notifications", "background_tasks"]
+        self.link_enricher = LinkEnricher()
+        # Link enrichment waits on outbound HTTP, so those tasks run side by side
+        self._enrichment_tasks = set()
 
     async def start(self):
         """Start the task worker"""
@@ -53,6 +72,8 @@ class TaskWorker:
         """Stop the task worker"""
         logger.info("Stopping task worker")
         self.running = False
+        if self._enrichment_tasks:
+            await asyncio.gather(*self._enrichment_tasks, return_exceptions=True)
         await redis_manager.disconnect()
         logger.info("Task worker stopped")
 
@@ -61,11 +82,22 @@ class TaskWorker:
         for queue_name in self.queues:
             try:
                 task = await task_queue.dequeue_task(queue_name)
+                while task and task.get("type") == "enrich_resource_metadata":
+                    await self._start_enrichment(task, queue_name)
+                    task = await task_queue.dequeue_task(queue_name)
                 if task:
                     await self._process_task(task, queue_name)
             except Exception as e:
                 logger.error("Error processing queue", queue=queue_name, error=str(e))
 
+    async def _start_enrichment(self, task_data: dict, queue_name: str):
+        """Run an enrichment task in the background, up to the enricher's concurrency"""
+        while len(self._enrichment_tasks) >= self.link_enricher.concurrency:
+            await asyncio.wait(self._enrichment_tasks, return_when=asyncio.FIRST_COMPLETED)
+        task = asyncio.create_task(self._process_task(task_data, queue_name))
+        self._enrichment_tasks.add(task)
+        task.add_done_callback(self._enrichment_tasks.discard)
+
     async def _process_task(self, task_data: dict, queue_name: str):
         """Process a single task"""
         task_id = task_data.get("id", "unknown")
@@ -86,6 +118,10 @@ class TaskWorker:
                 await self._handle_cleanup_task(task_data)
             elif task_type == "generate_report":
                 await self._handle_report_generation(task_data)
+            elif task_type == "broadcast_group_message":
+                await self._handle_group_broadcast_task(task_data)
+            elif task_type == "enrich_resource_metadata":
+                await self._handle_resource_metadata_task(task_data)
             else:
                 logger.warning("Unknown task type", task_type=task_type)
                 return
@@ -107,6 +143,13 @@ class TaskWorker:
     async def _handle_notification_task(self, task_data: dict):
         """Handle notification sending tasks"""
         data = task_data.get("data", {})
+        if data.get("thread_id"):
+            await self._fan_out_thread_notification(task_data)
+            return
+        if data.get("user_ids"):
+            await self._notify_users(task_data)
+            return
+
         user_id = data.get("user_id")
         message = data.get("message")
         notification_type = data.get("type", "info")
@@ -131,6 +174,64 @@ class TaskWorker:
         await redis_manager.push_to_list(notification_key, str(notification))
         logger.info("Notification stored", user_id=user_id)
 
+    async def _fan_out_thread_notification(self, task_data: dict):
+        """Notify every subscriber of a thread, one keyset batch at a time"""
+        data = task_data["data"]
+        thread_id = UUID(data["thread_id"])
+        author_id = UUID(data["author_id"]) if data.get("author_id") else None
+        progress_key = fanout_progress_key(task_data["id"])
+
+        # Resume after the last delivered batch if this is a retry
+        after = await redis_manager.get(progress_key)
+        after_user_id = UUID(after) if after else None
+        notification = str({
+            "id": task_data.get("id"),
+            "message": data.get("message"),
+            "type": data.get("type", "info"),
+            "thread_id": data["thread_id"],
+            "reply_id": data.get("reply_id"),
+            "created_at": task_data.get("created_at"),
+            "read": False
+        })
+        event = json.dumps({"type": data.get("type", "info"), "thread_id": data["thread_id"], "reply_id": data.get("reply_id")})
+
+        delivered = 0
+        while True:
+            batch = await self._run_db(get_subscriber_batch, thread_id, author_id, after_user_id, NOTIFICATION_BATCH_SIZE)
+            if not batch:
+                break
+
+            if not await redis_manager.push_to_lists([(f"notifications:{user_id}", notification) for user_id in batch]):
+                raise RuntimeError("Failed to store notifications")
+            await redis_manager.publish_many([(f"user_events:{user_id}", event) for user_id in batch])
+
+            after_user_id = batch[-1]
+            delivered += len(batch)
+            await redis_manager.set(progress_key, str(after_user_id), expire=FANOUT_PROGRESS_TTL)
+
+        await redis_manager.delete(progress_key)
+        logger.info("Thread notification fanned out", thread_id=str(thread_id), recipients=delivered)
+
+    async def _notify_users(self, task_data: dict):
+        """Store one notification for each of a batch of users"""
+        data = task_data["data"]
+        notification = {
+            "id": task_data.get("id"),
+            "message": data.get("message"),
+            "type": data.get("type", "info"),
+            "created_at": task_data.get("created_at"),
+            "read": False
+        }
+        if data.get("group_id"):
+            notification["group_id"] = data["group_id"]
+        event = json.dumps({key: notification[key] for key in ("type", "group_id") if key in notification})
+
+        user_ids = data["user_ids"]
+        if not await redis_manager.push_to_lists([(f"notifications:{user_id}", str(notification)) for user_id in user_ids]):
+            raise RuntimeError("Failed to store notifications")
+        await redis_manager.publish_many([(f"user_events:{user_id}", event) for user_id in user_ids])
+        logger.info("Batch notification stored", recipients=len(user_ids), type=notification["type"])
+
     async def _handle_user_activity_task(self, task_data: dict):
         """Handle user activity processing tasks"""
         data = task_data.get("data", {})
@@ -193,6 +294,84 @@ class TaskWorker:
         await redis_manager.set_json(report_key, report_result, expire=604800)  # 7 days
         logger.info("Report generated and stored", report_type=report_type, user_id=user_id)
 
+    async def _run_db(self, func, *args):
+        """Run a synchronous database call in a thread with its own session"""
+        def run():
+            db = SessionLocal()
+            try:
+                return func(db, *args)
+            finally:
+                db.close()
+
+        return await asyncio.to_thread(run)
+
+    async def _handle_group_broadcast_task(self, task_data: dict):
+        """Fan a study group broadcast out to every member in keyset batches"""
+        data = task_data.get("data", {})
+        group_id = UUID(data["group_id"])
+        sender_id = UUID(data["sender_id"])
+        content = data["content"]
+        broadcast_id = UUID(data["broadcast_id"])
+        progress_key = broadcast_progress_key(data["broadcast_id"])
+
+        # Resume after the last delivered batch if this is a retry
+        progress = await redis_manager.get_hash(progress_key) or {}
+        after_user_id = UUID(progress["last_user_id"]) if progress.get("last_user_id") else None
+        sent = int(progress.get("sent", 0))
+        total = await self._run_db(count_broadcast_recipients, group_id, sender_id)
+        await redis_manager.set_hash(progress_key, {"status": "running", "total": total})
+
+        logger.info("Processing group broadcast", group_id=str(group_id), recipients=total, resume_after=str(after_user_id))
+
+        notification = str({
+            "id": data["broadcast_id"],
+            "message": "New message in your study group",
+            "type": "group_broadcast",
+            "group_id": data["group_id"],
+            "created_at": task_data.get("created_at"),
+            "read": False
+        })
+        event = json.dumps({"type": "new_message", "sender_id": str(sender_id), "group_id": str(group_id)})
+
+        try:
+            while True:
+                batch, inserted = await self._run_db(
+                    deliver_broadcast_batch, broadcast_id, group_id, sender_id, content, after_user_id, BROADCAST_BATCH_SIZE
+                )
+                if not batch:
+                    break
+
+                if not await redis_manager.push_to_lists([(f"notifications:{user_id}", notification) for user_id in batch]):
+                    raise RuntimeError("Failed to store notifications")
+                await redis_manager.publish_many([(f"user_events:{user_id}", event) for user_id in batch])
+
+                after_user_id = batch[-1]
+                sent += inserted
+                await redis_manager.set_hash(progress_key, {"sent": sent, "last_user_id": str(after_user_id)})
+        except Exception:
+            await redis_manager.set_hash(progress_key, {"status": "failed"})
+            raise
+
+        await redis_manager.set_hash(progress_key, {"status": "completed"})
+        logger.info("Group broadcast completed", group_id=str(group_id), recipients=sent)
+
+    async def _handle_resource_metadata_task(self, task_data: dict):
+        """Fetch and store a shared resource's link preview"""
+        resource_id = UUID(task_data["data"]["resource_id"])
+        url = await self._run_db(get_resource_url, resource_id)
+        if not url:
+            logger.info("Resource gone or has no URL, skipping enrichment", resource_id=str(resource_id))
+            return
+
+        metadata = await self.link_enricher.enrich(url)
+        if metadata is None:
+            # Fetch failures are not retried; the link may simply be down
+            logger.info("No link metadata available", resource_id=str(resource_id))
+            return
+
+        stored = await self._run_db(store_resource_metadata, resource_id, url, metadata)
+        logger.info("Link metadata stored", resource_id=str(resource_id), stored=stored)
+
 async def main():
     """Main worker entry point"""
     worker = TaskWorker()
@@ -12,20 +12,24 @@ Run this script to set up the database schema
 
 import os
 import sys
-from sqlalchemy import create_engine
-from app.core.config import settings
-from app.core.database import Base
-# Import all models to ensure they're registered with SQLAlchemy
-from app.models.user import User, UserLocation, Message
-from app.models.resource import SharedResource
-from app.models.forum import ForumCategory, ForumThread, ForumReply
-from app.models.study_group import StudyGroup, StudyGroupMember
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.core.database import Base
+# Import all models to ensure they're registered with SQLAlchemy
+from app.models.user import User, UserLocation, Message, ArchivedMessage
+from app.models.resource import SharedResource
+from app.models.forum import ForumCategory, ForumThread, ForumReply, ThreadSubscription
+from app.models.study_group import StudyGroup, StudyGroupMember, StudyGroupInvitation
+from app.models.vote import Vote
 def create_database():
     """Create database tables"""
     print("Creating database tables...")
     
     try:
         engine = create_engine(settings.DATABASE_URL)
+        # Trigram indexes used by site search need pg_trgm
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         Base.metadata.create_all(bind=engine)
         print("✅ Database tables created successfully!")
         
@@ -0,0 +1,23 @@
+"""Migration script for the forum overview
+
+Adds a (category_id, created_at) index on forum_threads so the overview's
+per-category newest-thread lookup is a single index probe.
+
+Revision ID: forum_overview_001
+Revises: thread_views_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'forum_overview_001'
+down_revision = 'thread_views_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_forum_threads_category_created', 'forum_threads', ['category_id', 'created_at'])
+
+def downgrade():
+    op.drop_index('ix_forum_threads_category_created', table_name='forum_threads')
@@ -0,0 +1,37 @@
+"""Migration script for forum thread ranking
+
+Adds:
+- hot_score column on forum_threads (maintained by app.services.forum_ranking)
+- (category_id, is_pinned, hot_score) index for ranked category listings
+
+Revision ID: forum_ranking_001
+Revises: message_archive_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'forum_ranking_001'
+down_revision = 'message_archive_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Keyset pagination compares is_pinned in row values, so it must not be NULL
+    op.execute("UPDATE forum_threads SET is_pinned = false WHERE is_pinned IS NULL")
+
+    op.add_column(
+        'forum_threads',
+        sa.Column('hot_score', sa.Float, server_default='0', nullable=False)
+    )
+    op.create_index(
+        'ix_forum_threads_category_pinned_hot',
+        'forum_threads',
+        ['category_id', 'is_pinned', 'hot_score']
+    )
+
+def downgrade():
+    op.drop_index('ix_forum_threads_category_pinned_hot', table_name='forum_threads')
+    op.drop_column('forum_threads', 'hot_score')
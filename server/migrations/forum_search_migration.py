@@ -0,0 +1,42 @@
+"""Migration script for forum full-text search
+
+Adds stored generated tsvector columns to forum_threads (title weighted A,
+content B) and forum_replies (content C), each with a GIN index. Postgres
+computes the existing rows while adding the columns and keeps them current
+on every insert/update, so no trigger or backfill is needed.
+
+Revision ID: forum_search_001
+Revises: thread_activity_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'forum_search_001'
+down_revision = 'thread_activity_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("""
+        ALTER TABLE forum_threads ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED
+    """)
+    op.execute("""
+        ALTER TABLE forum_replies ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(content, '')), 'C')
+        ) STORED
+    """)
+    op.create_index('ix_forum_threads_search_vector', 'forum_threads', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_forum_replies_search_vector', 'forum_replies', ['search_vector'], postgresql_using='gin')
+
+def downgrade():
+    op.drop_index('ix_forum_replies_search_vector', table_name='forum_replies')
+    op.drop_index('ix_forum_threads_search_vector', table_name='forum_threads')
+    op.drop_column('forum_replies', 'search_vector')
+    op.drop_column('forum_threads', 'search_vector')
@@ -0,0 +1,47 @@
+"""Migration script for atomic study group capacity
+
+Adds member_count to study_groups, removes duplicate memberships (keeping
+each user's earliest), adds a unique (group_id, user_id) constraint and
+backfills the counts in one aggregate pass.
+
+Revision ID: group_capacity_001
+Revises: site_search_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'group_capacity_001'
+down_revision = 'site_search_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('study_groups', sa.Column('member_count', sa.Integer, nullable=False, server_default='0'))
+
+    op.execute("""
+        DELETE FROM study_group_members m
+        USING (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY group_id, user_id ORDER BY joined_at, id) AS position
+            FROM study_group_members
+        ) ranked
+        WHERE m.id = ranked.id AND ranked.position > 1
+    """)
+    op.create_unique_constraint('uq_study_group_members_group_user', 'study_group_members', ['group_id', 'user_id'])
+
+    op.execute("""
+        UPDATE study_groups g
+        SET member_count = s.member_count
+        FROM (
+            SELECT group_id, COUNT(*) AS member_count
+            FROM study_group_members
+            GROUP BY group_id
+        ) s
+        WHERE g.id = s.group_id
+    """)
+
+def downgrade():
+    op.drop_constraint('uq_study_group_members_group_user', 'study_group_members', type_='unique')
+    op.drop_column('study_groups', 'member_count')
@@ -0,0 +1,23 @@
+"""Migration script for the study group directory
+
+Adds a (created_at, id) index on study_groups so the directory's keyset
+pagination seeks to each page instead of sorting the whole table.
+
+Revision ID: group_directory_001
+Revises: group_capacity_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'group_directory_001'
+down_revision = 'group_capacity_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_study_groups_created', 'study_groups', ['created_at', 'id'])
+
+def downgrade():
+    op.drop_index('ix_study_groups_created', table_name='study_groups')
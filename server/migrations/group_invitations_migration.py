@@ -0,0 +1,34 @@
+"""Migration script for study group invitations
+
+Adds study_group_invitations keyed by (group_id, user_id), with a user_id
+index for listing a user's pending invitations. Joining a group consumes
+the invitation; private groups require one.
+
+Revision ID: group_invitations_001
+Revises: vote_batches_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = 'group_invitations_001'
+down_revision = 'vote_batches_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'study_group_invitations',
+        sa.Column('group_id', UUID(as_uuid=True), sa.ForeignKey('study_groups.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('invited_by', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='SET NULL')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()'))
+    )
+    op.create_index('ix_study_group_invitations_user', 'study_group_invitations', ['user_id'])
+
+def downgrade():
+    op.drop_index('ix_study_group_invitations_user', table_name='study_group_invitations')
+    op.drop_table('study_group_invitations')
@@ -0,0 +1,46 @@
+"""Migration script for message archival
+
+Adds:
+- messages_archive table holding cold message history
+- (sender_id, created_at) and (recipient_id, created_at) indexes on both
+  tables so history reads are index range scans
+
+Revision ID: message_archive_001
+Revises: about_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = 'message_archive_001'
+down_revision = 'about_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_messages_sender_created', 'messages', ['sender_id', 'created_at'])
+    op.create_index('ix_messages_recipient_created', 'messages', ['recipient_id', 'created_at'])
+
+    # Create messages_archive table (same shape as messages)
+    op.create_table(
+        'messages_archive',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('sender_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('recipient_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('content', sa.Text, nullable=False),
+        sa.Column('is_read', sa.Boolean, server_default='true'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()'))
+    )
+    op.create_index('ix_messages_archive_sender_created', 'messages_archive', ['sender_id', 'created_at'])
+    op.create_index('ix_messages_archive_recipient_created', 'messages_archive', ['recipient_id', 'created_at'])
+
+def downgrade():
+    op.drop_index('ix_messages_archive_recipient_created', table_name='messages_archive')
+    op.drop_index('ix_messages_archive_sender_created', table_name='messages_archive')
+    op.drop_table('messages_archive')
+    op.drop_index('ix_messages_recipient_created', table_name='messages')
+    op.drop_index('ix_messages_sender_created', table_name='messages')
@@ -0,0 +1,23 @@
+"""Migration script for paginated thread replies
+
+Adds a (thread_id, created_at) index on forum_replies so reply pages can
+seek straight to the cursor position in chronological order.
+
+Revision ID: reply_pagination_001
+Revises: forum_overview_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'reply_pagination_001'
+down_revision = 'forum_overview_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_forum_replies_thread_created', 'forum_replies', ['thread_id', 'created_at'])
+
+def downgrade():
+    op.drop_index('ix_forum_replies_thread_created', table_name='forum_replies')
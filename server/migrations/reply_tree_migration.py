@@ -0,0 +1,53 @@
+"""Migration script for materialized-path forum replies
+
+Adds path/depth columns to forum_replies, backfills them for existing
+replies with a recursive CTE, and indexes (thread_id, path) so a thread's
+reply tree is a single ordered index scan. Path segments must match
+app.services.reply_tree.reply_path_segment.
+
+Revision ID: reply_tree_001
+Revises: forum_ranking_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'reply_tree_001'
+down_revision = 'forum_ranking_001'
+branch_labels = None
+depends_on = None
+
+SEGMENT_SQL = (
+    "lpad((extract(epoch from {t}.created_at) * 1000000)::bigint::text, 17, '0')"
+    " || substr(replace({t}.id::text, '-', ''), 1, 4)"
+)
+
+def upgrade():
+    op.add_column('forum_replies', sa.Column('path', sa.String(1024, collation='C'), nullable=True))
+    op.add_column('forum_replies', sa.Column('depth', sa.Integer, server_default='0', nullable=False))
+
+    op.execute(f"""
+        WITH RECURSIVE tree AS (
+            SELECT r.id, {SEGMENT_SQL.format(t='r')}::text AS path, 0 AS depth
+            FROM forum_replies r
+            WHERE r.parent_reply_id IS NULL
+            UNION ALL
+            SELECT c.id, tree.path || '/' || {SEGMENT_SQL.format(t='c')}, tree.depth + 1
+            FROM forum_replies c
+            JOIN tree ON c.parent_reply_id = tree.id
+        )
+        UPDATE forum_replies f
+        SET path = tree.path, depth = tree.depth
+        FROM tree
+        WHERE f.id = tree.id
+    """)
+
+    op.alter_column('forum_replies', 'path', existing_type=sa.String(1024, collation='C'), nullable=False)
+    op.create_index('ix_forum_replies_thread_path', 'forum_replies', ['thread_id', 'path'])
+
+def downgrade():
+    op.drop_index('ix_forum_replies_thread_path', table_name='forum_replies')
+    op.drop_column('forum_replies', 'depth')
+    op.drop_column('forum_replies', 'path')
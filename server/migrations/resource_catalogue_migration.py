@@ -0,0 +1,59 @@
+"""Migration script for the approved resource catalogue
+
+Adds:
+- wilson_score column on shared_resources (maintained by app.services.resource_ranking)
+- partial indexes over approved resources for the new/top/wilson sorts
+
+Revision ID: resource_catalogue_001
+Revises: thread_subscriptions_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'resource_catalogue_001'
+down_revision = 'thread_subscriptions_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        'shared_resources',
+        sa.Column('wilson_score', sa.Float, server_default='0', nullable=False)
+    )
+    op.execute("""
+        UPDATE shared_resources
+        SET wilson_score = (
+            (p + 1.96 * 1.96 / (2 * n) - 1.96 * SQRT((p * (1 - p) + 1.96 * 1.96 / (4 * n)) / n))
+            / (1 + 1.96 * 1.96 / n)
+        )
+        FROM (
+            SELECT id AS resource_id,
+                   COALESCE(upvotes, 0)::float / (COALESCE(upvotes, 0) + COALESCE(downvotes, 0)) AS p,
+                   (COALESCE(upvotes, 0) + COALESCE(downvotes, 0))::float AS n
+            FROM shared_resources
+            WHERE COALESCE(upvotes, 0) + COALESCE(downvotes, 0) > 0
+        ) counts
+        WHERE shared_resources.id = counts.resource_id
+    """)
+
+    op.create_index(
+        'ix_shared_resources_approved_new', 'shared_resources', ['created_at', 'id'],
+        postgresql_where=sa.text('is_approved')
+    )
+    op.create_index(
+        'ix_shared_resources_approved_top', 'shared_resources', [sa.text('(coalesce(upvotes, 0) - coalesce(downvotes, 0))'), 'id'],
+        postgresql_where=sa.text('is_approved')
+    )
+    op.create_index(
+        'ix_shared_resources_approved_wilson', 'shared_resources', ['wilson_score', 'id'],
+        postgresql_where=sa.text('is_approved')
+    )
+
+def downgrade():
+    op.drop_index('ix_shared_resources_approved_wilson', table_name='shared_resources')
+    op.drop_index('ix_shared_resources_approved_top', table_name='shared_resources')
+    op.drop_index('ix_shared_resources_approved_new', table_name='shared_resources')
+    op.drop_column('shared_resources', 'wilson_score')
@@ -0,0 +1,30 @@
+"""Migration script for resource link previews
+
+Adds preview_title, preview_description, preview_image_url and
+metadata_fetched_at to shared_resources, filled in by the task worker.
+
+Revision ID: resource_link_metadata_001
+Revises: resource_url_hash_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'resource_link_metadata_001'
+down_revision = 'resource_url_hash_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('shared_resources', sa.Column('preview_title', sa.String(255), nullable=True))
+    op.add_column('shared_resources', sa.Column('preview_description', sa.Text, nullable=True))
+    op.add_column('shared_resources', sa.Column('preview_image_url', sa.String(1000), nullable=True))
+    op.add_column('shared_resources', sa.Column('metadata_fetched_at', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade():
+    op.drop_column('shared_resources', 'metadata_fetched_at')
+    op.drop_column('shared_resources', 'preview_image_url')
+    op.drop_column('shared_resources', 'preview_description')
+    op.drop_column('shared_resources', 'preview_title')
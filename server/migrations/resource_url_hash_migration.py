@@ -0,0 +1,37 @@
+"""Migration script for resource URL deduplication
+
+Adds shared_resources.url_hash (SHA-256 of the normalized URL) with an
+index and backfills it. Existing duplicates are left in place for the
+merge job in app.services.resource_dedupe, which is why the index is not
+unique.
+
+Revision ID: resource_url_hash_001
+Revises: resource_catalogue_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.urls import url_hash
+
+# revision identifiers
+revision = 'resource_url_hash_001'
+down_revision = 'resource_catalogue_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('shared_resources', sa.Column('url_hash', sa.String(64), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, url FROM shared_resources WHERE url IS NOT NULL")).all()
+    hashes = [{"id": row.id, "url_hash": url_hash(row.url)} for row in rows]
+    if hashes:
+        bind.execute(sa.text("UPDATE shared_resources SET url_hash = :url_hash WHERE id = :id"), hashes)
+
+    op.create_index('ix_shared_resources_url_hash', 'shared_resources', ['url_hash'])
+
+def downgrade():
+    op.drop_index('ix_shared_resources_url_hash', table_name='shared_resources')
+    op.drop_column('shared_resources', 'url_hash')
@@ -0,0 +1,34 @@
+"""Migration script for trigram site search
+
+Enables pg_trgm and adds GIN trigram indexes on shared resource titles and
+descriptions, study group names and usernames. They serve both prefix
+(ILIKE 'q%') and word-similarity (<%) lookups for autocomplete search.
+
+Revision ID: site_search_001
+Revises: resource_link_metadata_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'site_search_001'
+down_revision = 'resource_link_metadata_001'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = [
+    ('ix_shared_resources_title_trgm', 'shared_resources', 'title'),
+    ('ix_shared_resources_description_trgm', 'shared_resources', 'description'),
+    ('ix_study_groups_name_trgm', 'study_groups', 'name'),
+    ('ix_users_username_trgm', 'users', 'username'),
+]
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+def downgrade():
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,49 @@
+"""Migration script for denormalized thread reply activity
+
+Adds reply_count, last_reply_at and last_reply_author_id to forum_threads
+and backfills them from forum_replies in one aggregate pass.
+
+Revision ID: thread_activity_001
+Revises: votes_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = 'thread_activity_001'
+down_revision = 'votes_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('forum_threads', sa.Column('reply_count', sa.Integer, nullable=False, server_default='0'))
+    op.add_column('forum_threads', sa.Column('last_reply_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        'forum_threads',
+        sa.Column('last_reply_author_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    )
+
+    op.execute("""
+        UPDATE forum_threads t
+        SET reply_count = s.reply_count,
+            last_reply_at = s.last_reply_at,
+            last_reply_author_id = s.last_reply_author_id
+        FROM (
+            SELECT DISTINCT ON (thread_id)
+                thread_id,
+                COUNT(*) OVER (PARTITION BY thread_id) AS reply_count,
+                created_at AS last_reply_at,
+                author_id AS last_reply_author_id
+            FROM forum_replies
+            ORDER BY thread_id, created_at DESC, id DESC
+        ) s
+        WHERE t.id = s.thread_id
+    """)
+
+def downgrade():
+    op.drop_column('forum_threads', 'last_reply_author_id')
+    op.drop_column('forum_threads', 'last_reply_at')
+    op.drop_column('forum_threads', 'reply_count')
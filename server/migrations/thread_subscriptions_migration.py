@@ -0,0 +1,41 @@
+"""Migration script for thread subscriptions
+
+Adds thread_subscriptions keyed by (thread_id, user_id), which is also the
+index walked when fanning out reply notifications, and backfills it with
+every thread's author and repliers.
+
+Revision ID: thread_subscriptions_001
+Revises: reply_pagination_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = 'thread_subscriptions_001'
+down_revision = 'reply_pagination_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'thread_subscriptions',
+        sa.Column('thread_id', UUID(as_uuid=True), sa.ForeignKey('forum_threads.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()'))
+    )
+    op.create_index('ix_thread_subscriptions_user', 'thread_subscriptions', ['user_id'])
+
+    op.execute("""
+        INSERT INTO thread_subscriptions (thread_id, user_id)
+        SELECT id, author_id FROM forum_threads WHERE author_id IS NOT NULL
+        UNION
+        SELECT thread_id, author_id FROM forum_replies WHERE author_id IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+
+def downgrade():
+    op.drop_index('ix_thread_subscriptions_user', table_name='thread_subscriptions')
+    op.drop_table('thread_subscriptions')
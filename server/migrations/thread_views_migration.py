@@ -0,0 +1,31 @@
+"""Migration script for thread view counts
+
+Adds forum_threads.view_count (unique-viewer snapshots persisted from Redis
+HyperLogLogs by app.services.thread_views) and an index for sorting a
+category's threads by views.
+
+Revision ID: thread_views_001
+Revises: forum_search_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'thread_views_001'
+down_revision = 'forum_search_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('forum_threads', sa.Column('view_count', sa.Integer, nullable=False, server_default='0'))
+    op.create_index(
+        'ix_forum_threads_category_pinned_views',
+        'forum_threads',
+        ['category_id', 'is_pinned', 'view_count']
+    )
+
+def downgrade():
+    op.drop_index('ix_forum_threads_category_pinned_views', table_name='forum_threads')
+    op.drop_column('forum_threads', 'view_count')
@@ -0,0 +1,29 @@
+"""Migration script for idempotent vote buffer flushes
+
+Adds applied_vote_batches, where each flush of the Redis vote buffer
+records its batch ID in the same transaction as its counter updates, so a
+batch retried after a crash is not applied twice.
+
+Revision ID: vote_batches_001
+Revises: group_directory_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'vote_batches_001'
+down_revision = 'group_directory_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'applied_vote_batches',
+        sa.Column('batch_id', sa.String(36), primary_key=True),
+        sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()'), nullable=False)
+    )
+
+def downgrade():
+    op.drop_table('applied_vote_batches')
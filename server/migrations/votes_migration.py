@@ -0,0 +1,37 @@
+"""Migration script for the per-user vote ledger
+
+Adds the votes table keyed by (user_id, target_type, target_id). Existing
+upvotes/downvotes counters are kept as-is; votes cast before this ledger
+existed are not attributable to users and cannot be backfilled.
+
+Revision ID: votes_001
+Revises: reply_tree_001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers
+revision = 'votes_001'
+down_revision = 'reply_tree_001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'votes',
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('target_type', sa.String(20), primary_key=True),
+        sa.Column('target_id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('value', sa.SmallInteger, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('NOW()')),
+        sa.CheckConstraint('value IN (-1, 1)', name='ck_votes_value')
+    )
+    op.create_index('ix_votes_target', 'votes', ['target_type', 'target_id'])
+
+def downgrade():
+    op.drop_index('ix_votes_target', table_name='votes')
+    op.drop_table('votes')
@@ -0,0 +1,147 @@
+"""Benchmark forum search over a seeded synthetic corpus.
+
+Generates threads and replies from a fixed vocabulary and times a set of
+queries against the in-process fallback index. With --postgres the same
+corpus is inserted into the configured database inside a transaction,
+the GIN-backed search is timed too, and everything is rolled back.
+
+Usage:
+    python -m seeds.forum_search_benchmark [--threads 5000] [--replies 20000] [--postgres]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+# Import User first to register it with SQLAlchemy before forum models
+from app.models.user import User
+from app.models.forum import ForumThread, ForumReply
+from app.services.forum_search import InvertedIndex, search_threads_pg
+from app.services.reply_tree import build_reply_path
+
+VOCABULARY = (
+    "gnosis meditation alchemy kabbalah tarot astral projection dream yoga "
+    "mantra chakra kundalini hermetic tree life sephiroth initiation mystery "
+    "school esoteric christianity buddhism tantra consciousness awakening "
+    "ego death rebirth transmutation sacred geometry aquarius age teaching "
+    "practice study group lecture book question experience retreat prayer"
+).split()
+
+QUERIES = [
+    "gnosis",
+    "astral projection",
+    "kundalini awakening",
+    "tree of life sephiroth",
+    "dream yoga practice",
+    "sacred geometry book",
+]
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def generate_corpus(threads, replies, seed=42):
+    """Deterministic (thread rows, reply rows) for the benchmark."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    thread_rows = []
+    for i in range(threads):
+        thread_rows.append({
+            "id": uuid.uuid4(),
+            "title": _sentence(rng, 6).capitalize(),
+            "content": _sentence(rng, 60),
+            "created_at": now - timedelta(minutes=threads - i),
+        })
+
+    reply_rows = []
+    for i in range(replies):
+        thread = rng.choice(thread_rows)
+        reply_id = uuid.uuid4()
+        created_at = thread["created_at"] + timedelta(seconds=i + 1)
+        reply_rows.append({
+            "id": reply_id,
+            "thread_id": thread["id"],
+            "content": _sentence(rng, 30),
+            "created_at": created_at,
+            "path": build_reply_path(None, created_at, reply_id),
+            "depth": 0,
+        })
+    return thread_rows, reply_rows
+
+
+def _time_queries(run, repeat):
+    timings = {}
+    for query in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(query)
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[query] = samples
+    return timings
+
+
+def _report(label, timings):
+    print(f"\n{label}")
+    for query, samples in timings.items():
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"  {query!r:32} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def benchmark_fallback(thread_rows, reply_rows, repeat):
+    class Row:
+        def __init__(self, **fields):
+            self.__dict__.update(fields)
+
+    start = time.perf_counter()
+    index = InvertedIndex.build(
+        (Row(category_id=None, **row) for row in thread_rows),
+        (Row(**row) for row in reply_rows)
+    )
+    print(f"Fallback index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    _report("In-process inverted index", _time_queries(lambda q: index.search(q, limit=20), repeat))
+
+
+def benchmark_postgres(thread_rows, reply_rows, repeat):
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        db.execute(insert(ForumThread), thread_rows)
+        db.execute(insert(ForumReply), reply_rows)
+        db.flush()
+        print(f"Corpus inserted in {(time.perf_counter() - start) * 1000:.1f} ms")
+        _report("Postgres tsvector + GIN", _time_queries(lambda q: search_threads_pg(db, q, limit=20), repeat))
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=5000)
+    parser.add_argument("--replies", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--postgres", action="store_true", help="also benchmark the Postgres search (rolled back)")
+    args = parser.parse_args()
+
+    thread_rows, reply_rows = generate_corpus(args.threads, args.replies)
+    print(f"Corpus: {len(thread_rows)} threads, {len(reply_rows)} replies")
+
+    benchmark_fallback(thread_rows, reply_rows, args.repeat)
+    if args.postgres:
+        benchmark_postgres(thread_rows, reply_rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Bulk import shared resources from curated markdown link lists.
+
+Streams each file line by line and parses markdown list entries:
+
+    - [Title](https://example.com) - optional description
+    - Title: https://example.com
+    - https://example.com
+
+A `#` heading sets the resource type for the entries under it (headings
+mentioning books, video/film/YouTube or audio/podcasts; anything else is
+a link). Entries are deduplicated by normalized URL against the database
+and within the run, then inserted in chunks with one multi-row INSERT and
+one transaction per chunk, so a failure only loses the current chunk.
+Entries without a URL are skipped unless --include-unlinked is given.
+
+The repo's own notes are feature lists rather than link lists, so there
+are no default paths; name the files to import explicitly.
+
+Usage:
+    python -m seeds.import_resources [--submitter admin] [--chunk-size 500] [--pending] path [path ...]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import re
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import SessionLocal
+# Import User first to register it with SQLAlchemy before resource models
+from app.models.user import User
+from app.models.resource import SharedResource
+from app.utils.urls import url_hash
+
+_HEADING_RE = re.compile(r"^\s*#+\s+(.*)$")
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+_URL_RE = re.compile(r"https?://[^\s)>\]]+")
+_WIKI_LINK_RE = re.compile(r"\[\[([^\]|]+)(?:\|([^\]]+))?\]\]")
+_SEPARATOR_RE = re.compile(r"\s+[-–—:]\s+|:\s+")
+
+TYPE_KEYWORDS = [
+    ("book", ("book", "press", "publisher", "library", "reading")),
+    ("video", ("video", "film", "youtube", "documentar", "movie")),
+    ("audio", ("audio", "podcast", "music", "lecture recording")),
+]
+
+
+def resource_type_for_heading(heading: str) -> str:
+    heading = heading.lower()
+    for resource_type, keywords in TYPE_KEYWORDS:
+        if any(keyword in heading for keyword in keywords):
+            return resource_type
+    return "link"
+
+
+def _clean(text: str) -> str:
+    text = _WIKI_LINK_RE.sub(lambda m: m.group(2) or m.group(1), text)
+    return text.replace("**", "").replace("__", "").strip(" \t-:–—")
+
+
+def parse_entry(text: str, resource_type: str) -> Optional[Dict[str, Optional[str]]]:
+    """One list item as resource fields, or None if it has no usable title."""
+    url = None
+    md_link = _MD_LINK_RE.search(text)
+    if md_link:
+        title, url = md_link.group(1), md_link.group(2)
+        rest = text[:md_link.start()] + text[md_link.end():]
+    else:
+        bare = _URL_RE.search(text)
+        if bare:
+            url = bare.group(0).rstrip(".,;")
+            rest = text[:bare.start()] + text[bare.end():]
+        else:
+            rest = text
+        parts = _SEPARATOR_RE.split(_clean(rest), maxsplit=1)
+        title, rest = parts[0], parts[1] if len(parts) > 1 else ""
+
+    title = _clean(title)
+    description = _clean(rest) or None
+    if not title:
+        if not url:
+            return None
+        title = url
+    return {
+        "title": title[:255],
+        "url": url[:500] if url else None,
+        "description": description,
+        "resource_type": resource_type,
+    }
+
+
+def iter_entries(path: str) -> Iterator[Dict[str, Optional[str]]]:
+    """Stream parsed entries from one curated markdown file."""
+    resource_type = resource_type_for_heading(os.path.basename(path))
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            heading = _HEADING_RE.match(line)
+            if heading:
+                resource_type = resource_type_for_heading(heading.group(1))
+                continue
+            bullet = _BULLET_RE.match(line)
+            if not bullet:
+                continue
+            entry = parse_entry(bullet.group(1), resource_type)
+            if entry:
+                yield entry
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def resolve_submitter(db, username: Optional[str]) -> User:
+    query = db.query(User)
+    if username:
+        user = query.filter(User.username == username).first()
+    else:
+        user = query.filter(User.is_admin.is_(True)).order_by(User.created_at).first()
+    if user is None:
+        raise SystemExit(f"Submitter not found: {username or 'no admin user exists'}")
+    return user
+
+
+def new_rows(
+    db,
+    chunk: List[Dict[str, Optional[str]]],
+    seen_hashes: set,
+    seen_titles: set,
+    include_unlinked: bool,
+    stats: Dict[str, int]
+) -> List[Dict[str, Optional[str]]]:
+    """The chunk's entries not already in the database or earlier in the run.
+
+    Linked entries are matched by URL hash, unlinked ones (when included)
+    by lowercased title; `seen_*` and `stats` are updated in place.
+    """
+    for entry in chunk:
+        entry["url_hash"] = url_hash(entry["url"])
+    hashes = {entry["url_hash"] for entry in chunk if entry["url_hash"]}
+    existing = set(db.execute(
+        select(SharedResource.url_hash).where(SharedResource.url_hash.in_(hashes))
+    ).scalars()) if hashes else set()
+
+    unlinked_titles = {entry["title"].lower() for entry in chunk if not entry["url_hash"]}
+    existing_titles = set(db.execute(
+        select(func.lower(SharedResource.title))
+        .where(SharedResource.url.is_(None), func.lower(SharedResource.title).in_(unlinked_titles))
+    ).scalars()) if include_unlinked and unlinked_titles else set()
+
+    rows = []
+    for entry in chunk:
+        digest = entry["url_hash"]
+        if digest is None:
+            title_key = entry["title"].lower()
+            if not include_unlinked:
+                stats["unlinked"] += 1
+                continue
+            if title_key in existing_titles or title_key in seen_titles:
+                stats["duplicates"] += 1
+                continue
+            seen_titles.add(title_key)
+        elif digest in existing or digest in seen_hashes:
+            stats["duplicates"] += 1
+            continue
+        else:
+            seen_hashes.add(digest)
+        rows.append(entry)
+    return rows
+
+
+def import_resources(
+    paths: List[str],
+    submitter_username: Optional[str] = None,
+    chunk_size: int = 500,
+    approve: bool = True,
+    include_unlinked: bool = False
+) -> Dict[str, int]:
+    stats = {"parsed": 0, "inserted": 0, "duplicates": 0, "unlinked": 0}
+    seen_hashes = set()
+    seen_titles = set()
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        submitter_id = resolve_submitter(db, submitter_username).id
+        entries = (entry for path in paths for entry in iter_entries(path))
+
+        for chunk in chunked(entries, chunk_size):
+            chunk_started = time.perf_counter()
+            stats["parsed"] += len(chunk)
+
+            rows = new_rows(db, chunk, seen_hashes, seen_titles, include_unlinked, stats)
+            for row in rows:
+                row.update(submitted_by=submitter_id, is_approved=approve)
+
+            if rows:
+                db.execute(insert(SharedResource), rows)
+            db.commit()
+            stats["inserted"] += len(rows)
+
+            elapsed = time.perf_counter() - chunk_started
+            print(f"  chunk: {len(chunk)} parsed, {len(rows)} inserted in {elapsed * 1000:.1f} ms")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    rate = stats["parsed"] / elapsed if elapsed else 0
+    print(
+        f"Imported {stats['inserted']} of {stats['parsed']} entries "
+        f"({stats['duplicates']} duplicates, {stats['unlinked']} without URL) "
+        f"in {elapsed:.2f}s, {rate:.0f} entries/s"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import shared resources from curated markdown lists")
+    parser.add_argument("paths", nargs="+", help="curated markdown files to import")
+    parser.add_argument("--submitter", help="username recorded as submitter (default: the first admin)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--pending", action="store_true", help="leave imported resources awaiting approval")
+    parser.add_argument("--include-unlinked", action="store_true", help="also import entries that have no URL")
+    args = parser.parse_args()
+
+    import_resources(
+        args.paths,
+        submitter_username=args.submitter,
+        chunk_size=args.chunk_size,
+        approve=not args.pending,
+        include_unlinked=args.include_unlinked
+    )
+
+
+if __name__ == "__main__":
+    main()
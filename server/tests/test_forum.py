@@ -40,3 +40,608 @@ def test_get_categories():
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+
+def test_hot_score_decays_with_age():
+    from datetime import datetime, timedelta, timezone
+    from app.services.forum_ranking import compute_hot_score
+
+    now = datetime.now(timezone.utc)
+    fresh = compute_hot_score(10, 0, 0, now - timedelta(hours=1), now=now)
+    stale = compute_hot_score(10, 0, 0, now - timedelta(days=3), now=now)
+
+    assert fresh > stale > 0
+
+def test_hot_score_counts_replies_and_downvotes():
+    from datetime import datetime, timezone
+    from app.services.forum_ranking import compute_hot_score
+
+    now = datetime.now(timezone.utc)
+    assert compute_hot_score(5, 0, 4, now, now=now) > compute_hot_score(5, 0, 0, now, now=now)
+    assert compute_hot_score(2, 5, 0, now, now=now) < 0
+
+def test_thread_listing_rejects_unknown_sort():
+    response = client.get(f"/api/v1/forum/categories/{uuid4()}/threads?sort=random")
+    assert response.status_code == 422
+
+def _reply_row(parent=None, minutes=0):
+    from datetime import datetime, timedelta, timezone
+    from types import SimpleNamespace
+    from app.services.reply_tree import build_reply_path
+
+    reply_id = uuid4()
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+    return SimpleNamespace(
+        id=reply_id,
+        parent_reply_id=parent.id if parent else None,
+        path=build_reply_path(parent.path if parent else None, created_at, reply_id),
+        depth=parent.depth + 1 if parent else 0
+    )
+
+def _build_tree(rows, **limits):
+    from app.services.reply_tree import build_reply_tree
+
+    ordered = sorted(rows, key=lambda r: r.path)
+    return build_reply_tree(
+        ordered,
+        serialize=lambda row: {"id": row.id, "path": row.path},
+        base_depth=0,
+        encode_cursor=lambda path: path,
+        **limits
+    )
+
+def test_reply_tree_nests_depth_first_in_time_order():
+    first = _reply_row(minutes=0)
+    second = _reply_row(minutes=1)
+    child = _reply_row(parent=first, minutes=2)
+    grandchild = _reply_row(parent=child, minutes=3)
+
+    tree = _build_tree([second, grandchild, first, child], max_depth=5, max_children=10)
+
+    assert [node["id"] for node in tree["replies"]] == [first.id, second.id]
+    assert tree["replies"][0]["children"][0]["id"] == child.id
+    assert tree["replies"][0]["children"][0]["children"][0]["id"] == grandchild.id
+    assert tree["next_cursor"] is None
+
+def test_reply_tree_applies_child_and_depth_limits():
+    root = _reply_row()
+    children = [_reply_row(parent=root, minutes=i + 1) for i in range(3)]
+    nested = _reply_row(parent=children[0], minutes=10)
+
+    tree = _build_tree([root, nested, *children], max_depth=1, max_children=2)
+    root_node = tree["replies"][0]
+
+    assert root_node["child_count"] == 3
+    assert [node["id"] for node in root_node["children"]] == [children[0].id, children[1].id]
+    assert root_node["has_more_children"] is True
+    assert root_node["children_cursor"] == children[1].path
+    # Depth boundary: counted but not returned
+    assert root_node["children"][0]["child_count"] == 1
+    assert root_node["children"][0]["children"] == []
+    assert root_node["children"][0]["has_more_children"] is True
+
+def test_vote_delta_moves_single_vote():
+    from app.services.voting import vote_delta
+
+    assert vote_delta(0, 1) == (1, 0)
+    assert vote_delta(1, -1) == (-1, 1)
+    assert vote_delta(-1, 0) == (0, -1)
+    assert vote_delta(1, 1) == (0, 0)
+
+def test_vote_value_must_be_up_or_down():
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import IntegrityError
+    from sqlalchemy.orm import Session
+    from app.models.vote import Vote
+
+    engine = create_engine("sqlite://")
+    Vote.__table__.create(engine)
+    with Session(engine) as db:
+        db.add(Vote(user_id=uuid4(), target_type="thread", target_id=uuid4(), value=1))
+        db.commit()
+        db.add(Vote(user_id=uuid4(), target_type="thread", target_id=uuid4(), value=0))
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+def test_search_index_ranks_title_over_body_over_replies():
+    from app.services.forum_search import InvertedIndex
+
+    title_hit, body_hit, reply_hit, miss = uuid4(), uuid4(), uuid4(), uuid4()
+    category = uuid4()
+    index = InvertedIndex()
+    index.add_thread(title_hit, category, "Astral projection basics", "How to begin")
+    index.add_thread(body_hit, category, "Practice notes", "My astral projection attempts")
+    index.add_thread(reply_hit, None, "Dream journal", "Nothing yet")
+    index.add_reply(reply_hit, "Try astral projection at dawn")
+    index.add_thread(miss, category, "Astral travel", "Unrelated")
+
+    assert [thread_id for thread_id, _ in index.search("astral projection")] == [title_hit, body_hit, reply_hit]
+    assert [thread_id for thread_id, _ in index.search("the projection", category_id=category)] == [title_hit, body_hit]
+    assert index.search("of the") == []
+
+def test_viewer_identity_distinguishes_users_and_anonymous_clients():
+    from app.services.thread_views import viewer_identity
+
+    user_id = uuid4()
+    assert viewer_identity(user_id, "10.0.0.1", "ua") == viewer_identity(user_id, "10.0.0.2", "other")
+    assert viewer_identity(None, "10.0.0.1", "ua") == viewer_identity(None, "10.0.0.1", "ua")
+    assert viewer_identity(None, "10.0.0.1", "ua") != viewer_identity(None, "10.0.0.2", "ua")
+
+def _forum_db():
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+
+    # One shared connection, so endpoints running queries in the threadpool see the same database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _register_c_collation(connection, _):
+        # Postgres' "C" collation is plain codepoint order, SQLite's default
+        connection.create_collation("C", lambda a, b: (a > b) - (a < b))
+
+    for table in (ForumCategory.__table__, ForumThread.__table__, ForumReply.__table__):
+        table.create(engine)
+    return Session(engine)
+
+def test_search_threads_falls_back_to_the_inverted_index_on_sqlite():
+    from app.services.forum_search import search_threads
+    from app.services.reply_tree import build_reply_path
+    from datetime import datetime, timezone
+
+    db = _forum_db()
+    category = ForumCategory(id=uuid4(), name="Practice")
+    titled = ForumThread(id=uuid4(), category_id=category.id, title="Astral projection basics", content="Start here")
+    replied = ForumThread(id=uuid4(), category_id=None, title="Dream journal", content="Nothing yet")
+    unrelated = ForumThread(id=uuid4(), category_id=category.id, title="Tarot spreads", content="Celtic cross")
+    reply_id, created_at = uuid4(), datetime(2026, 1, 1, tzinfo=timezone.utc)
+    reply = ForumReply(id=reply_id, thread_id=replied.id, content="Astral projection works at dawn",
+                       path=build_reply_path(None, created_at, reply_id), depth=0, created_at=created_at)
+    db.add_all([category, titled, replied, unrelated, reply])
+    db.commit()
+
+    results = search_threads(db, "astral projection")
+    assert [thread.id for thread, _ in results] == [titled.id, replied.id]
+    assert results[0][1] > results[1][1]
+
+    (only,) = search_threads(db, "astral projection", category_id=category.id)
+    assert only[0].id == titled.id
+
+    # Keyset continuation from the first result
+    (rest,) = search_threads(db, "astral projection", after=(results[0][1], titled.id))
+    assert rest[0].id == replied.id
+
+def _add_reply(db, thread_id, parent=None, minutes=0):
+    from datetime import datetime, timedelta, timezone
+    from app.services.reply_tree import build_reply_path
+
+    reply_id = uuid4()
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+    reply = ForumReply(
+        id=reply_id, thread_id=thread_id, author_id=uuid4(), content=f"reply {minutes}",
+        parent_reply_id=parent.id if parent else None,
+        path=build_reply_path(parent.path if parent else None, created_at, reply_id),
+        depth=parent.depth + 1 if parent else 0, created_at=created_at
+    )
+    db.add(reply)
+    return reply
+
+def test_reply_tree_page_loads_only_its_roots_and_their_replies():
+    import asyncio
+    from sqlalchemy import event
+    from app.api.forum import get_reply_tree
+
+    db = _forum_db()
+    thread = ForumThread(id=uuid4(), title="Circle", content="Notes")
+    db.add(thread)
+    roots = [_add_reply(db, thread.id, minutes=i * 10) for i in range(5)]
+    for i, root in enumerate(roots):
+        _add_reply(db, thread.id, parent=root, minutes=i * 10 + 1)
+        _add_reply(db, thread.id, parent=root, minutes=i * 10 + 2)
+    db.commit()
+    thread_id, root_ids = thread.id, [root.id for root in roots]
+    db.expunge_all()
+
+    loaded = []
+    record_load = lambda reply, _: loaded.append(reply.id)
+    event.listen(ForumReply, "load", record_load)
+    try:
+        tree = asyncio.run(get_reply_tree(thread_id, None, None, 5, 2, db))
+    finally:
+        event.remove(ForumReply, "load", record_load)
+    assert [node["id"] for node in tree["replies"]] == root_ids[:2]
+    assert [len(node["children"]) for node in tree["replies"]] == [2, 2]
+    # Two roots with their four replies, plus the next root to detect overflow
+    assert len(loaded) == 7
+
+    page = asyncio.run(get_reply_tree(thread_id, None, tree["next_cursor"], 5, 2, db))
+    assert [node["id"] for node in page["replies"]] == root_ids[2:4]
+    last = asyncio.run(get_reply_tree(thread_id, None, page["next_cursor"], 5, 2, db))
+    assert [node["id"] for node in last["replies"]] == root_ids[4:]
+    assert last["next_cursor"] is None
+
+def test_vote_batch_already_applied_is_skipped():
+    from app.models.vote import AppliedVoteBatch, Vote
+    from app.services.vote_buffer import apply_vote_batch
+
+    db = _forum_db()
+    for table in (Vote.__table__, AppliedVoteBatch.__table__):
+        table.create(db.get_bind())
+    thread = ForumThread(id=uuid4(), title="Circle", content="Notes", upvotes=3, downvotes=0)
+    reply = _add_reply(db, thread.id)
+    db.add_all([thread, AppliedVoteBatch(batch_id="batch-1")])
+    db.commit()
+
+    # The batch committed before the flush job could clear it from Redis
+    voter = uuid4()
+    changed = apply_vote_batch(db, "batch-1", {f"{voter}:reply:{reply.id}": "1"}, {f"reply:{reply.id}:up": "1"})
+
+    assert changed == 0
+    assert db.query(Vote).count() == 0
+    db.refresh(reply)
+    assert not reply.upvotes
+
+class _VoteScriptRedis:
+    """Answers the vote script with queued results and records the stored votes it was given."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.stored = []
+
+    async def get(self, key):
+        return "7"
+
+    async def run_script(self, script, keys, args):
+        self.stored.append(args[2])
+        return self.results.pop(0)
+
+    async def get_hash_fields(self, key, fields):
+        return [None] * len(fields)
+
+def _buffered_vote_setup(monkeypatch, *results):
+    from app.models.vote import Vote
+    from app.services import vote_buffer
+
+    db = _forum_db()
+    Vote.__table__.create(db.get_bind())
+    thread = ForumThread(id=uuid4(), title="Circle", content="Notes", upvotes=3, downvotes=1)
+    db.add(thread)
+    db.commit()
+    fake = _VoteScriptRedis(*results)
+    monkeypatch.setattr(vote_buffer, "redis_manager", fake)
+    return db, thread, fake
+
+def test_buffered_vote_falls_back_when_redis_is_unavailable(monkeypatch):
+    import asyncio
+    from app.services.vote_buffer import buffer_vote
+
+    db, thread, _ = _buffered_vote_setup(monkeypatch, None)
+    assert asyncio.run(buffer_vote(db, uuid4(), "thread", thread, "up")) is None
+
+def test_buffered_vote_rereads_the_stored_vote_after_a_flush(monkeypatch):
+    import asyncio
+    from app.models.vote import Vote
+    from app.services.vote_buffer import buffer_vote
+
+    db, thread, fake = _buffered_vote_setup(monkeypatch, -1, [1, -1])
+    voter = uuid4()
+
+    # The flush that lands while the first attempt runs writes the voter's downvote
+    original = fake.run_script
+    async def run_script(script, keys, args):
+        result = await original(script, keys, args)
+        if result == -1:
+            db.add(Vote(user_id=voter, target_type="thread", target_id=thread.id, value=-1))
+            db.commit()
+        return result
+    fake.run_script = run_script
+
+    assert asyncio.run(buffer_vote(db, voter, "thread", thread, "up")) == (3, 1)
+    assert fake.stored == [0, -1]
+
+def _register_greatest(db):
+    """Postgres' NULL-ignoring greatest() for the SQLite connection."""
+    def greatest(*values):
+        present = [value for value in values if value is not None]
+        return max(present) if present else None
+    db.connection().connection.create_function("greatest", -1, greatest)
+
+def test_reply_activity_counts_replies_and_tracks_the_latest(monkeypatch):
+    from app.services import thread_activity
+
+    refreshed = []
+    monkeypatch.setattr(thread_activity, "refresh_hot_scores_for", lambda db, ids: refreshed.extend(ids))
+    db = _forum_db()
+    _register_greatest(db)
+    thread = ForumThread(id=uuid4(), title="Circle", content="Notes", reply_count=0)
+    db.add(thread)
+    first = _add_reply(db, thread.id, minutes=0)
+    second = _add_reply(db, thread.id, minutes=5)
+    db.flush()
+    thread_activity.record_reply_added(db, first)
+    thread_activity.record_reply_added(db, second)
+    db.commit()
+    db.refresh(thread)
+    assert (thread.reply_count, thread.last_reply_author_id) == (2, second.author_id)
+    assert thread.last_reply_at.replace(tzinfo=None) == second.created_at.replace(tzinfo=None)
+
+    db.delete(second)
+    db.flush()
+    thread_activity.record_reply_removed(db, thread.id)
+    db.commit()
+    db.refresh(thread)
+    assert (thread.reply_count, thread.last_reply_author_id) == (1, first.author_id)
+    assert thread.last_reply_at.replace(tzinfo=None) == first.created_at.replace(tzinfo=None)
+    assert refreshed == [thread.id] * 3
+
+def test_reply_stats_repair_fixes_drifted_threads_only():
+    from app.services.thread_activity import repair_thread_reply_stats
+
+    db = _forum_db()
+    drifted = ForumThread(id=uuid4(), title="Drifted", content="", reply_count=7)
+    emptied = ForumThread(id=uuid4(), title="Emptied", content="", reply_count=2, last_reply_author_id=uuid4())
+    accurate = ForumThread(id=uuid4(), title="Accurate", content="", reply_count=0)
+    db.add_all([drifted, emptied, accurate])
+    _add_reply(db, drifted.id, minutes=0)
+    latest = _add_reply(db, drifted.id, minutes=5)
+    db.commit()
+
+    assert repair_thread_reply_stats(db) == 2
+    db.refresh(drifted)
+    db.refresh(emptied)
+    assert (drifted.reply_count, drifted.last_reply_author_id) == (2, latest.author_id)
+    assert (emptied.reply_count, emptied.last_reply_at, emptied.last_reply_author_id) == (0, None, None)
+    assert repair_thread_reply_stats(db) == 0
+
+def test_forum_search_endpoint_pages_with_cursor():
+    import asyncio
+    from fastapi import Response
+    from app.api.forum import search_forum
+
+    db = _forum_db()
+    db.add_all([
+        ForumThread(id=uuid4(), category_id=uuid4(), author_id=uuid4(), title="Astral projection basics", content="Start here"),
+        ForumThread(id=uuid4(), category_id=uuid4(), author_id=uuid4(), title="Astral projection at dawn", content="Astral notes"),
+    ])
+    db.commit()
+
+    response = Response()
+    (first,) = asyncio.run(search_forum(response, "astral projection", None, 1, None, db))
+    assert first.rank > 0 and "x-next-cursor" in response.headers
+    (second,) = asyncio.run(search_forum(Response(), "astral projection", None, 1, response.headers["x-next-cursor"], db))
+    assert second.id != first.id
+
+class _FakeRedis:
+    """The slice of RedisManager that VersionedCache uses, kept in a dict."""
+
+    def __init__(self, available=True):
+        self.data, self.available, self.reads = {}, available, 0
+
+    async def get(self, key):
+        self.reads += 1
+        return self.data.get(key) if self.available else None
+
+    async def set_if_not_exists(self, key, value):
+        if not self.available:
+            return False
+        return self.data.setdefault(key, value) == value
+
+    async def get_json(self, key):
+        return self.data.get(key) if self.available else None
+
+    async def set_json(self, key, value, expire=None):
+        if self.available:
+            self.data[key] = value
+        return self.available
+
+    async def increment(self, key, amount=1):
+        if not self.available:
+            return None
+        self.data[key] = str(int(self.data.get(key, 0)) + amount)
+        return int(self.data[key])
+
+def test_versioned_cache_orphans_entries_on_invalidate():
+    import asyncio
+    from app.core.redis import VersionedCache
+
+    redis = _FakeRedis()
+    cache = VersionedCache(redis)
+
+    async def scenario():
+        version = await cache.version("forum:categories")
+        assert version is not None and version == await cache.version("forum:categories")
+
+        assert await cache.set_json("forum:categories", "all", [1], version=version)
+        reads = redis.reads
+        assert await cache.get_json("forum:categories", "all", version=version) == [1]
+        assert redis.reads == reads  # the caller's version is not read again
+
+        assert await cache.invalidate("forum:categories")
+        assert await cache.get_json("forum:categories", "all") is None
+
+        # A reader that loaded before the write caches under the old version, unseen
+        await cache.set_json("forum:categories", "all", ["stale"], version=version)
+        assert await cache.get_json("forum:categories", "all") is None
+
+    asyncio.run(scenario())
+
+def test_versioned_cache_is_bypassed_when_redis_is_down():
+    import asyncio
+    from app.core.redis import VersionedCache
+
+    cache = VersionedCache(_FakeRedis(available=False))
+
+    async def scenario():
+        assert await cache.version("forum:categories") is None
+        assert await cache.set_json("forum:categories", "all", [1]) is False
+        assert await cache.get_json("forum:categories", "all") is None
+        assert await cache.invalidate("forum:categories") is False
+
+    asyncio.run(scenario())
+
+def test_forum_overview_shape_and_cache_invalidation(monkeypatch):
+    import asyncio
+    from datetime import datetime, timedelta
+    from app.api import forum as forum_api
+    from app.core.redis import VersionedCache
+    from app.models.forum import ThreadSubscription
+    from app.models.user import User
+    from app.schemas.forum import ForumThreadCreate
+    from app.services import forum_cache
+
+    cache = VersionedCache(_FakeRedis())
+    monkeypatch.setattr(forum_api, "versioned_cache", cache)
+    monkeypatch.setattr(forum_cache, "versioned_cache", cache)
+
+    db = _forum_db()
+    for table in (User.__table__, ThreadSubscription.__table__):
+        table.create(db.get_bind())
+    author = User(id=uuid4(), username="alice")
+    busy = ForumCategory(id=uuid4(), name="Busy", display_order=0)
+    empty = ForumCategory(id=uuid4(), name="Empty", display_order=1)
+    start = datetime(2026, 1, 1)
+    older = ForumThread(id=uuid4(), category_id=busy.id, author_id=author.id, title="Older", content="",
+                        reply_count=2, created_at=start)
+    newer = ForumThread(id=uuid4(), category_id=busy.id, author_id=author.id, title="Newer", content="",
+                        reply_count=3, created_at=start + timedelta(days=1))
+    db.add_all([author, busy, empty, older, newer])
+    db.commit()
+
+    overview = asyncio.run(forum_api.get_overview(db))
+    assert [(c["name"], c["thread_count"], c["reply_count"]) for c in overview] == [("Busy", 2, 5), ("Empty", 0, 0)]
+    latest = overview[0]["latest_thread"]
+    assert (latest["id"], latest["title"], latest["author_username"]) == (newer.id, "Newer", "alice")
+    assert overview[1]["latest_thread"] is None
+
+    # Served from the cache until a write bumps the namespace version
+    db.query(ForumThread).filter(ForumThread.id == older.id).delete()
+    db.commit()
+    assert asyncio.run(forum_api.get_overview(db))[0]["thread_count"] == 2
+
+    asyncio.run(forum_api.create_thread(ForumThreadCreate(title="Newest", content="First post", category_id=empty.id), db, author))
+    refreshed = asyncio.run(forum_api.get_overview(db))
+    assert [c["thread_count"] for c in refreshed] == [1, 1]
+    assert refreshed[1]["latest_thread"]["title"] == "Newest"
+
+def test_replies_page_oldest_first_with_total_from_reply_count():
+    import asyncio
+    from fastapi import Response
+    from app.api.forum import get_replies_by_thread
+
+    db = _forum_db()
+    thread = ForumThread(id=uuid4(), title="Circle", content="Notes", reply_count=5)
+    db.add(thread)
+    replies = [_add_reply(db, thread.id, minutes=i) for i in range(5)]
+    db.commit()
+    reply_ids = [reply.id for reply in replies]
+
+    pages, cursor = [], None
+    while True:
+        response = Response()
+        page = asyncio.run(get_replies_by_thread(thread.id, response, 2, cursor, db))
+        assert response.headers["x-total-count"] == "5"
+        pages.append([reply.id for reply in page])
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert pages == [reply_ids[:2], reply_ids[2:4], reply_ids[4:]]
+
+    # The total is the denormalized counter, not a COUNT(*) over the replies
+    db.query(ForumThread).update({"reply_count": 9})
+    db.commit()
+    response = Response()
+    asyncio.run(get_replies_by_thread(thread.id, response, 2, None, db))
+    assert response.headers["x-total-count"] == "9"
+
+    response = Response()
+    assert asyncio.run(get_replies_by_thread(uuid4(), response, 2, None, db)) == []
+    assert response.headers["x-total-count"] == "0"
+
+def _subscription_db():
+    from app.models.forum import ThreadSubscription
+
+    db = _forum_db()
+    ThreadSubscription.__table__.create(db.get_bind())
+    return db
+
+def test_subscribe_is_idempotent_and_batches_skip_the_author():
+    from app.services.thread_subscriptions import get_subscriber_batch, subscribe, unsubscribe
+
+    db = _subscription_db()
+    thread_id = uuid4()
+    author, *others = sorted(uuid4() for _ in range(4))
+    for user_id in [author, *others, others[0]]:
+        subscribe(db, thread_id, user_id)
+    db.commit()
+
+    assert get_subscriber_batch(db, thread_id, None, None) == [author, *others]
+    assert get_subscriber_batch(db, thread_id, author, None, limit=2) == others[:2]
+    assert get_subscriber_batch(db, thread_id, author, others[1], limit=2) == others[2:]
+    assert get_subscriber_batch(db, uuid4(), None, None) == []
+
+    assert unsubscribe(db, thread_id, others[0]) is True
+    assert unsubscribe(db, thread_id, others[0]) is False
+    db.commit()
+    assert get_subscriber_batch(db, thread_id, author, None) == others[1:]
+
+class _FanoutRedis:
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+        self.pushed, self.published = [], []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, expire=None):
+        self.values[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.values.pop(key, None) is not None
+
+    async def push_to_lists(self, entries):
+        self.pushed.extend(key for key, _ in entries)
+        return True
+
+    async def publish_many(self, messages):
+        self.published.extend(channel for channel, _ in messages)
+        return True
+
+def test_thread_fan_out_resumes_after_the_last_delivered_batch(monkeypatch):
+    import asyncio
+    from app.services.thread_subscriptions import fanout_progress_key, subscribe
+    from app.workers import task_worker
+
+    db = _subscription_db()
+    thread_id = uuid4()
+    author, *subscribers = sorted(uuid4() for _ in range(6))
+    for user_id in [author, *subscribers]:
+        subscribe(db, thread_id, user_id)
+    db.commit()
+
+    # A previous attempt got as far as the second subscriber before failing
+    progress_key = fanout_progress_key("task-1")
+    redis = _FanoutRedis({progress_key: str(subscribers[1])})
+    monkeypatch.setattr(task_worker, "redis_manager", redis)
+    monkeypatch.setattr(task_worker, "NOTIFICATION_BATCH_SIZE", 2)
+
+    worker = task_worker.TaskWorker()
+    batches = []
+
+    async def run_db(func, *args):
+        result = func(db, *args)
+        batches.append(result)
+        return result
+
+    monkeypatch.setattr(worker, "_run_db", run_db)
+    asyncio.run(worker._fan_out_thread_notification({
+        "id": "task-1",
+        "created_at": "2026-01-01T00:00:00",
+        "data": {"thread_id": str(thread_id), "author_id": str(author), "reply_id": str(uuid4()),
+                 "message": "New reply", "type": "thread_reply"}
+    }))
+
+    assert batches == [subscribers[2:4], subscribers[4:], []]
+    assert redis.pushed == [f"notifications:{user_id}" for user_id in subscribers[2:]]
+    assert redis.published == [f"user_events:{user_id}" for user_id in subscribers[2:]]
+    assert progress_key not in redis.values
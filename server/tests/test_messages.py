@@ -0,0 +1,144 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.pagination import encode_cursor, decode_cursor
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+client = TestClient(app)
+
+def test_message_cursor_round_trip():
+    created_at = datetime(2026, 1, 5, 12, 30, tzinfo=timezone.utc)
+    message_id = uuid4()
+
+    cursor = encode_cursor(created_at, message_id)
+    decoded = decode_cursor(cursor, datetime.fromisoformat, UUID)
+
+    assert decoded == [created_at, message_id]
+
+def test_invalid_message_cursor_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor", datetime.fromisoformat, UUID)
+    assert exc_info.value.status_code == 400
+
+def test_export_requires_authentication():
+    response = client.get("/api/v1/messages/export")
+    assert response.status_code in (401, 403)
+
+def _message_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.models.user import User, Message, ArchivedMessage
+
+    from sqlalchemy.pool import StaticPool
+
+    # One shared connection, so TestClient requests see the same in-memory database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for table in (User.__table__, Message.__table__, ArchivedMessage.__table__):
+        table.create(engine)
+    db = Session(engine)
+    alice, bob, carol = (User(id=uuid4(), username=name) for name in ("alice", "bob", "carol"))
+    db.add_all([alice, bob, carol])
+    db.flush()
+    return db, alice, bob, carol
+
+def test_history_merges_hot_and_archived_rows_around_old_unread_messages():
+    from datetime import timedelta
+    from app.models.user import Message, ArchivedMessage
+    from app.services.message_archive import get_message_history, iter_message_history
+
+    db, alice, bob, _ = _message_db()
+    start = datetime(2025, 1, 1)
+    rows = [
+        Message(id=uuid4(), sender_id=bob.id, recipient_id=alice.id, content="old unread", is_read=False, created_at=start),
+        ArchivedMessage(id=uuid4(), sender_id=alice.id, recipient_id=bob.id, content="archived 1", created_at=start + timedelta(days=1)),
+        ArchivedMessage(id=uuid4(), sender_id=bob.id, recipient_id=alice.id, content="archived 2", created_at=start + timedelta(days=2)),
+        Message(id=uuid4(), sender_id=alice.id, recipient_id=bob.id, content="recent", created_at=start + timedelta(days=300)),
+    ]
+    db.add_all(rows)
+    db.commit()
+
+    first = get_message_history(db, alice.id, limit=2)
+    assert [m.content for m in first] == ["recent", "archived 2"]
+    second = get_message_history(db, alice.id, before=(first[-1].created_at, first[-1].id), limit=2)
+    assert [m.content for m in second] == ["archived 1", "old unread"]
+
+    exported = [m.content for m in iter_message_history(db, alice.id, batch_size=1)]
+    assert exported == ["old unread", "archived 1", "archived 2", "recent"]
+
+def test_conversations_include_fully_archived_partners():
+    from app.models.user import Message, ArchivedMessage
+    from app.services.message_archive import count_unread, get_conversations
+
+    db, alice, bob, carol = _message_db()
+    db.add_all([
+        ArchivedMessage(id=uuid4(), sender_id=carol.id, recipient_id=alice.id, content="long ago", created_at=datetime(2024, 1, 1)),
+        Message(id=uuid4(), sender_id=bob.id, recipient_id=alice.id, content="hi", is_read=False, created_at=datetime(2025, 1, 1)),
+        Message(id=uuid4(), sender_id=bob.id, recipient_id=alice.id, content="there", is_read=False, created_at=datetime(2025, 1, 2)),
+    ])
+    db.commit()
+
+    conversations = get_conversations(db, alice.id)
+    assert [(c["username"], c["latest_message"], c["unread_count"]) for c in conversations] == [
+        ("bob", "there", 2),
+        ("carol", "long ago", 0),
+    ]
+    assert count_unread(db, alice.id) == 2
+
+def test_expand_users_embeds_profiles_and_default_shape_is_unchanged():
+    from app.api.auth import get_current_user
+    from app.core.database import get_db
+    from app.models.user import Message
+
+    db, alice, bob, _ = _message_db()
+    db.add_all([
+        Message(id=uuid4(), sender_id=bob.id, recipient_id=alice.id, content="hello", created_at=datetime(2026, 1, 1)),
+        Message(id=uuid4(), sender_id=alice.id, recipient_id=bob.id, content="hi", created_at=datetime(2026, 1, 2)),
+    ])
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: alice
+    try:
+        plain = client.get("/api/v1/messages/")
+        expanded = client.get("/api/v1/messages/", params={"expand": "users"})
+        invalid = client.get("/api/v1/messages/", params={"expand": "everything"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert plain.status_code == 200
+    assert [m["content"] for m in plain.json()] == ["hi", "hello"]
+    assert "users" not in plain.json()[0]
+
+    assert expanded.status_code == 200
+    body = expanded.json()
+    assert body["messages"] == plain.json()
+    assert body["users"] == {
+        str(alice.id): {"id": str(alice.id), "username": "alice", "telegram_photo_url": None},
+        str(bob.id): {"id": str(bob.id), "username": "bob", "telegram_photo_url": None},
+    }
+    assert invalid.status_code == 422
+
+def test_conversations_endpoint_lists_partners():
+    from app.api.auth import get_current_user
+    from app.core.database import get_db
+    from app.models.user import Message, ArchivedMessage
+
+    db, alice, bob, carol = _message_db()
+    db.add_all([
+        ArchivedMessage(id=uuid4(), sender_id=alice.id, recipient_id=carol.id, content="long ago", created_at=datetime(2024, 1, 1)),
+        Message(id=uuid4(), sender_id=bob.id, recipient_id=alice.id, content="hi", is_read=False, created_at=datetime(2025, 1, 1)),
+    ])
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: alice
+    try:
+        response = client.get("/api/v1/messages/conversations")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [(c["username"], c["latest_message"], c["unread_count"]) for c in response.json()] == [
+        ("bob", "hi", 1),
+        ("carol", "long ago", 0),
+    ]
@@ -41,3 +41,265 @@ def test_get_resources():
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+
+def test_wilson_lower_bound_rewards_volume_and_ratio():
+    from app.services.resource_ranking import wilson_lower_bound
+
+    assert wilson_lower_bound(0, 0) == 0
+    # One lucky upvote ranks below a large, mostly positive tally
+    assert wilson_lower_bound(1, 0) < wilson_lower_bound(90, 10)
+    assert wilson_lower_bound(90, 10) < wilson_lower_bound(900, 100)
+    assert 0 < wilson_lower_bound(5, 5) < 0.5
+
+def test_resource_listing_rejects_unknown_sort():
+    response = client.get("/api/v1/resources?sort=random")
+    assert response.status_code == 422
+
+def test_url_hash_ignores_cosmetic_differences():
+    from app.utils.urls import normalize_url, url_hash
+
+    assert normalize_url("HTTPS://Example.COM:443/Path/?utm_source=x&b=2&a=1#top") == "https://example.com/Path?a=1&b=2"
+    assert url_hash("example.com/") == url_hash("http://EXAMPLE.com")
+    assert url_hash("https://example.com/a") != url_hash("https://example.com/b")
+    assert url_hash("   ") is None
+
+def test_link_enricher_reads_metadata_from_local_server():
+    import asyncio
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from app.services.link_metadata import HttpxFetcher, LinkEnricher
+
+    page = (
+        b"<html><head><title>Fallback title</title>"
+        b"<meta property='og:title' content='The Kybalion'>"
+        b"<meta name='description' content='Hermetic philosophy'>"
+        b"<meta property='og:image' content='/cover.jpg'>"
+        b"</head><body>ignored</body></html>"
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/old":
+                self.send_response(301)
+                self.send_header("Location", "/book")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        enricher = LinkEnricher(fetcher=HttpxFetcher(timeout=2, allow_private_hosts=True), concurrency=2, host_interval=0)
+        metadata = asyncio.run(enricher.enrich(f"{base}/old"))
+        blocked = asyncio.run(LinkEnricher(fetcher=HttpxFetcher(timeout=2), host_interval=0).enrich(f"{base}/book"))
+    finally:
+        server.shutdown()
+
+    assert metadata == {
+        "title": "The Kybalion",
+        "description": "Hermetic philosophy",
+        "image_url": f"{base}/cover.jpg",
+    }
+    # Private addresses are refused unless explicitly allowed
+    assert blocked is None
+
+def test_resource_snapshot_is_published_precompressed_with_strong_etag(tmp_path, monkeypatch):
+    import gzip
+    from app.core.config import settings
+    from app.services import resource_snapshot
+
+    monkeypatch.setattr(settings, "RESOURCE_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(resource_snapshot, "render_snapshot", lambda db: b'[{"title":"The Kybalion"}]')
+
+    digest = resource_snapshot.publish_resource_snapshot(None)
+    snapshot = resource_snapshot.load_snapshot()
+    assert snapshot.digest == digest
+    assert gzip.decompress(snapshot.bodies["gzip"]) == snapshot.bodies["identity"]
+    assert resource_snapshot.choose_encoding(snapshot, "gzip;q=0, identity") == "identity"
+    assert resource_snapshot.choose_encoding(snapshot, "deflate, gzip") == "gzip"
+
+    response = client.get("/api/v1/resources/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == [{"title": "The Kybalion"}]
+    etag = response.headers["etag"]
+    assert etag == f'"{digest}-gzip"'
+
+    cached = client.get("/api/v1/resources/snapshot", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    # Republishing new content swaps the manifest and changes the ETag
+    monkeypatch.setattr(resource_snapshot, "render_snapshot", lambda db: b"[]")
+    assert resource_snapshot.publish_resource_snapshot(None) != digest
+    assert client.get("/api/v1/resources/snapshot", headers={"If-None-Match": etag}).json() == []
+
+def test_metadata_parser_stops_at_the_end_of_head():
+    from app.services.link_metadata import parse_metadata
+
+    html = (
+        "<html><head><title>Head title</title></head><body>"
+        "<meta property='og:title' content='Body title'><title>Also ignored</title>"
+        + "<p>filler</p>" * 2000 + "</body></html>"
+    )
+    metadata = parse_metadata(html, "https://example.com/", chunk_size=64)
+    assert metadata == {"title": "Head title", "description": None, "image_url": None}
+
+def test_fetcher_connects_to_the_checked_address(monkeypatch):
+    import asyncio
+    import socket
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from app.services import link_metadata
+
+    hosts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hosts.append(self.headers["Host"])
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            self.wfile.write(b"<head><title>Pinned</title></head>")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    lookups = []
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        # A rebinding resolver would answer differently the second time
+        lookups.append(host)
+        address = "127.0.0.1" if len(lookups) == 1 else "10.0.0.1"
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    monkeypatch.setattr(link_metadata.socket, "getaddrinfo", getaddrinfo)
+    url = f"http://books.example:{port}/page"
+    try:
+        fetcher = link_metadata.HttpxFetcher(timeout=2, allow_private_hosts=True)
+        result = asyncio.run(fetcher.fetch(url))
+    finally:
+        server.shutdown()
+
+    assert lookups == ["books.example"]
+    assert hosts == [f"books.example:{port}"]
+    assert result.url == url and result.status_code == 200
+
+def test_worker_runs_enrichment_tasks_concurrently(monkeypatch):
+    import asyncio
+    from app.workers import task_worker
+
+    queued = [{"id": str(i), "type": "enrich_resource_metadata"} for i in range(6)]
+
+    class Queue:
+        async def dequeue_task(self, queue_name):
+            return queued.pop(0) if queue_name == "background_tasks" and queued else None
+
+    monkeypatch.setattr(task_worker, "task_queue", Queue())
+    worker = task_worker.TaskWorker()
+    worker.link_enricher.concurrency = 2
+    running, peak = set(), []
+
+    async def process(task_data, queue_name):
+        running.add(task_data["id"])
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.discard(task_data["id"])
+
+    monkeypatch.setattr(worker, "_process_task", process)
+
+    async def run():
+        await worker._process_queues()
+        await asyncio.gather(*worker._enrichment_tasks)
+
+    asyncio.run(run())
+    assert not queued
+    assert max(peak) == 2
+    assert len(peak) == 6
+
+def test_import_parses_link_list_entries():
+    from seeds.import_resources import parse_entry
+
+    assert parse_entry("[The Kybalion](https://example.com/kybalion) - Hermetic philosophy", "book") == {
+        "title": "The Kybalion", "url": "https://example.com/kybalion",
+        "description": "Hermetic philosophy", "resource_type": "book",
+    }
+    assert parse_entry("**Gnostic Texts**: https://example.com/texts.", "link") == {
+        "title": "Gnostic Texts", "url": "https://example.com/texts",
+        "description": None, "resource_type": "link",
+    }
+    assert parse_entry("https://example.com/bare", "link")["title"] == "https://example.com/bare"
+    assert parse_entry("[[Notes|Study notes]] - no link here", "link") == {
+        "title": "Study notes", "url": None, "description": "no link here", "resource_type": "link",
+    }
+    assert parse_entry("  - ", "link") is None
+
+def test_import_streams_entries_typed_by_heading(tmp_path):
+    from seeds.import_resources import iter_entries
+
+    path = tmp_path / "list.md"
+    path.write_text(
+        "# Books\n"
+        "- [Pistis Sophia](https://example.com/pistis)\n"
+        "Some prose with https://example.com/ignored\n"
+        "## Podcasts\n"
+        "1. Gnosis Radio: https://example.com/radio\n"
+        "# Websites\n"
+        "* https://example.com/site\n",
+        encoding="utf-8"
+    )
+    entries = list(iter_entries(str(path)))
+    assert [(entry["title"], entry["resource_type"]) for entry in entries] == [
+        ("Pistis Sophia", "book"), ("Gnosis Radio", "audio"), ("https://example.com/site", "link"),
+    ]
+
+def test_import_chunks_and_dedupes_within_and_across_chunks():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from seeds.import_resources import chunked, new_rows, parse_entry
+    from app.models.resource import SharedResource as SharedResourceModel
+    from app.utils.urls import url_hash
+
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+    engine = create_engine("sqlite://")
+    SharedResourceModel.__table__.create(engine)
+    with Session(engine) as db:
+        db.add(SharedResourceModel(title="Existing", url="https://example.com/old",
+                                   url_hash=url_hash("https://example.com/old")))
+        db.commit()
+
+        lines = [
+            "[A](https://example.com/a)",
+            "[A again](https://EXAMPLE.com/a?utm_source=list)",
+            "[Old](https://example.com/old)",
+            "Unlinked note",
+            "unlinked NOTE",
+        ]
+        entries = [parse_entry(line, "link") for line in lines]
+        seen_hashes, seen_titles = set(), set()
+        stats = {"duplicates": 0, "unlinked": 0}
+
+        rows = new_rows(db, entries[:3], seen_hashes, seen_titles, False, stats)
+        assert [row["title"] for row in rows] == ["A"]
+        assert stats == {"duplicates": 2, "unlinked": 0}
+
+        # Earlier chunks count as seen; unlinked entries are skipped unless included
+        again = [parse_entry("[A](https://example.com/a)", "link")] + entries[3:]
+        assert new_rows(db, again, seen_hashes, seen_titles, False, stats) == []
+        assert stats == {"duplicates": 3, "unlinked": 2}
+
+        rows = new_rows(db, [parse_entry(line, "link") for line in lines[3:]], seen_hashes, seen_titles, True, stats)
+        assert [row["title"] for row in rows] == ["Unlinked note"]
+        assert stats == {"duplicates": 4, "unlinked": 2}
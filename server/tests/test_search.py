@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from uuid import uuid4
+
+client = TestClient(app)
+
+def test_ngram_index_matches_prefixes_and_typos():
+    from app.services.site_search import NgramIndex
+
+    index = NgramIndex()
+    kybalion, circle, user = uuid4(), uuid4(), uuid4()
+    index.add("resource", kybalion, "The Kybalion", "book", "Hermetic philosophy")
+    index.add("study_group", circle, "Kabbalah circle")
+    index.add("user", user, "kybalist")
+
+    # A label prefix outranks a fuzzy match
+    assert [hit.id for hit in index.search("kyb")] == [user, kybalion]
+    assert index.search("kybalon")[0].id == kybalion
+    assert [hit.id for hit in index.search("kabala")] == [circle]
+    assert [hit.id for hit in index.search("kyb", kinds=("resource",))] == [kybalion]
+    assert index.search("zzz") == []
+
+def test_search_validates_parameters():
+    assert client.get("/api/v1/search?q=k").status_code == 422
+    response = client.get("/api/v1/search?q=kyb&types=resource,forum")
+    assert response.status_code == 400
@@ -1,7 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app.models.study_group import StudyGroup, StudyGroupMember
+from app.models.study_group import StudyGroup, StudyGroupInvitation, StudyGroupMember
 from uuid import uuid4
 
 client = TestClient(app)
@@ -40,3 +40,400 @@ def test_get_study_groups():
     assert response.status_code == 200
     data = response.json()
     assert isinstance(data, list)
+
+def test_broadcast_requires_authentication():
+    response = client.post(f"/api/v1/study-groups/{uuid4()}/broadcast", json={
+        "content": "Meeting moved to Thursday"
+    })
+    assert response.status_code in (401, 403)
+
+def test_broadcast_content_cannot_be_empty():
+    from pydantic import ValidationError
+    from app.schemas.study_group import StudyGroupBroadcastCreate
+
+    with pytest.raises(ValidationError):
+        StudyGroupBroadcastCreate(content="   ")
+
+def test_reserve_seats_never_exceeds_max_members():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.services.group_membership import reserve_seats
+
+    engine = create_engine("sqlite://")
+    StudyGroup.__table__.create(engine)
+    group_id = uuid4()
+    with Session(engine) as db:
+        db.add(StudyGroup(id=group_id, name="Tarot circle", creator_id=uuid4(), max_members=3, member_count=1))
+        db.commit()
+
+        assert reserve_seats(db, group_id, seats=2) == 3
+        assert reserve_seats(db, group_id) is None
+        assert reserve_seats(db, uuid4()) is None
+        db.commit()
+        assert db.get(StudyGroup, group_id).member_count == 3
+
+def test_member_count_repair_recounts_drifted_groups():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.services.group_membership import repair_member_counts
+
+    engine = create_engine("sqlite://")
+    for table in (StudyGroup.__table__, StudyGroupMember.__table__):
+        table.create(engine)
+    drifted, emptied, accurate = uuid4(), uuid4(), uuid4()
+    with Session(engine) as db:
+        db.add_all([
+            StudyGroup(id=drifted, name="Drifted", member_count=5),
+            StudyGroup(id=emptied, name="Emptied", member_count=2),
+            StudyGroup(id=accurate, name="Accurate", member_count=1),
+        ])
+        db.add_all(StudyGroupMember(id=uuid4(), group_id=group_id, user_id=uuid4()) for group_id in (drifted, drifted, accurate))
+        db.commit()
+
+        assert repair_member_counts(db) == 2
+        counts = {group.id: group.member_count for group in db.query(StudyGroup)}
+        assert counts == {drifted: 2, emptied: 0, accurate: 1}
+        assert repair_member_counts(db) == 0
+
+def test_study_group_directory_reports_size_creator_and_membership():
+    from fastapi import Response
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.api.study_group import get_study_groups
+    from app.models.user import User
+
+    engine = create_engine("sqlite://")
+    for table in (User.__table__, StudyGroup.__table__, StudyGroupMember.__table__):
+        table.create(engine)
+    with Session(engine) as db:
+        alice, bob = User(id=uuid4(), username="alice"), User(id=uuid4(), username="bob")
+        full = StudyGroup(id=uuid4(), name="Full", creator_id=alice.id, max_members=1, member_count=1, is_public=True)
+        private = StudyGroup(id=uuid4(), name="Private", creator_id=bob.id, max_members=5, member_count=1, is_public=False)
+        db.add_all([alice, bob, full, private])
+        db.add(StudyGroupMember(id=uuid4(), group_id=full.id, user_id=alice.id, role="admin"))
+        db.commit()
+
+        response = Response()
+        (entry,) = get_study_groups(response, True, None, 1, None, db, alice)
+        assert (entry.name, entry.creator_username, entry.is_full, entry.is_member) == ("Full", "alice", True, True)
+        assert "x-next-cursor" in response.headers
+
+        # Private groups are listed only for their creator and members
+        entries = get_study_groups(Response(), None, None, 10, None, db, None)
+        assert [e.name for e in entries] == ["Full"]
+        assert not any(e.is_member for e in entries)
+        assert get_study_groups(Response(), False, None, 10, None, db, None) == []
+        assert {e.name for e in get_study_groups(Response(), None, None, 10, None, db, alice)} == {"Full"}
+        assert {e.name for e in get_study_groups(Response(), None, None, 10, None, db, bob)} == {"Full", "Private"}
+
+class _RoleCacheRedis:
+    """Stands in for the role cache's Redis calls, running its scripts in Python."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    async def get_hash_fields(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def forget(self, key, generation, field, *user_ids):
+        entries = self.hashes.setdefault(key, {})
+        if user_ids:
+            for user_id in user_ids:
+                entries.pop(user_id, None)
+        else:
+            entries.clear()
+        entries[field] = generation
+
+    async def run_script(self, script, keys, args):
+        from app.services import group_roles
+
+        (key,) = keys
+        if script == group_roles._FORGET_ROLES_SCRIPT:
+            generation, _, field, *user_ids = args
+            self.forget(key, generation, field, *user_ids)
+            return 1
+        seen, user_id, role, _, field = args
+        entries = self.hashes.setdefault(key, {})
+        if entries.get(field, "") != seen:
+            return 0
+        entries.setdefault(user_id, role)
+        return 1
+
+def _patch_role_cache(monkeypatch):
+    from app.services import group_roles
+
+    fake = _RoleCacheRedis()
+    for name in ("get_hash_fields", "run_script"):
+        monkeypatch.setattr(group_roles.redis_manager, name, getattr(fake, name))
+    return fake
+
+def _member_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+
+    # Role loads run in a worker thread; share one connection with it
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    StudyGroupMember.__table__.create(engine)
+    return Session(engine)
+
+def test_group_role_lookups_are_cached_until_forgotten(monkeypatch):
+    import asyncio
+    from app.services import group_roles
+
+    _patch_role_cache(monkeypatch)
+    db = _member_db()
+    group_id, moderator, outsider = uuid4(), uuid4(), uuid4()
+    db.add(StudyGroupMember(id=uuid4(), group_id=group_id, user_id=moderator, role="moderator"))
+    db.commit()
+
+    async def scenario():
+        assert await group_roles.get_member_role(db, group_id, moderator) == "moderator"
+        assert await group_roles.get_member_role(db, group_id, outsider) is None
+
+        # Served from the hash, not the table
+        db.query(StudyGroupMember).delete()
+        db.commit()
+        assert await group_roles.get_member_role(db, group_id, moderator) == "moderator"
+
+        await group_roles.forget_member_roles(group_id, moderator)
+        assert await group_roles.get_member_role(db, group_id, moderator) is None
+
+    asyncio.run(scenario())
+
+def test_role_loaded_before_a_demotion_is_not_cached(monkeypatch):
+    import asyncio
+    from app.services import group_roles
+
+    fake = _patch_role_cache(monkeypatch)
+    db = _member_db()
+    group_id, admin = uuid4(), uuid4()
+    db.add(StudyGroupMember(id=uuid4(), group_id=group_id, user_id=admin, role="admin"))
+    db.commit()
+    key = group_roles.group_roles_key(group_id)
+    load = group_roles.load_member_role
+
+    def load_then_demote(db, group_id, user_id):
+        role = load(db, group_id, user_id)
+        # Another request demotes the user and forgets the role before this reader caches it
+        db.query(StudyGroupMember).update({"role": "member"})
+        db.commit()
+        fake.forget(key, "after-demotion", group_roles.GENERATION_FIELD, str(user_id))
+        return role
+
+    monkeypatch.setattr(group_roles, "load_member_role", load_then_demote)
+    assert asyncio.run(group_roles.get_member_role(db, group_id, admin)) == "admin"
+    assert str(admin) not in fake.hashes[key]
+
+    monkeypatch.setattr(group_roles, "load_member_role", load)
+    assert asyncio.run(group_roles.get_member_role(db, group_id, admin)) == "member"
+    assert fake.hashes[key][str(admin)] == "member"
+
+def test_bulk_membership_request_dedupes_and_caps_usernames():
+    import pytest
+    from pydantic import ValidationError
+    from app.schemas.study_group import StudyGroupBulkMembers
+
+    assert StudyGroupBulkMembers(usernames=[" ana ", "ben", "ana", ""]).usernames == ["ana", "ben"]
+    with pytest.raises(ValidationError):
+        StudyGroupBulkMembers(usernames=["  "])
+    with pytest.raises(ValidationError):
+        StudyGroupBulkMembers(usernames=[f"user{i}" for i in range(201)])
+
+def test_broadcast_batches_resume_by_user_id_and_skip_delivered_recipients():
+    from uuid import UUID
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.models.user import Message
+    from app.services.group_broadcast import count_broadcast_recipients, deliver_broadcast_batch
+
+    engine = create_engine("sqlite://")
+    for table in (StudyGroupMember.__table__, Message.__table__):
+        table.create(engine)
+    group_id, sender, broadcast_id = uuid4(), uuid4(), uuid4()
+    members = sorted(uuid4() for _ in range(5))
+    with Session(engine) as db:
+        db.add_all(StudyGroupMember(id=uuid4(), group_id=group_id, user_id=user_id) for user_id in members + [sender])
+        db.commit()
+        assert count_broadcast_recipients(db, group_id, sender) == 5
+
+        batch, inserted = deliver_broadcast_batch(db, broadcast_id, group_id, sender, "Meet at eight", None, 2)
+        assert (batch, inserted) == (members[:2], 2)
+
+        # A retry that lost its progress redelivers nothing twice
+        batch, inserted = deliver_broadcast_batch(db, broadcast_id, group_id, sender, "Meet at eight", None, 3)
+        assert (batch, inserted) == (members[:3], 1)
+
+        # An identical broadcast queued right after still reaches everyone
+        batch, inserted = deliver_broadcast_batch(db, uuid4(), group_id, sender, "Meet at eight", None, 3)
+        assert (batch, inserted) == (members[:3], 3)
+
+        # A member joining below the resume point does not shift the next batch
+        db.add(StudyGroupMember(id=uuid4(), group_id=group_id, user_id=UUID(int=0)))
+        db.commit()
+        batch, inserted = deliver_broadcast_batch(db, broadcast_id, group_id, sender, "Meet at eight", members[2], 3)
+        assert (batch, inserted) == (members[3:], 2)
+        assert db.query(Message).filter(Message.recipient_id.in_(members)).count() == 8
+
+def _bulk_setup(monkeypatch, max_members, is_public=True):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+    from app.api import study_group
+    from app.models.user import User
+
+    # One shared connection, so the handlers' threadpool work sees the same in-memory database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _register_greatest(connection, _):
+        connection.create_function("greatest", -1, max)
+
+    for table in (User.__table__, StudyGroup.__table__, StudyGroupMember.__table__, StudyGroupInvitation.__table__):
+        table.create(engine)
+    db = Session(engine)
+    users = {name: User(id=uuid4(), username=name) for name in ("creator", "ana", "ben", "cy")}
+    group = StudyGroup(id=uuid4(), name="Tarot circle", creator_id=users["creator"].id,
+                       max_members=max_members, member_count=1, is_public=is_public)
+    db.add_all([*users.values(), group])
+    db.add(StudyGroupMember(id=uuid4(), group_id=group.id, user_id=users["creator"].id, role="admin"))
+    db.commit()
+
+    notified = []
+    async def notify_group_users(group, user_ids, notification_type, message):
+        notified.append((notification_type, list(user_ids)))
+    async def forget_member_roles(group_id, *user_ids):
+        pass
+    monkeypatch.setattr(study_group, "notify_group_users", notify_group_users)
+    monkeypatch.setattr(study_group, "forget_member_roles", forget_member_roles)
+    return db, group, users, notified
+
+def _member_ids(db, group_id):
+    return {row[0] for row in db.query(StudyGroupMember.user_id).filter(StudyGroupMember.group_id == group_id)}
+
+def test_bulk_add_is_all_or_nothing_when_the_group_lacks_room(monkeypatch):
+    import asyncio
+    from fastapi import HTTPException
+    from app.api.study_group import add_study_group_members
+    from app.schemas.study_group import StudyGroupBulkMembers
+
+    db, group, users, notified = _bulk_setup(monkeypatch, max_members=3)
+    bulk = StudyGroupBulkMembers(usernames=["ana", "ben", "cy"])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(add_study_group_members(group.id, bulk, db, "admin"))
+
+    assert error.value.status_code == 400
+    db.expire_all()
+    assert _member_ids(db, group.id) == {users["creator"].id}
+    assert db.get(StudyGroup, group.id).member_count == 1
+    assert notified == []
+
+def test_bulk_add_reports_existing_and_unknown_usernames_as_skipped(monkeypatch):
+    import asyncio
+    from app.api.study_group import add_study_group_members
+    from app.schemas.study_group import StudyGroupBulkMembers
+
+    db, group, users, notified = _bulk_setup(monkeypatch, max_members=5)
+    bulk = StudyGroupBulkMembers(usernames=["ana", "ghost", "creator", "ben"])
+    result = asyncio.run(add_study_group_members(group.id, bulk, db, "moderator"))
+
+    assert sorted(result.usernames) == ["ana", "ben"]
+    assert result.skipped == ["ghost", "creator"]
+    db.expire_all()
+    assert db.get(StudyGroup, group.id).member_count == 3
+    ((notification_type, notified_ids),) = notified
+    assert notification_type == "group_member_added"
+    assert sorted(notified_ids) == sorted([users["ana"].id, users["ben"].id])
+
+def test_bulk_remove_never_removes_the_creator(monkeypatch):
+    import asyncio
+    from app.api.study_group import add_study_group_members, remove_study_group_members
+    from app.schemas.study_group import StudyGroupBulkMembers
+
+    db, group, users, notified = _bulk_setup(monkeypatch, max_members=5)
+    asyncio.run(add_study_group_members(group.id, StudyGroupBulkMembers(usernames=["ana", "ben"]), db, "admin"))
+
+    bulk = StudyGroupBulkMembers(usernames=["creator", "ana", "ghost"])
+    result = asyncio.run(remove_study_group_members(group.id, bulk, db, "admin"))
+
+    assert result.usernames == ["ana"]
+    assert result.skipped == ["creator", "ghost"]
+    db.expire_all()
+    assert _member_ids(db, group.id) == {users["creator"].id, users["ben"].id}
+    assert db.get(StudyGroup, group.id).member_count == 2
+    assert notified[-1] == ("group_member_removed", [users["ana"].id])
+
+def test_invitations_are_persisted_and_accepted_by_joining_a_private_group(monkeypatch):
+    import asyncio
+    from fastapi import HTTPException
+    from app.api.study_group import get_my_study_group_invitations, get_study_group_invitations, invite_to_study_group, join_study_group
+    from app.schemas.study_group import StudyGroupBulkMembers, StudyGroupMemberCreate
+
+    db, group, users, notified = _bulk_setup(monkeypatch, max_members=5, is_public=False)
+    bulk = StudyGroupBulkMembers(usernames=["ana", "creator", "ghost"])
+    result = asyncio.run(invite_to_study_group(group.id, bulk, db, users["creator"], "admin"))
+    assert (result.usernames, result.skipped) == (["ana"], ["creator", "ghost"])
+    assert notified == [("group_invitation", [users["ana"].id])]
+
+    # A pending invitation is not sent again
+    again = asyncio.run(invite_to_study_group(group.id, StudyGroupBulkMembers(usernames=["ana"]), db, users["creator"], "admin"))
+    assert (again.usernames, again.skipped) == ([], ["ana"])
+    (pending,) = get_study_group_invitations(group.id, db, "admin")
+    assert (pending.username, pending.invited_by) == ("ana", users["creator"].id)
+    (mine,) = get_my_study_group_invitations(db, users["ana"])
+    assert (mine.group_id, mine.group_name) == (group.id, "Tarot circle")
+
+    join = StudyGroupMemberCreate(group_id=group.id)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(join_study_group(group.id, join, db, users["ben"]))
+    assert error.value.status_code == 403
+
+    member = asyncio.run(join_study_group(group.id, join, db, users["ana"]))
+    assert member.user_id == users["ana"].id
+    assert db.query(StudyGroupInvitation).count() == 0
+    assert _member_ids(db, group.id) == {users["creator"].id, users["ana"].id}
+
+def test_batch_notifications_are_stored_and_published_per_user(monkeypatch):
+    import asyncio
+    import ast
+    import json
+    from app.workers import task_worker
+
+    class Redis:
+        def __init__(self, stored=True):
+            self.stored = stored
+            self.pushed, self.published = [], []
+
+        async def push_to_lists(self, entries):
+            self.pushed.extend(entries)
+            return self.stored
+
+        async def publish_many(self, messages):
+            self.published.extend(messages)
+            return True
+
+    group_id, user_ids = str(uuid4()), [str(uuid4()), str(uuid4())]
+    task = {
+        "id": "task-1",
+        "created_at": "2026-01-01T00:00:00",
+        "data": {"user_ids": user_ids, "group_id": group_id, "type": "group_invitation", "message": "Join us"}
+    }
+
+    redis = Redis()
+    monkeypatch.setattr(task_worker, "redis_manager", redis)
+    asyncio.run(task_worker.TaskWorker()._notify_users(task))
+
+    assert [key for key, _ in redis.pushed] == [f"notifications:{user_id}" for user_id in user_ids]
+    assert ast.literal_eval(redis.pushed[0][1]) == {
+        "id": "task-1", "message": "Join us", "type": "group_invitation",
+        "created_at": "2026-01-01T00:00:00", "read": False, "group_id": group_id,
+    }
+    assert [channel for channel, _ in redis.published] == [f"user_events:{user_id}" for user_id in user_ids]
+    assert json.loads(redis.published[0][1]) == {"type": "group_invitation", "group_id": group_id}
+
+    # A failed store raises so the task is retried, and nothing is published
+    failing = Redis(stored=False)
+    monkeypatch.setattr(task_worker, "redis_manager", failing)
+    with pytest.raises(RuntimeError):
+        asyncio.run(task_worker.TaskWorker()._notify_users(task))
+    assert failing.published == []